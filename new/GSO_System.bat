@@ -15,9 +15,9 @@ call newenv\Scripts\activate.bat
 echo Starting AI Service (Uvicorn)...
 start cmd /k "cd /d C:\Users\Client\Desktop\New_Version\gso_latest_gso && uvicorn apps.ai_service.inference_server:app --reload --port 8001"
 
-:: Start Django main system in another window
+:: Start Django main system in another window (ASGI, so live notifications work)
 echo Starting Main Django Server...
-start cmd /k "cd /d C:\Users\Client\Desktop\New_Version\gso_latest_gso && python manage.py runserver"
+start cmd /k "cd /d C:\Users\Client\Desktop\New_Version\gso_latest_gso && uvicorn core.asgi:application --port 8000"
 
 echo ==============================================
 echo   Both servers are now running!
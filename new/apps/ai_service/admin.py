@@ -1,4 +1,110 @@
 from django.contrib import admin
-from .models import AIReportSummary
+from core.jobs import running_now
+from .ipmt import start_ipmt_summary_job
+from .models import AIReportSummary, IpmtSummary, IpmtSummaryJob, WarRegenerationJob
+from .regeneration import start_regeneration_job
 
-admin.site.register(AIReportSummary)
+PROGRESS_FIELDS = (
+    'status', 'total_wars', 'unique_prompts', 'prompts_done', 'wars_updated', 'wars_failed', 'wars_skipped',
+    'wars_unchanged', 'started_at', 'heartbeat_at', 'finished_at',
+)
+
+
+@admin.register(AIReportSummary)
+class AIReportSummaryAdmin(admin.ModelAdmin):
+    list_display = ('report', 'version', 'job', 'generated_by', 'created_at')
+    list_select_related = ('report', 'job', 'generated_by')
+    search_fields = ('summary_text',)
+    raw_id_fields = ('report', 'job')
+
+
+@admin.register(WarRegenerationJob)
+class WarRegenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'unit', 'month', 'success_indicator', 'requested_by', 'created_at', 'status', 'progress')
+    list_filter = ('status',)
+    readonly_fields = ('war_ids', 'requested_by', 'created_at', 'result_message') + PROGRESS_FIELDS
+    fields = ('unit', 'month', 'success_indicator', 'max_workers', 'force', 'war_ids', 'requested_by', 'created_at') + PROGRESS_FIELDS + ('result_message',)
+    actions = ['rerun_jobs']
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        if obj.is_stale:
+            return "Stalled (no progress reported); re-run it"
+        if obj.status == 'PROCESSING':
+            return f"{obj.progress_percent}% ({obj.prompts_done}/{obj.unique_prompts} prompts, {obj.wars_updated} WARs)"
+        if obj.status == 'COMPLETED':
+            return (
+                f"{obj.wars_updated} updated, {obj.wars_unchanged} unchanged, "
+                f"{obj.wars_failed} failed, {obj.wars_skipped} skipped"
+            )
+        return "—"
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['has_running_jobs'] = WarRegenerationJob.objects.filter(running_now()).exists()
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def save_model(self, request, obj, form, change):
+        if not obj.requested_by:
+            obj.requested_by = request.user
+        super().save_model(request, obj, form, change)
+
+        if not change and start_regeneration_job(obj):
+            self.message_user(request, "⏳ Regeneration started in the background. This page refreshes with its progress.")
+
+    @admin.action(description="Re-run selected regeneration jobs")
+    def rerun_jobs(self, request, queryset):
+        started = sum(start_regeneration_job(job) for job in queryset)
+        message = f"⏳ {started} regeneration job(s) queued."
+        if started < len(queryset):
+            message += f" {len(queryset) - started} already queued or running were left alone."
+        self.message_user(request, message)
+
+
+@admin.register(IpmtSummary)
+class IpmtSummaryAdmin(admin.ModelAdmin):
+    list_display = ('month', 'unit', 'personnel', 'indicator', 'updated_at')
+    list_filter = ('unit', 'month')
+    list_select_related = ('unit', 'personnel', 'indicator')
+    search_fields = ('summary',)
+    readonly_fields = ('war_ids', 'input_fingerprint', 'job', 'updated_at')
+
+
+@admin.register(IpmtSummaryJob)
+class IpmtSummaryJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'requested_by', 'created_at', 'status', 'progress')
+    list_filter = ('status', 'unit')
+    readonly_fields = (
+        'requested_by', 'created_at', 'status', 'total_groups', 'groups_reused', 'groups_done', 'groups_failed',
+        'started_at', 'heartbeat_at', 'finished_at', 'result_message',
+    )
+    actions = ['resume_jobs']
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        if obj.is_stale:
+            return "Stalled (no progress reported); resume it"
+        if obj.status == 'PROCESSING':
+            return f"{obj.progress_percent}% ({obj.groups_done + obj.groups_reused}/{obj.total_groups} rows)"
+        if obj.status == 'COMPLETED':
+            return f"{obj.groups_done} summarized, {obj.groups_reused} unchanged, {obj.groups_failed} failed"
+        return "—"
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['has_running_jobs'] = IpmtSummaryJob.objects.filter(running_now()).exists()
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            super().save_model(request, obj, form, change)
+            return
+        # Adding a job starts it, or rejoins the one already running for that unit and month
+        job = start_ipmt_summary_job(obj.unit, obj.month, request.user, force=obj.force)
+        obj.pk = job.pk
+        self.message_user(request, "⏳ IPMT summaries are being generated in the background. This page refreshes with its progress.")
+
+    @admin.action(description="Resume selected IPMT summary jobs")
+    def resume_jobs(self, request, queryset):
+        started = {start_ipmt_summary_job(job.unit, job.month, request.user).pk for job in queryset}
+        self.message_user(request, f"⏳ {len(started)} IPMT summary job(s) running.")
@@ -10,6 +10,7 @@ load_dotenv()  # <-- this will load AI_API_URL and AI_API_KEY from your .env
 # === CONFIG ===
 API_KEY = os.environ.get("AI_API_KEY", "changeme")
 MODEL_NAME = "phi3"  # Ollama model name
+MAX_PROMPT_CHARS = int(os.environ.get("AI_MAX_PROMPT_CHARS", "1000"))  # Django chunks prompts to fit this
 OLLAMA_PATH = r"C:\Users\CLIENT\AppData\Local\Programs\Ollama\ollama.exe"  # full path
 
 # === APP INIT ===
@@ -28,7 +29,7 @@ async def generate(data: RequestData, x_api_key: str = Header(None)):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     # --- Input validation ---
-    if len(data.prompt) > 1000:
+    if len(data.prompt) > MAX_PROMPT_CHARS:
         raise HTTPException(status_code=400, detail="Prompt too long")
 
     try:
@@ -0,0 +1,185 @@
+# apps/ai_service/ipmt.py
+"""
+Concurrent IPMT summaries.
+
+An IPMT row is one personnel's WARs under one success indicator in a month.
+Rows with several WARs get an AI summary (summarize.py), and a unit with 15
+staff and 10 indicators can have 150 of them. summarize_ipmt_groups() runs
+those rows through a thread pool of AI_MAX_CONCURRENCY groups. Each group
+may itself summarize chunks in parallel, but every call to the server holds
+one of the AI_MAX_CONCURRENCY admission slots (utils.get_admission), so the
+server never sees more than that.
+
+Each finished row is saved as an IpmtSummary at once, by the calling
+thread, so the pool threads never touch the database. A row whose saved
+summary still has the same input fingerprint (indicator plus WAR
+descriptions) is reused without calling the model.
+
+For the IPMT preview, an IpmtSummaryJob runs this for a whole unit and
+month in the background and records progress. Because finished rows are
+saved, starting a new job after an interruption resumes where the last one
+stopped.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from apps.gso_reports.utils import group_ipmt_wars, ipmt_personnel
+from core.jobs import RUNNING_STATUSES, heartbeat
+from .models import IpmtSummary, IpmtSummaryJob
+from .regeneration import parse_month
+from .summarize import summarize_descriptions
+from .utils import AI_ERROR_PREFIX, is_ai_error, prompt_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def indicator_label(indicator):
+    return indicator.code if indicator else "Unspecified Indicator"
+
+
+def group_fingerprint(indicator, wars):
+    descriptions = [w.description for w in wars if w.description]
+    return prompt_fingerprint("\n".join([indicator_label(indicator), *descriptions]))
+
+
+def summarize_ipmt_groups(unit, month, groups, force=False, job=None, progress=None, max_workers=None):
+    """
+    Summarize every (user, indicator, wars) group with several WARs.
+    Returns ({(user id, indicator id): summary}, stats); groups that failed
+    are left out. progress(stats), if given, is called as groups finish.
+    """
+    stored = {
+        (summary.personnel_id, summary.indicator_id): summary
+        for summary in IpmtSummary.objects.filter(unit=unit, month=month)
+    }
+    summaries, pending = {}, []
+    for user, indicator, wars in groups:
+        if len(wars) < 2:
+            continue
+        key = (user.id, indicator.id if indicator else None)
+        fingerprint = group_fingerprint(indicator, wars)
+        saved = stored.get(key)
+        if not force and saved and saved.input_fingerprint == fingerprint:
+            summaries[key] = saved.summary
+            continue
+        descriptions = [w.description for w in wars if w.description]
+        pending.append((key, indicator, [w.id for w in wars], fingerprint, descriptions))
+
+    stats = {
+        "total_groups": len(summaries) + len(pending),
+        "groups_reused": len(summaries),
+        "groups_done": 0,
+        "groups_failed": 0,
+    }
+    if progress:
+        progress(stats)
+    if not pending:
+        return summaries, stats
+
+    with ThreadPoolExecutor(max_workers=max_workers or settings.AI_MAX_CONCURRENCY) as pool:
+        futures = {
+            pool.submit(summarize_descriptions, indicator_label(indicator), descriptions, force): (key, indicator, war_ids, fingerprint)
+            for key, indicator, war_ids, fingerprint, descriptions in pending
+        }
+        for future in as_completed(futures):
+            key, indicator, war_ids, fingerprint = futures[future]
+            try:
+                text = future.result()
+            except Exception as e:
+                text = f"{AI_ERROR_PREFIX} {e}"
+            if is_ai_error(text):
+                logger.warning("IPMT summary failed for %s %s %s: %s", unit, month, key, text)
+                stats["groups_failed"] += 1
+            else:
+                IpmtSummary.objects.update_or_create(
+                    unit=unit, month=month, personnel_id=key[0], indicator=indicator,
+                    defaults={"war_ids": war_ids, "input_fingerprint": fingerprint, "summary": text, "job": job},
+                )
+                summaries[key] = text
+                stats["groups_done"] += 1
+            if progress:
+                progress(stats)
+    return summaries, stats
+
+
+# -------------------------------
+# IPMT Summary Jobs
+# -------------------------------
+def process_ipmt_summary_job(job_id):
+    """
+    Summarize every IPMT row of the job's unit and month, recording progress
+    on the row as groups finish. Failures go to result_message, not raised.
+    """
+    job = IpmtSummaryJob.objects.select_related("unit").get(id=job_id)
+    jobs = IpmtSummaryJob.objects.filter(id=job_id)
+
+    try:
+        jobs.update(status="PROCESSING", started_at=timezone.now(), finished_at=None)
+        # A single group can take minutes, so liveness comes from a timer rather than from progress
+        with heartbeat(jobs):
+            year, month_num = parse_month(job.month)
+            groups = group_ipmt_wars(job.unit, year, month_num, list(ipmt_personnel(job.unit)))
+            _summaries, stats = summarize_ipmt_groups(
+                job.unit, job.month, groups, force=job.force, job=job,
+                progress=lambda stats: jobs.update(**stats),
+            )
+        jobs.update(
+            status="COMPLETED",
+            result_message=(
+                f"✅ {stats['groups_done']} IPMT row(s) summarized, {stats['groups_reused']} unchanged, "
+                f"{stats['groups_failed']} failed."
+            ),
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception("IPMT summary job #%s failed", job_id)
+        jobs.update(status="FAILED", result_message=f"❌ Error: {e}", finished_at=timezone.now())
+
+
+def _process_in_background(job_id):
+    try:
+        process_ipmt_summary_job(job_id)
+    finally:
+        connection.close()
+
+
+def start_ipmt_summary_job(unit, month, user=None, force=False):
+    """
+    The running job for this unit and month, or a new one started in a
+    background thread once the current transaction commits. A job that has
+    stopped reporting progress is marked failed and replaced. The running job
+    is locked while this decides, and a unique constraint allows only one
+    running job per unit and month, so concurrent calls agree on one job.
+    """
+    running_jobs = IpmtSummaryJob.objects.filter(unit=unit, month=month, status__in=RUNNING_STATUSES)
+    with transaction.atomic():
+        running = running_jobs.select_for_update().first()
+        if running and not running.is_stale:
+            return running
+        if running:
+            IpmtSummaryJob.objects.filter(id=running.id).update(
+                status="FAILED", result_message="❌ Stopped reporting progress; resumed by a new job.", finished_at=timezone.now(),
+            )
+        try:
+            with transaction.atomic():
+                job = IpmtSummaryJob.objects.create(
+                    unit=unit, month=month, requested_by=user, force=force, heartbeat_at=timezone.now(),
+                )
+        except IntegrityError:
+            # Another request created one between our check and our insert
+            return running_jobs.get()
+
+        def launch():
+            threading.Thread(
+                target=_process_in_background,
+                args=(job.id,),
+                daemon=True,
+            ).start()
+
+        transaction.on_commit(launch)
+    return job
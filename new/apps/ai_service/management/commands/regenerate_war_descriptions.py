@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.gso_accounts.models import Unit
+from apps.gso_reports.models import SuccessIndicator
+from apps.ai_service.models import WarRegenerationJob
+from apps.ai_service.regeneration import group_by_prompt, parse_month, process_regeneration_job, select_wars
+
+
+class Command(BaseCommand):
+    help = "Regenerate WAR descriptions with the local AI model, storing each result as a new AIReportSummary version."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--unit", help="Unit name (or id).")
+        parser.add_argument("--month", default="", help="Month of date_started, YYYY-MM.")
+        parser.add_argument("--indicator", help="Success indicator code (or id).")
+        parser.add_argument("--workers", type=int, help="Prompts in flight at once (default: AI_MAX_CONCURRENCY).")
+        parser.add_argument("--force", action="store_true", help="Also regenerate WARs whose inputs are unchanged.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the WARs and distinct prompts.")
+
+    def _lookup(self, model, value, field, **scope):
+        if value is None:
+            return None
+        lookup = {"pk": int(value)} if value.isdigit() else {f"{field}__iexact": value, **scope}
+        try:
+            return model.objects.get(**lookup)
+        except (model.DoesNotExist, model.MultipleObjectsReturned) as e:
+            raise CommandError(f"{model.__name__} {value!r}: {e}")
+
+    def handle(self, *args, **options):
+        unit = self._lookup(Unit, options["unit"], "name")
+        # Indicator codes repeat across units, so a code is looked up within --unit when given
+        indicator = self._lookup(SuccessIndicator, options["indicator"], "code", **({"unit": unit} if unit else {}))
+        if options["month"]:
+            try:
+                parse_month(options["month"])
+            except ValueError:
+                raise CommandError("Invalid month format. Use YYYY-MM.")
+
+        if options["dry_run"]:
+            prompts, skipped, unchanged = group_by_prompt(
+                select_wars(unit=unit, month=options["month"], success_indicator=indicator), force=options["force"],
+            )
+            wars = sum(map(len, prompts.values()))
+            self.stdout.write(self.style.SUCCESS(
+                f"{wars} WAR(s) would be regenerated from {len(prompts)} distinct prompt(s); "
+                f"{unchanged} unchanged, {skipped} skipped (no request)."
+            ))
+            return
+
+        job = WarRegenerationJob.objects.create(
+            unit=unit, month=options["month"], success_indicator=indicator, max_workers=options["workers"],
+            force=options["force"],
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Regenerating WAR descriptions (job #{job.pk})..."))
+
+        def progress(job):
+            if job.status == "PROCESSING":
+                self.stdout.write(
+                    f"  {job.progress_percent}% — {job.prompts_done}/{job.unique_prompts} prompts, "
+                    f"{job.wars_updated} updated, {job.wars_failed} failed"
+                )
+
+        process_regeneration_job(job.pk, progress=progress)
+        job.refresh_from_db()
+        style = self.style.SUCCESS if job.status == "COMPLETED" else self.style.ERROR
+        self.stdout.write(style(job.result_message))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from apps.ai_service.sentiment import score_feedback_sentiment, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Score Feedback.sentiment in batches using the offline lexicon model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows scored per batch.")
+        parser.add_argument("--rescore", action="store_true", help="Re-score feedback that already has a sentiment.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("Scoring feedback sentiment..."))
+
+        stats = score_feedback_sentiment(chunk_size=options["chunk_size"], rescore=options["rescore"])
+
+        if not stats["scored"]:
+            self.stdout.write(self.style.WARNING("No unscored feedback found."))
+            return
+
+        labels = ", ".join(f"{label}: {count}" for label, count in stats["labels"].items())
+        self.stdout.write(f"{labels}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {stats['scored']} feedback rows in {stats['seconds']}s "
+            f"({stats['rows_per_second']} rows/s)."
+        ))
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:03
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def number_existing_summaries(apps, schema_editor):
+    # Earlier summaries all default to version 1; number them per report by creation time
+    AIReportSummary = apps.get_model("ai_service", "AIReportSummary")
+    versions, changed = {}, []
+    for summary in AIReportSummary.objects.order_by("report_id", "created_at", "id"):
+        summary.version = versions[summary.report_id] = versions.get(summary.report_id, 0) + 1
+        changed.append(summary)
+    AIReportSummary.objects.bulk_update(changed, ["version"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0002_initial'),
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('gso_reports', '0006_access_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='aireportsummary',
+            options={'ordering': ['report', '-version']},
+        ),
+        migrations.AddField(
+            model_name='aireportsummary',
+            name='prompt_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the prompt that produced this text', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='aireportsummary',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='WarRegenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('war_ids', models.JSONField(blank=True, help_text='Explicit WAR ids (admin action); overrides the filters', null=True)),
+                ('month', models.CharField(blank=True, help_text='YYYY-MM of date_started', max_length=7, validators=[django.core.validators.RegexValidator('^\\d{4}-(0[1-9]|1[0-2])$', 'Use YYYY-MM.')])),
+                ('max_workers', models.PositiveSmallIntegerField(blank=True, help_text='Default: AI_MAX_CONCURRENCY', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('total_wars', models.PositiveIntegerField(default=0)),
+                ('unique_prompts', models.PositiveIntegerField(default=0)),
+                ('prompts_done', models.PositiveIntegerField(default=0)),
+                ('wars_updated', models.PositiveIntegerField(default=0)),
+                ('wars_failed', models.PositiveIntegerField(default=0)),
+                ('wars_skipped', models.PositiveIntegerField(default=0, help_text='Migrated WARs with no service request to describe')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('result_message', models.TextField(blank=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('success_indicator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='gso_reports.successindicator')),
+                ('unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='gso_accounts.unit')),
+            ],
+            options={
+                'verbose_name': 'WAR Regeneration Job',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='aireportsummary',
+            name='job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='summaries', to='ai_service.warregenerationjob'),
+        ),
+        migrations.RunPython(number_existing_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='aireportsummary',
+            constraint=models.UniqueConstraint(fields=('report', 'version'), name='ai_summary_report_version_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0003_war_regeneration_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='warregenerationjob',
+            name='force',
+            field=models.BooleanField(default=False, help_text='Regenerate even WARs whose inputs are unchanged (e.g. after a model change)'),
+        ),
+        migrations.AddField(
+            model_name='warregenerationjob',
+            name='wars_unchanged',
+            field=models.PositiveIntegerField(default=0, help_text='Description already generated from the same inputs'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:18
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0004_regeneration_force'),
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('gso_reports', '0007_war_description_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IpmtSummaryJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.CharField(help_text='YYYY-MM of date_started', max_length=7, validators=[django.core.validators.RegexValidator('^\\d{4}-(0[1-9]|1[0-2])$', 'Use YYYY-MM.')])),
+                ('force', models.BooleanField(default=False, help_text='Regenerate summaries whose inputs are unchanged')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('total_groups', models.PositiveIntegerField(default=0, help_text='IPMT rows with several WARs to summarize')),
+                ('groups_reused', models.PositiveIntegerField(default=0)),
+                ('groups_done', models.PositiveIntegerField(default=0)),
+                ('groups_failed', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, help_text='Last progress update', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('result_message', models.TextField(blank=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='gso_accounts.unit')),
+            ],
+            options={
+                'verbose_name': 'IPMT Summary Job',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IpmtSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.CharField(help_text='YYYY-MM of date_started', max_length=7)),
+                ('war_ids', models.JSONField(default=list)),
+                ('input_fingerprint', models.CharField(max_length=64)),
+                ('summary', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('indicator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='gso_reports.successindicator')),
+                ('personnel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ipmt_summaries', to=settings.AUTH_USER_MODEL)),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='gso_accounts.unit')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='summaries', to='ai_service.ipmtsummaryjob')),
+            ],
+            options={
+                'verbose_name': 'IPMT Summary',
+                'verbose_name_plural': 'IPMT Summaries',
+                'constraints': [models.UniqueConstraint(fields=('unit', 'month', 'personnel', 'indicator'), name='ipmt_summary_group_uniq')],
+            },
+        ),
+    ]
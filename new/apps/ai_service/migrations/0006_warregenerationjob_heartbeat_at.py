@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0005_ipmt_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='warregenerationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life from the regeneration thread', null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_running_jobs(apps, schema_editor):
+    # Keep the newest running job per unit and month; older ones would break the constraint
+    IpmtSummaryJob = apps.get_model("ai_service", "IpmtSummaryJob")
+    seen, duplicates = set(), []
+    for job in IpmtSummaryJob.objects.filter(status__in=["PENDING", "PROCESSING"]).order_by("-created_at", "-id"):
+        if (job.unit_id, job.month) in seen:
+            duplicates.append(job.id)
+        seen.add((job.unit_id, job.month))
+    IpmtSummaryJob.objects.filter(id__in=duplicates).update(
+        status="FAILED", result_message="❌ Replaced by a newer job for the same unit and month.",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0006_warregenerationjob_heartbeat_at'),
+        ('gso_accounts', '0002_unit_unit_head'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ipmtsummaryjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life from the summary thread', null=True),
+        ),
+        migrations.RunPython(fail_duplicate_running_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ipmtsummaryjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'PROCESSING'])), fields=('unit', 'month'), name='ipmt_job_one_running_per_month'),
+        ),
+    ]
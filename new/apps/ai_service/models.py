@@ -1,12 +1,16 @@
 from django.db import models
 from django.conf import settings
-from apps.gso_reports.models import WorkAccomplishmentReport
+from django.core.validators import RegexValidator
+from apps.gso_accounts.models import Unit
+from apps.gso_reports.models import WorkAccomplishmentReport, SuccessIndicator
+from core.jobs import HeartbeatMixin
 
 
 class AIReportSummary(models.Model):
     """
     Stores AI-generated summaries for a Work Accomplishment Report (WAR).
-    Multiple summaries may exist per report (e.g., drafts, retries).
+    Multiple summaries may exist per report (e.g., drafts, retries); each
+    regeneration adds the next version.
     """
 
     report = models.ForeignKey(
@@ -15,6 +19,15 @@ class AIReportSummary(models.Model):
         related_name="ai_summaries"
     )
     summary_text = models.TextField()
+    version = models.PositiveIntegerField(default=1)
+    prompt_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the prompt that produced this text")
+    job = models.ForeignKey(
+        "WarRegenerationJob",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="summaries"
+    )
     generated_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -23,5 +36,156 @@ class AIReportSummary(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ["report", "-version"]
+        constraints = [
+            models.UniqueConstraint(fields=["report", "version"], name="ai_summary_report_version_uniq"),
+        ]
+
+    def __str__(self):
+        return f"AI Summary v{self.version} for WAR #{self.report_id} (by {self.generated_by or 'System'})"
+
+
+class WarRegenerationJob(HeartbeatMixin, models.Model):
+    """
+    A batch regeneration of WAR descriptions (admin action or
+    `manage.py regenerate_war_descriptions`). WARs are selected by explicit
+    ids or by unit / month / success indicator; progress is written to the
+    row as prompts complete. WARs with unchanged inputs are skipped unless
+    force is set.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    # Selection
+    war_ids = models.JSONField(null=True, blank=True, help_text="Explicit WAR ids (admin action); overrides the filters")
+    unit = models.ForeignKey(Unit, on_delete=models.SET_NULL, null=True, blank=True)
+    month = models.CharField(
+        max_length=7,
+        blank=True,
+        validators=[RegexValidator(r"^\d{4}-(0[1-9]|1[0-2])$", "Use YYYY-MM.")],
+        help_text="YYYY-MM of date_started"
+    )
+    success_indicator = models.ForeignKey(SuccessIndicator, on_delete=models.SET_NULL, null=True, blank=True)
+    max_workers = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Default: AI_MAX_CONCURRENCY")
+    force = models.BooleanField(default=False, help_text="Regenerate even WARs whose inputs are unchanged (e.g. after a model change)")
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    total_wars = models.PositiveIntegerField(default=0)
+    unique_prompts = models.PositiveIntegerField(default=0)
+    prompts_done = models.PositiveIntegerField(default=0)
+    wars_updated = models.PositiveIntegerField(default=0)
+    wars_failed = models.PositiveIntegerField(default=0)
+    wars_skipped = models.PositiveIntegerField(default=0, help_text="Migrated WARs with no service request to describe")
+    wars_unchanged = models.PositiveIntegerField(default=0, help_text="Description already generated from the same inputs")
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life from the regeneration thread")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result_message = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "WAR Regeneration Job"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"WAR regeneration #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_running(self):
+        return self.status in ('PENDING', 'PROCESSING')
+
+    @property
+    def progress_percent(self):
+        if not self.unique_prompts:
+            return 100 if self.status == 'COMPLETED' else 0
+        return min(100, round(self.prompts_done * 100 / self.unique_prompts))
+
+
+class IpmtSummary(models.Model):
+    """
+    AI summary of one IPMT row: a personnel's WARs under one success indicator
+    in one month. Saved as soon as it is generated, and reused while
+    input_fingerprint (indicator plus WAR descriptions) still matches.
+    """
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE)
+    month = models.CharField(max_length=7, help_text="YYYY-MM of date_started")
+    personnel = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="ipmt_summaries")
+    indicator = models.ForeignKey(SuccessIndicator, on_delete=models.CASCADE, null=True, blank=True)
+    war_ids = models.JSONField(default=list)
+    input_fingerprint = models.CharField(max_length=64)
+    summary = models.TextField()
+    job = models.ForeignKey("IpmtSummaryJob", on_delete=models.SET_NULL, null=True, blank=True, related_name="summaries")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "IPMT Summary"
+        verbose_name_plural = "IPMT Summaries"
+        constraints = [
+            models.UniqueConstraint(fields=["unit", "month", "personnel", "indicator"], name="ipmt_summary_group_uniq"),
+        ]
+
+    def __str__(self):
+        return f"IPMT summary {self.month} - {self.personnel} - {self.indicator.code if self.indicator else 'Unspecified'}"
+
+
+class IpmtSummaryJob(HeartbeatMixin, models.Model):
+    """
+    Generates the IPMT summaries of one unit and month in the background,
+    several groups at a time. Groups whose saved summary is still current are
+    reused, so starting the job again after an interruption resumes it.
+    """
+    STATUS_CHOICES = WarRegenerationJob.STATUS_CHOICES
+
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE)
+    month = models.CharField(
+        max_length=7,
+        validators=[RegexValidator(r"^\d{4}-(0[1-9]|1[0-2])$", "Use YYYY-MM.")],
+        help_text="YYYY-MM of date_started"
+    )
+    force = models.BooleanField(default=False, help_text="Regenerate summaries whose inputs are unchanged")
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    total_groups = models.PositiveIntegerField(default=0, help_text="IPMT rows with several WARs to summarize")
+    groups_reused = models.PositiveIntegerField(default=0)
+    groups_done = models.PositiveIntegerField(default=0)
+    groups_failed = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life from the summary thread")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result_message = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "IPMT Summary Job"
+        ordering = ["-created_at"]
+        constraints = [
+            # One queued or running job per unit and month, even when two requests start one at once
+            models.UniqueConstraint(
+                fields=["unit", "month"],
+                condition=models.Q(status__in=["PENDING", "PROCESSING"]),
+                name="ipmt_job_one_running_per_month",
+            ),
+        ]
+
     def __str__(self):
-        return f"AI Summary for WAR #{self.report.id} (by {self.generated_by or 'System'})"
+        return f"IPMT summaries {self.unit} {self.month} ({self.get_status_display()})"
+
+    @property
+    def is_running(self):
+        return self.status in ('PENDING', 'PROCESSING')
+
+    @property
+    def progress_percent(self):
+        if not self.total_groups:
+            return 100 if self.status == 'COMPLETED' else 0
+        return min(100, round((self.groups_reused + self.groups_done + self.groups_failed) * 100 / self.total_groups))
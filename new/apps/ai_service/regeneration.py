@@ -0,0 +1,255 @@
+# apps/ai_service/regeneration.py
+"""
+(Re)generation of WAR descriptions.
+
+Every trigger goes through regenerate_wars(): the admin action and
+`manage.py regenerate_war_descriptions` (as a WarRegenerationJob), the
+background thread started when a request is completed, the accomplishment
+report and the ai_service views (queue_war_descriptions) and the
+generate_war_description task (refresh_war_description).
+
+Every WAR's prompt is built up front. A WAR whose description_fingerprint
+already matches its prompt's fingerprint was generated from exactly these
+inputs and is skipped as unchanged, unless force is set (e.g. after
+switching models). WARs whose prompts are identical share one inference
+call, and prompts run through query_local_ai_many with at most max_workers
+(default AI_MAX_CONCURRENCY) in flight.
+
+Each finished prompt is written as it arrives:
+
+    - one AIReportSummary per WAR, at the next version for that report
+    - WAR.description and description_fingerprint replaced
+    - progress(stats) called, so a job row can record it
+
+Failed prompts leave the WARs' descriptions alone and count as failed.
+Migrated WARs without a service request have nothing to build a prompt
+from and are skipped.
+"""
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.gso_reports.models import WorkAccomplishmentReport
+from core.jobs import claim, heartbeat
+from apps.gso_reports.utils import month_filter_kwargs
+from .models import AIReportSummary, WarRegenerationJob
+from .utils import build_war_prompt, is_ai_error, prompt_fingerprint, query_local_ai_many
+
+logger = logging.getLogger(__name__)
+
+# WAR ids with a queued or running background generation in this process
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def parse_month(month):
+    """(year, month) from "YYYY-MM"; raises ValueError otherwise."""
+    year, month_num = map(int, month.split("-"))
+    if not 1 <= month_num <= 12:
+        raise ValueError(f"Invalid month: {month}")
+    return year, month_num
+
+
+def select_wars(war_ids=None, unit=None, month="", success_indicator=None):
+    """WARs to regenerate, with their request and task reports loaded for prompt building."""
+    wars = WorkAccomplishmentReport.objects.all()
+    if war_ids:
+        wars = wars.filter(id__in=war_ids)
+    else:
+        if unit:
+            wars = wars.filter(unit=unit)
+        if month:
+            wars = wars.filter(**month_filter_kwargs(*parse_month(month)))
+        if success_indicator:
+            wars = wars.filter(success_indicator=success_indicator)
+    return wars.select_related("request").prefetch_related("request__reports").order_by("id")
+
+
+def group_by_prompt(wars, force=False):
+    """
+    {prompt: [war ids]} for the WARs that need generating, plus counts of
+    WARs skipped (no request) and unchanged (fingerprint already matches).
+    """
+    prompts, skipped, unchanged = {}, 0, 0
+    for war in wars.iterator(chunk_size=500):
+        if war.request is None:
+            skipped += 1
+            continue
+        prompt = build_war_prompt(war.request)
+        if not force and war.description and war.description_fingerprint == prompt_fingerprint(prompt):
+            unchanged += 1
+            continue
+        prompts.setdefault(prompt, []).append(war.id)
+    return prompts, skipped, unchanged
+
+
+def save_regenerated(war_ids, text, fingerprint, job=None, user=None):
+    """Store `text` as the next AIReportSummary version of each WAR and as its description."""
+    with transaction.atomic():
+        # Lock the WARs so concurrent runs cannot hand out the same version
+        locked = list(WorkAccomplishmentReport.objects.select_for_update().filter(id__in=war_ids).values_list("id", flat=True))
+        latest = dict(
+            AIReportSummary.objects.filter(report_id__in=locked)
+            .values_list("report_id").annotate(latest=Max("version"))
+        )
+        AIReportSummary.objects.bulk_create([
+            AIReportSummary(
+                report_id=war_id,
+                summary_text=text,
+                version=latest.get(war_id, 0) + 1,
+                prompt_hash=fingerprint,
+                job=job,
+                generated_by=user,
+            )
+            for war_id in locked
+        ])
+        WorkAccomplishmentReport.objects.filter(id__in=locked).update(
+            description=text, description_fingerprint=fingerprint,
+        )
+    return len(locked)
+
+
+def regenerate_wars(wars, force=False, max_workers=None, job=None, user=None, progress=None):
+    """Generate descriptions for the `wars` queryset (see module docstring); returns the stats dict."""
+    prompts, skipped, unchanged = group_by_prompt(wars, force)
+    stats = {
+        "total_wars": sum(map(len, prompts.values())) + skipped + unchanged,
+        "unique_prompts": len(prompts),
+        "prompts_done": 0,
+        "wars_updated": 0,
+        "wars_failed": 0,
+        "wars_skipped": skipped,
+        "wars_unchanged": unchanged,
+    }
+    if progress:
+        progress(stats)
+
+    def record_result(prompt, text):
+        war_ids = prompts[prompt]
+        stats["prompts_done"] += 1
+        if is_ai_error(text):
+            logger.warning("WAR description generation failed for %s: %s", war_ids, text)
+            stats["wars_failed"] += len(war_ids)
+        else:
+            stats["wars_updated"] += save_regenerated(war_ids, text, prompt_fingerprint(prompt), job=job, user=user)
+        if progress:
+            progress(stats)
+
+    if prompts:
+        query_local_ai_many(prompts, max_workers=max_workers, on_result=record_result)
+    return stats
+
+
+def refresh_war_description(war_id, force=False, user=None):
+    """Regenerate one WAR's description unless its inputs are unchanged; returns the stats dict."""
+    return regenerate_wars(select_wars([war_id]), force=force, user=user)
+
+
+# -------------------------------
+# Background Generation
+# -------------------------------
+def _generate_in_background(war_ids, force, user):
+    try:
+        regenerate_wars(select_wars(war_ids), force=force, user=user)
+    except Exception:
+        logger.exception("Could not generate descriptions for WARs %s", war_ids)
+    finally:
+        with _in_flight_lock:
+            _in_flight.difference_update(war_ids)
+        connection.close()
+
+
+def queue_war_descriptions(war_ids, force=False, user=None):
+    """
+    Generate WAR descriptions in a background thread once the current
+    transaction commits. WARs already queued in this process are left out,
+    so repeated page loads do not pile up duplicate work.
+    """
+    def launch():
+        with _in_flight_lock:
+            pending = [war_id for war_id in war_ids if war_id not in _in_flight]
+            _in_flight.update(pending)
+        if pending:
+            threading.Thread(
+                target=_generate_in_background,
+                args=(pending, force, user),
+                daemon=True,
+            ).start()
+
+    transaction.on_commit(launch)
+
+
+# -------------------------------
+# Regeneration Jobs
+# -------------------------------
+def process_regeneration_job(job_id, progress=None):
+    """
+    Run a WarRegenerationJob, recording progress on the row after every prompt.
+    Failures are stored in result_message rather than raised. progress(job),
+    if given, is called after each update (the management command prints it).
+    """
+    job = WarRegenerationJob.objects.select_related("requested_by").get(id=job_id)
+    jobs = WarRegenerationJob.objects.filter(id=job_id)
+
+    def report():
+        if progress:
+            job.refresh_from_db()
+            progress(job)
+
+    def record_progress(stats):
+        jobs.update(**stats)
+        report()
+
+    try:
+        jobs.update(status="PROCESSING", started_at=timezone.now(), finished_at=None)
+        with heartbeat(jobs):
+            stats = regenerate_wars(
+                select_wars(job.war_ids, job.unit_id, job.month, job.success_indicator_id),
+                force=job.force,
+                max_workers=job.max_workers,
+                job=job,
+                user=job.requested_by,
+                progress=record_progress,
+            )
+        jobs.update(
+            status="COMPLETED",
+            result_message=(
+                f"✅ {stats['wars_updated']} WAR(s) regenerated from {stats['unique_prompts']} prompt(s); "
+                f"{stats['wars_unchanged']} unchanged, {stats['wars_failed']} failed, {stats['wars_skipped']} skipped."
+            ),
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception("WAR regeneration #%s failed", job_id)
+        jobs.update(status="FAILED", result_message=f"❌ Error: {e}", finished_at=timezone.now())
+    report()
+
+
+def _process_in_background(job_id):
+    try:
+        process_regeneration_job(job_id)
+    finally:
+        connection.close()
+
+
+def start_regeneration_job(job: WarRegenerationJob):
+    """
+    Run the job in a background thread once the current transaction commits.
+    A job that is already queued or running (and not stale) is left alone;
+    returns whether it was started.
+    """
+    if not claim(WarRegenerationJob.objects.filter(id=job.id)):
+        return False
+
+    def launch():
+        threading.Thread(
+            target=_process_in_background,
+            args=(job.id,),
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(launch)
+    return True
@@ -0,0 +1,126 @@
+# apps/ai_service/sentiment.py
+import time
+
+import numpy as np
+import pandas as pd
+
+from apps.gso_requests.models import Feedback
+
+# -------------------------------
+# Offline Lexicon Config
+# -------------------------------
+POSITIVE_LABEL = "Positive"
+NEGATIVE_LABEL = "Negative"
+NEUTRAL_LABEL = "Neutral"
+
+# Word weights tuned for short service-feedback comments (English + common Filipino terms)
+LEXICON = {
+    # positive
+    "good": 1.0, "great": 1.5, "excellent": 2.0, "fast": 1.0, "quick": 1.0, "quickly": 1.0,
+    "helpful": 1.5, "courteous": 1.5, "polite": 1.0, "friendly": 1.0, "satisfied": 1.5,
+    "thank": 1.0, "thanks": 1.0, "salamat": 1.0, "maayos": 1.0, "mabilis": 1.0, "magaling": 1.5,
+    "efficient": 1.5, "professional": 1.0, "clean": 0.5, "nice": 1.0, "well": 0.5,
+    "keep": 0.5, "appreciate": 1.5, "appreciated": 1.5, "smooth": 1.0, "awesome": 1.5,
+    "best": 1.5, "prompt": 1.0, "responsive": 1.0, "okay": 0.5, "ok": 0.5,
+    # negative
+    "bad": -1.0, "poor": -1.5, "slow": -1.0, "late": -1.0, "delay": -1.0, "delayed": -1.0,
+    "rude": -2.0, "unhelpful": -1.5, "dirty": -1.0, "broken": -1.0, "worst": -2.0,
+    "terrible": -2.0, "disappointed": -1.5, "disappointing": -1.5, "unsatisfied": -1.5,
+    "dissatisfied": -1.5, "never": -0.5, "waited": -0.5, "waiting": -0.5, "problem": -1.0,
+    "issue": -0.5, "complaint": -1.0, "matagal": -1.0, "bagal": -1.0, "sira": -1.0,
+    "incomplete": -1.0, "unfinished": -1.0, "ignored": -1.5, "lack": -1.0, "improve": -0.5,
+}
+NEGATIONS = {"not", "no", "never", "hindi", "di", "don't", "didn't", "wasn't", "isn't", "without"}
+
+# Score thresholds on the normalized [-1, 1] scale
+POSITIVE_THRESHOLD = 0.15
+NEGATIVE_THRESHOLD = -0.15
+CHUNK_SIZE = 2000
+
+
+# -------------------------------
+# Vectorized Scoring
+# -------------------------------
+def score_texts(texts, average_scores=None) -> np.ndarray:
+    """
+    Score a batch of feedback texts in one pass.
+    Returns a float array in [-1, 1]. Rows with no recognised words fall back
+    to the SQD average score (1–5 Likert scale) when provided.
+    """
+    series = pd.Series(list(texts), dtype="object").fillna("").astype(str)
+    if series.empty:
+        return np.zeros(0)
+
+    tokens = series.str.lower().str.findall(r"[a-z']+").explode()
+    weights = tokens.map(LEXICON).fillna(0.0).astype(float)
+
+    # Flip the polarity of a word that directly follows a negation
+    previous = tokens.groupby(level=0).shift(1)
+    weights = weights.where(~previous.isin(NEGATIONS), -weights)
+
+    totals = weights.groupby(level=0).sum().reindex(series.index, fill_value=0.0).to_numpy()
+    hits = (weights != 0).groupby(level=0).sum().reindex(series.index, fill_value=0).to_numpy()
+
+    scores = np.tanh(totals / np.sqrt(np.maximum(hits, 1)))
+
+    if average_scores is not None:
+        averages = pd.Series(list(average_scores), dtype="float").fillna(0.0).to_numpy()
+        # Map 1–5 ratings onto [-1, 1]; 0 means "not rated"
+        rating_scores = np.where(averages > 0, (averages - 3.0) / 2.0, 0.0)
+        scores = np.where(hits > 0, scores, rating_scores)
+
+    return scores
+
+
+def label_scores(scores: np.ndarray) -> np.ndarray:
+    """Convert numeric scores into Positive / Negative / Neutral labels."""
+    return np.select(
+        [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+        [POSITIVE_LABEL, NEGATIVE_LABEL],
+        default=NEUTRAL_LABEL,
+    )
+
+
+# -------------------------------
+# Batch Feedback Pipeline
+# -------------------------------
+def score_feedback_sentiment(chunk_size: int = CHUNK_SIZE, rescore: bool = False) -> dict:
+    """
+    Fill Feedback.sentiment for unscored rows (or all rows when `rescore` is set).
+    Rows are read in id-ordered chunks and written back with bulk_update.
+    Returns counts and throughput for reporting.
+    """
+    queryset = Feedback.objects.all() if rescore else Feedback.objects.filter(sentiment="")
+    queryset = queryset.order_by("id")
+
+    started = time.perf_counter()
+    scored = 0
+    counts = {POSITIVE_LABEL: 0, NEGATIVE_LABEL: 0, NEUTRAL_LABEL: 0}
+    last_id = 0
+
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).only("id", "suggestions", "average_score")[:chunk_size]
+        )
+        if not chunk:
+            break
+
+        labels = label_scores(score_texts(
+            [fb.suggestions for fb in chunk],
+            [fb.average_score for fb in chunk],
+        ))
+        for fb, label in zip(chunk, labels):
+            fb.sentiment = str(label)
+            counts[fb.sentiment] += 1
+
+        Feedback.objects.bulk_update(chunk, ["sentiment"], batch_size=chunk_size)
+        scored += len(chunk)
+        last_id = chunk[-1].id
+
+    elapsed = time.perf_counter() - started
+    return {
+        "scored": scored,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(scored / elapsed, 1) if elapsed > 0 else 0.0,
+        "labels": counts,
+    }
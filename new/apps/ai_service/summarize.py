@@ -0,0 +1,116 @@
+# apps/ai_service/summarize.py
+"""
+Map-reduce summarization for IPMT rows.
+
+The inference server rejects prompts longer than AI_MAX_PROMPT_CHARS, so an
+indicator's WAR descriptions are packed in order into chunks whose prompts
+fit. Each chunk is summarized (map) and the partial summaries are packed and
+summarized again (reduce) until one summary is left:
+
+    descriptions  d1 d2 d3 | d4 d5 | d6 d7 d8 | d9
+    map           s1         s2      s3         s4
+    reduce        r1 = (s1 s2 s3)               s4 (passed up as it is)
+    reduce        final = (r1 s4)
+
+Every prompt on a level runs in parallel through query_local_ai_many
+(at most AI_MAX_CONCURRENCY in flight), and every result is cached by
+prompt fingerprint. New WARs sort last, so adding one changes only the last
+chunk and the summaries above it: one branch is recomputed and the other
+branches come from the cache. Descriptions that fit one prompt produce the
+same single prompt as before.
+
+If any prompt fails, the error is returned. Completed branches are cached,
+so a retry only reruns what failed.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils import AI_ERROR_PREFIX, ELLIPSIS, is_ai_error, prompt_fingerprint, query_local_ai_many
+
+
+def map_prompt(success_indicator, descriptions):
+    activities_text = "\n".join([f"- {desc}" for desc in descriptions])
+    return (
+        f"Summarize the following accomplishments for the success indicator '{success_indicator}':\n\n"
+        f"{activities_text}\n\n"
+        "Write in a concise, factual way about what was achieved."
+    )
+
+
+def reduce_prompt(success_indicator, summaries):
+    summaries_text = "\n".join([f"- {summary}" for summary in summaries])
+    return (
+        f"Combine these partial summaries of accomplishments for the success indicator '{success_indicator}' "
+        f"into one summary:\n\n{summaries_text}\n\n"
+        "Write in a concise, factual way about what was achieved. Do not repeat yourself."
+    )
+
+
+def pack(items, build_prompt, max_chars, min_per_chunk=1):
+    """
+    Split items, in order, into chunks whose build_prompt(chunk) fits
+    max_chars. An item too long for min_per_chunk items per prompt is cut
+    down with an ellipsis.
+    """
+    overhead = len(build_prompt([]))
+    # Each item costs "- " plus a newline on top of its own length
+    item_limit = (max_chars - overhead) // min_per_chunk - 3
+    if item_limit < 1:
+        raise ValueError(f"AI_MAX_PROMPT_CHARS={max_chars} leaves no room for text in the prompt")
+
+    chunks, chunk, size = [], [], overhead
+    for item in items:
+        item = item.strip()
+        if len(item) > item_limit:
+            item = item[:item_limit - 1].rstrip() + ELLIPSIS
+        if chunk and size + len(item) + 3 > max_chars:
+            chunks.append(chunk)
+            chunk, size = [], overhead
+        chunk.append(item)
+        size += len(item) + 3
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def run_prompts(prompts, force=False, max_workers=None):
+    """{prompt: text} for each prompt, answering from the cache where possible and caching new successes."""
+    keys = {prompt: f"ai:ipmt_summary:{prompt_fingerprint(prompt)}" for prompt in prompts}
+    cached = {} if force else cache.get_many(keys.values())
+    results = {prompt: cached[key] for prompt, key in keys.items() if key in cached}
+
+    missing = [prompt for prompt in prompts if prompt not in results]
+    if missing:
+        fresh = query_local_ai_many(missing, max_workers=max_workers)
+        cache.set_many(
+            {keys[prompt]: text for prompt, text in fresh.items() if not is_ai_error(text)},
+            settings.AI_SUMMARY_CACHE_SECONDS,
+        )
+        results.update(fresh)
+    return results
+
+
+def summarize_descriptions(success_indicator, descriptions, force=False, max_workers=None):
+    """One summary of `descriptions` for the indicator, built by map-reduce within the prompt limit."""
+    max_chars = settings.AI_MAX_PROMPT_CHARS
+    items = [desc for desc in descriptions if desc and desc.strip()]
+    if not items:
+        return f"No accomplishments recorded for indicator: {success_indicator}."
+
+    build, min_per_chunk = partial(map_prompt, success_indicator), 1
+    while True:
+        chunks = pack(items, build, max_chars, min_per_chunk)
+        # On reduce levels a lone summary moves up as it is
+        prompts = {i: build(chunk) for i, chunk in enumerate(chunks) if min_per_chunk == 1 or len(chunk) > 1}
+        results = run_prompts(list(prompts.values()), force=force, max_workers=max_workers)
+        texts = [results[prompts[i]] if i in prompts else chunk[0] for i, chunk in enumerate(chunks)]
+
+        failed = [text for text in texts if is_ai_error(text)]
+        if failed:
+            return failed[0] or f"{AI_ERROR_PREFIX} Model returned empty output."
+        if len(texts) == 1:
+            return texts[0]
+        # Reduce prompts hold at least two summaries each, so every level shrinks
+        items, build, min_per_chunk = texts, partial(reduce_prompt, success_indicator), 2
@@ -1,68 +1,44 @@
 # apps/ai_service/tasks.py
-from apps.gso_reports.models import WorkAccomplishmentReport, SuccessIndicator
-from .utils import generate_war_description, generate_ipmt_summary
+from apps.gso_reports.models import WorkAccomplishmentReport
+from . import sentiment
+from .regeneration import refresh_war_description
 
 # -------------------------------
 # Generate WAR AI Description
 # -------------------------------
-def generate_war_description(war_id: int):
+def generate_war_description(war_id: int, force: bool = False):
     """
-    Generate AI description for a specific Work Accomplishment Report (WAR)
-    using the OpenRouter DeepSeek model.
-    Updates the WAR.description field directly.
+    Generate the AI description for a specific Work Accomplishment Report (WAR)
+    using the local model, unless it was already generated from the same inputs
+    (force=True regenerates anyway). Returns the WAR's description.
     """
-    try:
-        war = WorkAccomplishmentReport.objects.get(id=war_id)
-
-        activity_name = war.activity_name or "Miscellaneous"
-        unit_name = war.unit.name if war.unit else None
-        personnel_names = [p.get_full_name() for p in war.assigned_personnel.all()] if war.assigned_personnel.exists() else None
-
-        description = generate_war_description(
-            activity_name=activity_name,
-            unit=unit_name,
-            personnel_names=personnel_names
-        )
-
-        war.description = description
-        war.save(update_fields=["description"])
-        return description
-    except WorkAccomplishmentReport.DoesNotExist:
-        return None
+    refresh_war_description(war_id, force=force)
+    return WorkAccomplishmentReport.objects.filter(id=war_id).values_list("description", flat=True).first()
 
 # -------------------------------
 # Generate IPMT AI Summary
 # -------------------------------
-def generate_ipmt_summary(unit_name: str, month_filter: str):
-    from apps.gso_reports.utils import collect_ipmt_reports
+def generate_ipmt_summary(unit_name: str, month_filter: str, force: bool = False):
     """
-    Generate AI summaries for IPMT rows for a given unit and month.
-    Uses all WAR descriptions related to the unit and month.
-    Returns a list of updated rows with 'remarks'.
+    Generate AI summaries for the IPMT rows of a unit and month, several at a
+    time (see ai_service/ipmt.py), and return the rows per personnel like
+    collect_ipmt_reports. Rows whose WARs are unchanged reuse their saved summary.
     """
+    from apps.gso_reports.utils import collect_ipmt_reports
+
     try:
         year, month_num = map(int, month_filter.split("-"))
     except ValueError:
         return []
 
-    # Collect IPMT rows
-    ipmt_rows = collect_ipmt_reports(year, month_num, unit_name)
-
-    updated_rows = []
+    return collect_ipmt_reports(year, month_num, unit_name, force=force)
 
-    for row in ipmt_rows:
-        war_id = row.get("war_id")
-        description = row.get("description", "")
-        indicator_code = row.get("indicator")
-
-        # Generate AI remarks only if there is a description
-        if description:
-            remarks = generate_ipmt_summary(
-                success_indicator=indicator_code,
-                war_descriptions=[description]
-            )
-            row["remarks"] = remarks
-
-        updated_rows.append(row)
-
-    return updated_rows
+# -------------------------------
+# Batch Feedback Sentiment
+# -------------------------------
+def score_feedback_sentiment(chunk_size: int = sentiment.CHUNK_SIZE, rescore: bool = False):
+    """
+    Score unscored Feedback rows with the offline lexicon model.
+    Returns throughput stats (rows scored, seconds, rows/s, label counts).
+    """
+    return sentiment.score_feedback_sentiment(chunk_size=chunk_size, rescore=rescore)
@@ -1,3 +1,499 @@
+import datetime
+import io
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.gso_accounts.models import Unit, User
+from apps.gso_reports.models import SuccessIndicator, WorkAccomplishmentReport
+from apps.gso_reports.utils import collect_ipmt_reports
+from apps.gso_requests.models import Feedback, ServiceRequest, TaskReport
+from core.testing import seed_sample_data
+from .ipmt import process_ipmt_summary_job, start_ipmt_summary_job, summarize_ipmt_groups
+from .models import AIReportSummary, IpmtSummary, IpmtSummaryJob, WarRegenerationJob
+from .regeneration import process_regeneration_job, start_regeneration_job
+from .sentiment import label_scores, score_feedback_sentiment, score_texts
+from .summarize import map_prompt, pack, summarize_descriptions
+from .tasks import generate_war_description
+from .utils import build_war_prompt, generate_ipmt_summary
+
+
+# -------------------------------
+# Feedback Sentiment
+# -------------------------------
+class FeedbackSentimentTests(TestCase):
+
+    def test_scores_and_labels_known_texts(self):
+        texts = ["Great and helpful staff", "Very slow and rude", "not good", None, "", "the room"]
+        scores = score_texts(texts, [0, 0, 0, 4.5, 1, 3])
+
+        self.assertAlmostEqual(scores[0], -scores[1])
+        self.assertGreater(scores[0], 0.9)
+        self.assertLess(scores[2], 0)  # negation flips "good"
+        # No recognised words: the SQD rating decides, 0 means not rated
+        self.assertEqual(list(scores[3:]), [0.75, -1.0, 0.0])
+        self.assertEqual(
+            list(label_scores(scores)),
+            ["Positive", "Negative", "Negative", "Positive", "Negative", "Neutral"],
+        )
+
+    def test_empty_batch(self):
+        self.assertEqual(len(score_texts([])), 0)
+
+    def test_scores_unscored_only_unless_rescoring(self):
+        seed_sample_data(requests=14)
+        Feedback.objects.update(sentiment="")
+        feedback = Feedback.objects.order_by("id")
+        Feedback.objects.filter(pk=feedback[0].pk).update(sentiment="Negative")
+
+        stats = score_feedback_sentiment(chunk_size=1)
+        self.assertEqual(stats["scored"], feedback.count() - 1)
+        self.assertEqual(stats["labels"]["Positive"], feedback.count() - 1)
+        self.assertEqual(feedback[0].sentiment, "Negative")
+        self.assertEqual(score_feedback_sentiment()["scored"], 0)
+
+        stats = score_feedback_sentiment(rescore=True)
+        self.assertEqual(stats["scored"], feedback.count())
+        self.assertEqual(set(feedback.values_list("sentiment", flat=True)), {"Positive"})
+
+
+# -------------------------------
+# Batch WAR Regeneration
+# -------------------------------
+class WarRegenerationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=0)
+        cls.unit = Unit.objects.get(name="Electrical")
+        cls.indicator = SuccessIndicator.objects.get(code="CF1")
+        cls.march = datetime.date(2024, 3, 5)
+
+        # Three WARs with identical inputs, one with its own, one migrated WAR with no request
+        descriptions = ["Fix lights"] * 3 + ["Unclog sink"]
+        cls.wars = []
+        for description in descriptions:
+            service_request = ServiceRequest.objects.create(
+                requestor=cls.users["requestor"], unit=cls.unit, description=description, status="Completed",
+            )
+            TaskReport.objects.create(request=service_request, personnel=cls.users["personnel"], report_text="Done.")
+            cls.wars.append(WorkAccomplishmentReport.objects.create(
+                request=service_request, unit=cls.unit, date_started=cls.march, success_indicator=cls.indicator,
+            ))
+        cls.migrated = WorkAccomplishmentReport.objects.create(unit=cls.unit, date_started=cls.march, description="Old")
+        WorkAccomplishmentReport.objects.create(unit=cls.unit, date_started=datetime.date(2024, 4, 1))
+
+    def run_job(self, reply=lambda prompt: f"Generated: {'lights' if 'Fix lights' in prompt else 'sink'}", **selection):
+        job = WarRegenerationJob.objects.create(requested_by=self.users["gso"], **selection)
+        with mock.patch("apps.ai_service.utils.query_local_ai", side_effect=reply) as query:
+            process_regeneration_job(job.pk)
+        job.refresh_from_db()
+        return job, query
+
+    def test_identical_prompts_share_one_call(self):
+        job, query = self.run_job(month="2024-03")
+
+        self.assertEqual(query.call_count, 2)
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertEqual(
+            (job.total_wars, job.unique_prompts, job.prompts_done, job.wars_updated, job.wars_skipped),
+            (5, 2, 2, 4, 1),
+        )
+        self.assertEqual(job.progress_percent, 100)
+        self.wars[0].refresh_from_db()
+        self.wars[3].refresh_from_db()
+        self.assertEqual(self.wars[0].description, "Generated: lights")
+        self.assertEqual(self.wars[3].description, "Generated: sink")
+        self.migrated.refresh_from_db()
+        self.assertEqual(self.migrated.description, "Old")
+
+    def test_each_run_adds_a_version(self):
+        self.run_job(war_ids=[self.wars[0].pk])
+        job, _ = self.run_job(war_ids=[self.wars[0].pk], force=True)
+
+        summaries = AIReportSummary.objects.filter(report=self.wars[0])
+        self.assertEqual(list(summaries.values_list("version", flat=True)), [2, 1])
+        latest = summaries.first()
+        self.assertEqual(latest.job, job)
+        self.assertEqual(latest.generated_by, self.users["gso"])
+        self.assertEqual(len(latest.prompt_hash), 64)
+
+    def test_unchanged_inputs_skip_inference(self):
+        self.run_job(month="2024-03")
+        job, query = self.run_job(month="2024-03")
+
+        self.assertEqual(query.call_count, 0)
+        self.assertEqual((job.wars_updated, job.wars_unchanged, job.wars_skipped), (0, 4, 1))
+        self.assertEqual(AIReportSummary.objects.count(), 4)
+
+    def test_changed_inputs_regenerate_only_that_war(self):
+        self.run_job(month="2024-03")
+        TaskReport.objects.create(request=self.wars[3].request, personnel=self.users["personnel"], report_text="Also fixed the tap.")
+        job, query = self.run_job(month="2024-03")
+
+        self.assertEqual(query.call_count, 1)
+        self.assertEqual((job.wars_updated, job.wars_unchanged), (1, 3))
+        self.assertEqual(AIReportSummary.objects.filter(report=self.wars[3]).first().version, 2)
+
+    def test_force_regenerates_unchanged(self):
+        self.run_job(month="2024-03")
+        job, query = self.run_job(month="2024-03", force=True)
+
+        self.assertEqual(query.call_count, 2)
+        self.assertEqual((job.wars_updated, job.wars_unchanged), (4, 0))
+
+    def test_task_skips_unchanged_war(self):
+        with mock.patch("apps.ai_service.utils.query_local_ai", return_value="Fixed the lights.") as query:
+            self.assertEqual(generate_war_description(self.wars[0].pk), "Fixed the lights.")
+            self.assertEqual(generate_war_description(self.wars[0].pk), "Fixed the lights.")
+            self.assertEqual(query.call_count, 1)
+            generate_war_description(self.wars[0].pk, force=True)
+            self.assertEqual(query.call_count, 2)
+
+    def test_failed_prompts_keep_descriptions(self):
+        WorkAccomplishmentReport.objects.filter(pk=self.wars[3].pk).update(description="Kept")
+        job, _ = self.run_job(reply=lambda prompt: "[AI Error] timeout", war_ids=[self.wars[3].pk])
+
+        self.assertEqual((job.status, job.wars_updated, job.wars_failed), ("COMPLETED", 0, 1))
+        self.wars[3].refresh_from_db()
+        self.assertEqual(self.wars[3].description, "Kept")
+        self.assertFalse(AIReportSummary.objects.exists())
+
+    def test_command_dry_run_counts_prompts(self):
+        out = io.StringIO()
+        call_command(
+            "regenerate_war_descriptions", "--unit", "Electrical", "--month", "2024-03", "--indicator", "CF1",
+            "--dry-run", stdout=out,
+        )
+        self.assertIn("4 WAR(s) would be regenerated from 2 distinct prompt(s); 0 unchanged", out.getvalue())
+        self.assertFalse(WarRegenerationJob.objects.exists())
+
+    def test_long_inputs_are_cut_to_the_prompt_limit(self):
+        service_request = self.wars[0].request
+        self.assertIn("Requestor description:\nFix lights\n\nPersonnel task reports:\n- Done.", build_war_prompt(service_request))
+
+        ServiceRequest.objects.filter(pk=service_request.pk).update(description="Rewire the hall. " * 300)
+        for i in range(20):
+            TaskReport.objects.create(request=service_request, personnel=self.users["personnel"], report_text=f"Step {i}. " * 40)
+        service_request.refresh_from_db()
+
+        for limit in (400, 1000, 4000):
+            with self.subTest(limit=limit), self.settings(AI_MAX_PROMPT_CHARS=limit):
+                prompt = build_war_prompt(service_request)
+                self.assertLessEqual(len(prompt), limit)
+                self.assertIn("Requestor description:\nRewire the hall.", prompt)
+                self.assertIn("- Done.\n- Step 0.", prompt)
+                self.assertIn("…", prompt)
+                self.assertTrue(prompt.endswith("Keep it formal, brief, and specific."))
+
+    def test_queued_or_running_job_is_not_started_twice(self):
+        job = WarRegenerationJob.objects.create(month="2024-03")
+        done = WarRegenerationJob.objects.create(month="2024-03", status="COMPLETED")
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(start_regeneration_job(job))
+            self.assertFalse(start_regeneration_job(job))
+            WarRegenerationJob.objects.filter(pk=job.pk).update(status="PROCESSING")
+
+            self.client.force_login(User.objects.create_superuser("admin", password="pass", role="gso"))
+            self.client.post(
+                reverse("admin:ai_service_warregenerationjob_changelist"),
+                {"action": "rerun_jobs", "_selected_action": [job.pk, done.pk]},
+                HTTP_HOST="127.0.0.1",
+            )
+
+        self.assertEqual(len(callbacks), 2)
+        done.refresh_from_db()
+        self.assertEqual(done.status, "PENDING")
+
+    def test_stalled_job_can_be_rerun(self):
+        job = WarRegenerationJob.objects.create(
+            month="2024-03", status="PROCESSING", heartbeat_at=timezone.now() - datetime.timedelta(hours=1),
+        )
+        self.assertTrue(job.is_stale)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(start_regeneration_job(job))
+        self.assertEqual(len(callbacks), 1)
+        job.refresh_from_db()
+        self.assertFalse(job.is_stale)
+
+
+# -------------------------------
+# IPMT Summaries
+# -------------------------------
+class IpmtSummaryCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_descriptions_reuse_summary(self):
+        with mock.patch("apps.ai_service.utils.query_local_ai", return_value="Lights fixed.") as query:
+            generate_ipmt_summary("CF1", ["Fixed lights", "Fixed fans"])
+            self.assertEqual(generate_ipmt_summary("CF1", ["Fixed lights", "Fixed fans"]), "Lights fixed.")
+            self.assertEqual(query.call_count, 1)
+
+            generate_ipmt_summary("CF1", ["Fixed lights", "Fixed fans", "Fixed sockets"])
+            generate_ipmt_summary("CF1", ["Fixed lights", "Fixed fans"], force=True)
+            self.assertEqual(query.call_count, 3)
+
+    def test_errors_are_not_cached(self):
+        with mock.patch("apps.ai_service.utils.query_local_ai", return_value="[AI Error] timeout") as query:
+            generate_ipmt_summary("CF1", ["Fixed lights"])
+            generate_ipmt_summary("CF1", ["Fixed lights"])
+            self.assertEqual(query.call_count, 2)
+
+
+# -------------------------------
+# Map-reduce Summaries
+# -------------------------------
+class MapReduceSummaryTests(TestCase):
+    descriptions = [f"Replaced {i} broken light fixtures in building {i} and tested the circuits." for i in range(60)]
+
+    def setUp(self):
+        cache.clear()
+        self.prompts = []
+
+    def fake_model(self, prompt):
+        self.prompts.append(prompt)
+        return f"Summary {len(self.prompts)}."
+
+    def summarize(self, descriptions, **kwargs):
+        with mock.patch("apps.ai_service.utils.query_local_ai", side_effect=self.fake_model):
+            return summarize_descriptions("CF1", descriptions, **kwargs)
+
+    def test_prompts_fit_the_server_limit(self):
+        summary = self.summarize(self.descriptions)
+
+        self.assertTrue(summary.startswith("Summary"))
+        self.assertGreater(len(self.prompts), 2)
+        self.assertTrue(all(len(prompt) <= settings.AI_MAX_PROMPT_CHARS for prompt in self.prompts))
+        self.assertIn("Combine these partial summaries", self.prompts[-1])
+
+    def test_long_description_is_truncated(self):
+        self.summarize(["x" * 5000])
+
+        self.assertEqual(len(self.prompts), 1)
+        self.assertLessEqual(len(self.prompts[0]), settings.AI_MAX_PROMPT_CHARS)
+
+    def test_adding_a_war_recomputes_one_branch(self):
+        self.summarize(self.descriptions)
+        first_run = len(self.prompts)
+        self.prompts.clear()
+
+        self.summarize(self.descriptions + ["Rewired the gym scoreboard."])
+
+        # The last map chunk plus one reduce per level above it
+        self.assertLess(len(self.prompts), first_run // 2)
+        self.assertIn("Rewired the gym scoreboard.", self.prompts[0])
+
+    def test_failed_chunk_is_retried_alone(self):
+        with mock.patch("apps.ai_service.utils.query_local_ai",
+                        side_effect=lambda prompt: "[AI Error] busy" if "building 59" in prompt else "ok"):
+            self.assertTrue(summarize_descriptions("CF1", self.descriptions).startswith("[AI Error]"))
+
+        summary = self.summarize(self.descriptions)
+        self.assertTrue(summary.startswith("Summary"))
+        self.assertIn("building 59", self.prompts[0])
+        self.assertNotIn("building 0 ", self.prompts[0])
+
+    def test_pack_keeps_order(self):
+        chunks = pack(self.descriptions, partial(map_prompt, "CF1"), 1000)
+
+        self.assertEqual([item for chunk in chunks for item in chunk], self.descriptions)
+
+
+# -------------------------------
+# Concurrent IPMT Summaries
+# -------------------------------
+class IpmtSummaryJobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=0)
+        cls.unit = Unit.objects.get(name="Electrical")
+        cls.other = User.objects.create_user("personnel2", password="pass", role="personnel", unit=cls.unit, first_name="Other")
+        cf1 = SuccessIndicator.objects.get(code="CF1")
+        cf2 = SuccessIndicator.objects.create(unit=cls.unit, code="CF2", description="Inspections")
+
+        # Three rows with several WARs (personnel: CF1 x3, CF2 x2; other: CF1 x2) and one single-WAR row
+        layout = [(cls.users["personnel"], cf1, 3), (cls.users["personnel"], cf2, 2), (cls.other, cf1, 2), (cls.other, cf2, 1)]
+        for user, indicator, count in layout:
+            for i in range(count):
+                war = WorkAccomplishmentReport.objects.create(
+                    unit=cls.unit, date_started=datetime.date(2024, 3, 1 + i), success_indicator=indicator,
+                    description=f"{indicator.code} task {i} by {user.username}",
+                )
+                war.assigned_personnel.add(user)
+
+    def setUp(self):
+        cache.clear()
+
+    def run_job(self, reply=lambda prompt: "Summary.", **kwargs):
+        job = IpmtSummaryJob.objects.create(unit=self.unit, month="2024-03", **kwargs)
+        with mock.patch("apps.ai_service.utils.query_local_ai", side_effect=reply) as query:
+            process_ipmt_summary_job(job.pk)
+        job.refresh_from_db()
+        return job, query
+
+    def test_job_summarizes_and_saves_each_row(self):
+        job, query = self.run_job()
+
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertEqual((job.total_groups, job.groups_done, job.groups_reused, job.progress_percent), (3, 3, 0, 100))
+        self.assertEqual(query.call_count, 3)
+        self.assertEqual(IpmtSummary.objects.filter(unit=self.unit, month="2024-03", job=job).count(), 3)
+
+    def test_rerun_resumes_failed_rows_only(self):
+        job, _ = self.run_job(reply=lambda prompt: "[AI Error] busy" if "CF2" in prompt else "Summary.")
+        self.assertEqual((job.groups_done, job.groups_failed), (2, 1))
+
+        cache.clear()
+        job, query = self.run_job()
+        self.assertEqual((job.groups_reused, job.groups_done), (2, 1))
+        self.assertEqual(query.call_count, 1)
+
+    def test_changed_war_resummarizes_its_row(self):
+        self.run_job()
+        war = WorkAccomplishmentReport.objects.filter(assigned_personnel=self.other, success_indicator__code="CF1").first()
+        WorkAccomplishmentReport.objects.filter(pk=war.pk).update(description="Rewired the gym.")
+
+        cache.clear()
+        job, query = self.run_job()
+        self.assertEqual((job.groups_reused, job.groups_done, query.call_count), (2, 1, 1))
+
+    def test_collect_ipmt_reports_uses_saved_summaries(self):
+        self.run_job(reply=lambda prompt: "Saved summary.")
+        with mock.patch("apps.ai_service.utils.query_local_ai") as query:
+            rows = collect_ipmt_reports(2024, 3, "Electrical")
+        query.assert_not_called()
+
+        descriptions = {(person["personnel"], row["indicator"]): row["description"] for person in rows for row in person["rows"]}
+        self.assertEqual(descriptions[("Other", "CF1")], "Saved summary.")
+        self.assertEqual(descriptions[("Other", "CF2")], "CF2 task 0 by personnel2")
+
+    def test_calls_in_flight_stay_within_admission_limit(self):
+        in_flight, peak, lock = [0], [0], threading.Lock()
+
+        def post(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return mock.Mock(json=lambda: {"result": "Summary."}, raise_for_status=lambda: None)
+
+        # Each row is long enough to need several chunks, summarized by nested pools
+        indicators = SuccessIndicator.objects.bulk_create([
+            SuccessIndicator(unit=self.unit, code=f"LOAD{n}", description="Load test") for n in range(6)
+        ])
+        groups = [
+            (self.users["personnel"], indicator, [mock.Mock(id=i, description=f"Task {i} " + "x" * 300) for i in range(8)])
+            for indicator in indicators
+        ]
+        with mock.patch("apps.ai_service.utils.get_ai_session", return_value=mock.Mock(post=post)):
+            summaries, stats = summarize_ipmt_groups(self.unit, "2024-04", groups, max_workers=6)
+
+        self.assertEqual((stats["groups_done"], len(summaries)), (6, 6))
+        self.assertEqual(peak[0], settings.AI_MAX_CONCURRENCY)
+
+    def test_start_rejoins_running_job_and_replaces_stale_one(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            job = start_ipmt_summary_job(self.unit, "2024-03")
+            self.assertEqual(start_ipmt_summary_job(self.unit, "2024-03").pk, job.pk)
+
+            IpmtSummaryJob.objects.filter(pk=job.pk).update(
+                status="PROCESSING", heartbeat_at=timezone.now() - datetime.timedelta(hours=1),
+            )
+            resumed = start_ipmt_summary_job(self.unit, "2024-03")
+
+        self.assertNotEqual(resumed.pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+
+    def test_start_endpoint_returns_job(self):
+        self.client.force_login(self.users["gso"])
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.client.post(
+                reverse("gso_reports:start_ipmt_summaries"), {"unit": "Electrical", "month": "2024-3"}, HTTP_HOST="127.0.0.1",
+            )
+
+        self.assertEqual(response.json()["status"], "PENDING")
+        self.assertEqual(IpmtSummaryJob.objects.get().month, "2024-03")
+        status = self.client.get(
+            reverse("gso_reports:ipmt_summary_job_status", args=[response.json()["id"]]), HTTP_HOST="127.0.0.1",
+        )
+        self.assertTrue(status.json()["is_running"])
+
+    def test_preview_shows_saved_summary(self):
+        self.run_job(reply=lambda prompt: "Saved summary.")
+        self.client.force_login(self.users["gso"])
+
+        response = self.client.get(
+            reverse("gso_reports:preview_ipmt"), {"month": "2024-3", "unit": "Electrical", "personnel[]": ["Other"]},
+            HTTP_HOST="127.0.0.1",
+        )
+        self.assertContains(response, "Saved summary.")
+        self.assertEqual(response.context["summary_job"].status, "COMPLETED")
+
+    def test_concurrent_start_returns_the_job_that_won(self):
+        winner = IpmtSummaryJob.objects.create(unit=self.unit, month="2024-03", heartbeat_at=timezone.now())
+
+        # As if another request inserted its job after this one found none running
+        with mock.patch("django.db.models.query.QuerySet.first", return_value=None), \
+                self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(start_ipmt_summary_job(self.unit, "2024-03").pk, winner.pk)
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(IpmtSummaryJob.objects.count(), 1)
+
+    def test_one_running_job_per_unit_and_month(self):
+        IpmtSummaryJob.objects.create(unit=self.unit, month="2024-03", status="COMPLETED")
+        IpmtSummaryJob.objects.create(unit=self.unit, month="2024-03", status="PROCESSING")
+        IpmtSummaryJob.objects.create(unit=self.unit, month="2024-04")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            IpmtSummaryJob.objects.create(unit=self.unit, month="2024-03")
+
+    def test_job_heartbeats_while_summarizing(self):
+        beating = []
+
+        @contextmanager
+        def heartbeat(queryset):
+            beating.append(True)
+            yield
+            beating[-1] = False
+
+        def reply(prompt):
+            self.assertEqual(beating, [True])
+            return "Summary."
+
+        with mock.patch("apps.ai_service.ipmt.heartbeat", heartbeat):
+            job, query = self.run_job(reply=reply)
+
+        self.assertEqual((job.status, query.call_count, beating), ("COMPLETED", 3, [False]))
+
+    def test_stalled_job_is_not_polled_and_can_be_resumed(self):
+        job = IpmtSummaryJob.objects.create(
+            unit=self.unit, month="2024-03", status="PROCESSING", heartbeat_at=timezone.now() - datetime.timedelta(hours=1),
+        )
+        self.client.force_login(self.users["gso"])
 
-# Create your tests here.
+        status = self.client.get(reverse("gso_reports:ipmt_summary_job_status", args=[job.pk]), HTTP_HOST="127.0.0.1")
+        self.assertFalse(status.json()["is_running"])
+        response = self.client.get(
+            reverse("gso_reports:preview_ipmt"), {"month": "2024-3", "unit": "Electrical", "personnel[]": ["Other"]},
+            HTTP_HOST="127.0.0.1",
+        )
+        self.assertContains(response, "run AI Summaries again to resume")
+        self.assertNotContains(response, "pollJob({})".format(job.pk))
@@ -10,5 +10,5 @@ urlpatterns = [
     path("summaries/<int:report_id>/generate/", views.generate_ai_summary, name="generate_ai_summary"),
 
     # IPMT AI Summaries
-    path("ipmt/<int:ipmt_id>/generate/", views.generate_ipmt_ai_summary, name="generate_ipmt_ai_summary"),
+    path("ipmt/<str:unit_name>/<str:month_filter>/generate/", views.generate_ipmt_ai_summary, name="generate_ipmt_ai_summary"),
 ]
@@ -1,13 +1,61 @@
 # apps/ai_service/utils.py
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
-from apps.gso_requests.models import ServiceRequest, TaskReport  # ✅ Import models for richer prompts
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from apps.gso_requests.models import ServiceRequest  # ✅ Import models for richer prompts
 
 # -------------------------------
 # Local AI Model Config
 # -------------------------------
 AI_API_URL = os.getenv("AI_API_URL", "http://127.0.0.1:8001/v1/generate")
 AI_API_KEY = os.getenv("AI_API_KEY", "mysecretkey")
+AI_ERROR_PREFIX = "[AI Error]"
+ELLIPSIS = "…"
+
+_session_lock = threading.Lock()
+_session = None
+_admission = None
+
+
+def get_ai_session():
+    """Shared HTTP session so concurrent calls reuse up to AI_MAX_CONCURRENCY keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.AI_MAX_CONCURRENCY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def get_admission():
+    """
+    Process-wide semaphore of AI_MAX_CONCURRENCY slots, held for every call to
+    the server. Pools nested inside pools (e.g. IPMT groups summarized in
+    parallel, each in parallel chunks) still never exceed the limit.
+    """
+    global _admission
+    with _session_lock:
+        if _admission is None:
+            _admission = threading.BoundedSemaphore(settings.AI_MAX_CONCURRENCY)
+        return _admission
+
+
+def is_ai_error(text: str) -> bool:
+    return not text or text.startswith(AI_ERROR_PREFIX)
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """SHA-256 of a prompt. Same inputs, same fingerprint, so the model's answer can be reused."""
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
 
 # -------------------------------
 # Query Local Private Model
@@ -18,79 +66,116 @@ def query_local_ai(prompt: str) -> str:
     and return the generated text.
     """
     try:
-        response = requests.post(
-            AI_API_URL,
-            headers={
-                "Content-Type": "application/json",
-                "x-api-key": AI_API_KEY,
-            },
-            json={"prompt": prompt},
-            timeout=120,
-        )
+        with get_admission():
+            response = get_ai_session().post(
+                AI_API_URL,
+                headers={
+                    "Content-Type": "application/json",
+                    "x-api-key": AI_API_KEY,
+                },
+                json={"prompt": prompt},
+                timeout=120,
+            )
         response.raise_for_status()
         data = response.json()
         return data.get("result", "").strip()
     except Exception as e:
-        return f"[AI Error] {e}"
+        return f"{AI_ERROR_PREFIX} {e}"
+
+
+def query_local_ai_many(prompts, max_workers=None, on_result=None):
+    """
+    Run several prompts with at most `max_workers` (default AI_MAX_CONCURRENCY)
+    in flight, since the inference server runs one model process per call.
+    Calls on_result(prompt, text) as each finishes; returns {prompt: text}.
+    """
+    prompts = list(dict.fromkeys(prompts))
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or settings.AI_MAX_CONCURRENCY) as pool:
+        futures = {pool.submit(query_local_ai, prompt): prompt for prompt in prompts}
+        for future in as_completed(futures):
+            prompt = futures[future]
+            results[prompt] = future.result()
+            if on_result:
+                on_result(prompt, results[prompt])
+    return results
 
 # -------------------------------
 # Enhanced WAR Description Generator
 # -------------------------------
+NO_DESCRIPTION = "No description provided."
+NO_REPORTS = "No personnel reports available."
+
+
+def _war_prompt(requestor_description, reports_str):
+    return (
+        "You are an AI that generates short, professional government work logs.\n\n"
+        f"Requestor description:\n{requestor_description}\n\n"
+        f"Personnel task reports:\n{reports_str}\n\n"
+        "Write ONE concise sentence that summarizes the accomplishment clearly and factually. "
+        "Do not include names or personnel, focus only on the task performed. "
+        "Keep it formal, brief, and specific."
+    )
+
+
+def _shorten(text, limit):
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + ELLIPSIS
+
+
+def build_war_prompt(request_obj: ServiceRequest) -> str:
+    """
+    Prompt for a WAR description: the requestor's description plus every
+    personnel task report (request_obj.reports, so callers can prefetch it).
+    Long inputs are cut down to fit AI_MAX_PROMPT_CHARS: the description to
+    at most half of the room left by the fixed text, the reports to the rest,
+    in order, until it runs out.
+    """
+    requestor_description = (
+        request_obj.description.strip() if request_obj.description else NO_DESCRIPTION
+    )
+    report_texts = [r.report_text.strip() for r in request_obj.reports.all() if r.report_text.strip()]
+
+    room = settings.AI_MAX_PROMPT_CHARS - len(_war_prompt("", ""))
+    if room < 2 * len(NO_REPORTS):
+        raise ValueError(f"AI_MAX_PROMPT_CHARS={settings.AI_MAX_PROMPT_CHARS} leaves no room for the WAR inputs")
+    if not report_texts:
+        return _war_prompt(_shorten(requestor_description, room - len(NO_REPORTS)), NO_REPORTS)
+
+    requestor_description = _shorten(requestor_description, room // 2)
+    room -= len(requestor_description)
+    lines = []
+    for text in report_texts:
+        # Each line after the first also costs its newline; stop once only a stub would fit
+        room -= bool(lines)
+        if room < len("- …") + 8:
+            break
+        lines.append(_shorten(f"- {text}", room))
+        room -= len(lines[-1])
+    return _war_prompt(requestor_description, "\n".join(lines))
+
+
 def generate_war_description(request_obj: ServiceRequest) -> str:
     """
-    Generate a professional, two-sentence Work Accomplishment Report (WAR) description
-    using the local AI model. The first sentence summarizes the task done concisely,
-    and the second adds brief supporting detail if available.
+    Generate a professional one-sentence Work Accomplishment Report (WAR)
+    description for a completed request using the local AI model.
     """
     try:
-        # --- Gather base info ---
-        activity_name = getattr(request_obj, "activity_name", "Service Request")
-        unit = request_obj.unit.name if request_obj.unit else "General Services"
-        requestor_description = (
-            request_obj.description.strip() if request_obj.description else "No description provided."
-        )
-
-        # --- Gather personnel info ---
-        personnel_names = [p.get_full_name() or p.username for p in request_obj.assigned_personnel.all()]
-        personnel_str = ", ".join(personnel_names) if personnel_names else "N/A"
-
-        # --- Gather task reports ---
-        task_reports = TaskReport.objects.filter(request=request_obj)
-        report_texts = [r.report_text.strip() for r in task_reports if r.report_text.strip()]
-        reports_str = "\n".join([f"- {txt}" for txt in report_texts]) or "No personnel reports available."
-
-        # --- Build detailed prompt ---
-        prompt = (
-                    "You are an AI that generates short, professional government work logs.\n\n"
-                    f"Requestor description:\n{requestor_description}\n\n"
-                    f"Personnel task reports:\n{reports_str}\n\n"
-                    "Write ONE concise sentence that summarizes the accomplishment clearly and factually. "
-                    "Do not include names or personnel, focus only on the task performed. "
-                    "Keep it formal, brief, and specific."
-                )
-
-        # --- Query AI model ---
-        return query_local_ai(prompt)
-
+        return query_local_ai(build_war_prompt(request_obj))
     except Exception as e:
-        return f"[AI Error] Failed to generate WAR: {e}"
+        return f"{AI_ERROR_PREFIX} Failed to generate WAR: {e}"
 
 # -------------------------------
 # IPMT Summary Generator
 # -------------------------------
-def generate_ipmt_summary(success_indicator: str, war_descriptions: list) -> str:
+def generate_ipmt_summary(success_indicator: str, war_descriptions: list, force: bool = False) -> str:
     """
     Generate a summary statement for a given Success Indicator
     based on multiple WARs, using the local AI model.
+    Long lists are summarized in chunks that fit the server's prompt limit
+    and then combined (see summarize.py). Every step is cached by prompt
+    fingerprint, so refreshing an unchanged IPMT costs no inference;
+    force=True asks the model again.
     """
-    if not war_descriptions:
-        return f"No accomplishments recorded for indicator: {success_indicator}."
-
-    activities_text = "\n".join([f"- {desc}" for desc in war_descriptions])
-    prompt = (
-        f"Summarize the following accomplishments for the success indicator '{success_indicator}':\n\n"
-        f"{activities_text}\n\n"
-        "Write in a concise, factual way about what was achieved."
-    )
+    from .summarize import summarize_descriptions
 
-    return query_local_ai(prompt)
+    return summarize_descriptions(success_indicator, war_descriptions, force=force)
@@ -1,10 +1,15 @@
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
 from .models import AIReportSummary
 from apps.gso_reports.models import WorkAccomplishmentReport
-from .tasks import generate_war_description, generate_ipmt_summary
+from core.reference_data import get_unit_by_name
+from .ipmt import start_ipmt_summary_job
+from .regeneration import queue_war_descriptions
 
 
 @login_required
@@ -29,12 +34,13 @@ def ai_summary_detail(request, report_id):
 @login_required
 def generate_ai_summary(request, report_id):
     """
-    Trigger Celery task to generate AI summary for a WAR.
+    Generate an AI summary for a WAR in the background. Unchanged inputs are
+    skipped unless the form posts force=1.
     """
     report = get_object_or_404(WorkAccomplishmentReport, id=report_id)
 
     if request.method == "POST":
-        generate_war_description.delay(report.id)  # async task
+        queue_war_descriptions([report.id], force=bool(request.POST.get("force")), user=request.user)
         messages.success(request, f"AI summary generation started for WAR #{report.id}.")
         return redirect("ai_service:ai_summary_detail", report_id=report.id)
 
@@ -44,28 +50,22 @@ def generate_ai_summary(request, report_id):
 @login_required
 def generate_ipmt_ai_summary(request, unit_name, month_filter):
     """
-    Trigger Celery task to generate AI summary for IPMT.
-    Now works directly on IPMT rows rather than drafts.
+    Start (or rejoin) the background job that generates AI summaries for an
+    IPMT, then return to the preview, which shows its progress.
     """
-    from apps.gso_reports.utils import collect_ipmt_reports
-
     try:
         year, month_num = map(int, month_filter.split("-"))
     except ValueError:
         messages.error(request, "Invalid month format. Use YYYY-MM.")
         return redirect("gso_reports:preview_ipmt")
 
-    reports = collect_ipmt_reports(year, month_num, unit_name)
+    unit = get_unit_by_name(unit_name)
+    if not unit:
+        messages.error(request, f"Unit {unit_name} not found.")
+        return redirect("gso_reports:preview_ipmt")
 
     if request.method == "POST":
-        # Assuming generate_ipmt_summary can accept multiple rows
-        report_ids = [r["war_id"] for r in reports if r["war_id"]]
-        generate_ipmt_summary.delay(report_ids)
+        start_ipmt_summary_job(unit, f"{year:04d}-{month_num:02d}", request.user, force=bool(request.POST.get("force")))
         messages.success(request, f"AI summary generation started for IPMT {unit_name} {month_filter}.")
-        return redirect("gso_reports:preview_ipmt")
 
-    return render(request, "ai_service/generate_ipmt_summary.html", {
-        "unit_name": unit_name,
-        "month_filter": month_filter,
-        "reports": reports,
-    })
+    return redirect(f"{reverse('gso_reports:preview_ipmt')}?{urlencode({'unit': unit.name, 'month': month_filter})}")
@@ -1,4 +1,11 @@
 from django.contrib import admin
-from .models import InventoryItem
+from .models import InventoryItem, LowStockAlert
 
 admin.site.register(InventoryItem)
+
+
+@admin.register(LowStockAlert)
+class LowStockAlertAdmin(admin.ModelAdmin):
+    list_display = ('item', 'unit', 'quantity', 'reorder_level', 'created_at', 'notified_at', 'resolved_at')
+    list_filter = ('unit',)
+    readonly_fields = ('created_at',)
@@ -0,0 +1,126 @@
+# apps/gso_inventory/forecasting.py
+import datetime
+import time
+
+import numpy as np
+from django.db import transaction
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.gso_requests.models import RequestMaterial
+from .models import InventoryItem, MaterialForecast
+
+# -------------------------------
+# Forecast Config
+# -------------------------------
+HISTORY_WEEKS = 26
+SMOOTHING_ALPHA = 0.3
+
+
+# -------------------------------
+# Consumption History
+# -------------------------------
+def load_weekly_consumption(weeks=HISTORY_WEEKS, today=None):
+    """
+    Build an (items × weeks) matrix of quantities used on completed requests,
+    oldest week first. Every active item gets a row, even with no usage.
+    Returns (item_ids, owner_unit_ids, quantities_on_hand, matrix).
+    """
+    today = today or timezone.localdate()
+    start = today - datetime.timedelta(weeks=weeks)
+
+    items = np.array(
+        list(InventoryItem.objects.filter(is_active=True).order_by("id").values_list("id", "owned_by_id", "quantity")),
+        dtype=object,
+    ).reshape(-1, 3)
+    item_ids = items[:, 0].astype(np.int64)
+    matrix = np.zeros((len(item_ids), weeks))
+    if not len(item_ids):
+        return item_ids, items[:, 1], items[:, 2].astype(float), matrix
+
+    usage = (
+        RequestMaterial.objects.filter(request__status="Completed", material__is_active=True)
+        .annotate(used_on=TruncDate(Coalesce("request__completed_at", "request__created_at")))
+        .filter(used_on__gte=start, used_on__lt=today)
+        .values_list("material_id", "used_on", "quantity")
+    )
+    rows = list(usage)
+    if rows:
+        material_ids, used_on, quantities = zip(*rows)
+        days = (np.array(used_on, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+        positions = np.searchsorted(item_ids, np.array(material_ids, dtype=np.int64))
+        np.add.at(matrix, (positions, days // 7), np.array(quantities, dtype=float))
+
+    return item_ids, items[:, 1], items[:, 2].astype(float), matrix
+
+
+# -------------------------------
+# Vectorized Smoothing
+# -------------------------------
+def smooth_consumption(matrix, alpha=SMOOTHING_ALPHA) -> np.ndarray:
+    """
+    Simple exponential smoothing of every row at once. The recursive level
+    l_t = α·x_t + (1-α)·l_{t-1}, seeded with the oldest week, unrolls into a
+    fixed weight vector, so the whole fit is a single matrix-vector product.
+    """
+    weeks = matrix.shape[1]
+    if not weeks:
+        return np.zeros(matrix.shape[0])
+    decay = (1 - alpha) ** np.arange(weeks - 1, -1, -1)
+    weights = alpha * decay
+    weights[0] = decay[0]
+    return matrix @ weights
+
+
+def days_until_stockout(quantities, weekly_usage) -> np.ndarray:
+    """Days of stock left at the forecast rate; NaN where nothing is being consumed."""
+    daily = weekly_usage / 7
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(daily > 0, quantities / daily, np.nan)
+
+
+# -------------------------------
+# Nightly Refresh
+# -------------------------------
+def refresh_material_forecasts(weeks=HISTORY_WEEKS, alpha=SMOOTHING_ALPHA):
+    """Recompute forecasts for all active items and replace the cached table."""
+    started = time.perf_counter()
+    item_ids, unit_ids, quantities, matrix = load_weekly_consumption(weeks=weeks)
+
+    weekly_usage = smooth_consumption(matrix, alpha=alpha)
+    stockout = days_until_stockout(quantities, weekly_usage)
+
+    # Weeks since the first recorded use, so a new item's forecast can be read with care
+    used = matrix > 0
+    history = np.where(used.any(axis=1), weeks - used.argmax(axis=1), 0)
+
+    computed_at = timezone.now()
+    forecasts = [
+        MaterialForecast(
+            item_id=int(item_id),
+            unit_id=unit_id,
+            weekly_usage=round(float(usage), 2),
+            days_until_stockout=None if np.isnan(days) else round(float(days), 1),
+            weeks_of_history=int(weeks_used),
+            computed_at=computed_at,
+        )
+        for item_id, unit_id, usage, days, weeks_used in zip(item_ids, unit_ids, weekly_usage, stockout, history)
+    ]
+
+    with transaction.atomic():
+        MaterialForecast.objects.exclude(item_id__in=item_ids.tolist()).delete()
+        MaterialForecast.objects.bulk_create(
+            forecasts,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["item"],
+            update_fields=["unit", "weekly_usage", "days_until_stockout", "weeks_of_history", "computed_at"],
+        )
+
+    at_risk = int(np.sum(stockout <= 14))
+    return {
+        "items": len(forecasts),
+        "consuming": int(np.sum(weekly_usage > 0)),
+        "stockout_within_14_days": at_risk,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from apps.gso_inventory.forecasting import refresh_material_forecasts, HISTORY_WEEKS, SMOOTHING_ALPHA
+
+
+class Command(BaseCommand):
+    help = "Rebuild the material consumption forecasts shown on the inventory pages (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--weeks", type=int, default=HISTORY_WEEKS, help="Weeks of request history to fit.")
+        parser.add_argument("--alpha", type=float, default=SMOOTHING_ALPHA, help="Exponential smoothing factor (0-1).")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("Refreshing material forecasts..."))
+
+        stats = refresh_material_forecasts(weeks=options["weeks"], alpha=options["alpha"])
+
+        self.stdout.write(
+            f"{stats['consuming']} of {stats['items']} items in use, "
+            f"{stats['stockout_within_14_days']} expected to run out within 14 days."
+        )
+        self.stdout.write(self.style.SUCCESS(f"Forecasts refreshed in {stats['seconds']}s."))
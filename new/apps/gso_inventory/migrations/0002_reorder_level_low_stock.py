@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('gso_inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('reorder_level', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='reorder_level',
+            field=models.PositiveIntegerField(default=10, help_text='Stock at or below this quantity is reported as low stock'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('reorder_level'))), fields=['owned_by', 'quantity'], name='inventory_low_stock_idx'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='gso_inventory.inventoryitem'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='unit',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='gso_accounts.unit'),
+        ),
+        migrations.AddConstraint(
+            model_name='lowstockalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('item',), name='one_open_low_stock_alert_per_item'),
+        ),
+    ]
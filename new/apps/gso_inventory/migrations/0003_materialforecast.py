@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('gso_inventory', '0002_reorder_level_low_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterialForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekly_usage', models.FloatField(default=0, help_text='Smoothed units consumed per week')),
+                ('days_until_stockout', models.FloatField(blank=True, help_text='Empty when the item is not being consumed', null=True)),
+                ('weeks_of_history', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='gso_inventory.inventoryitem')),
+                ('unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='gso_accounts.unit')),
+            ],
+        ),
+    ]
@@ -1,4 +1,7 @@
+import datetime
+
 from django.db import models
+from django.db.models import F, Q
 from apps.gso_accounts.models import Unit
 
 
@@ -6,6 +9,10 @@ class InventoryItem(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     quantity = models.PositiveIntegerField(default=0)
+    reorder_level = models.PositiveIntegerField(
+        default=10,
+        help_text="Stock at or below this quantity is reported as low stock"
+    )
     unit_of_measurement = models.CharField(
         max_length=50,
         default="pcs",
@@ -24,5 +31,64 @@ class InventoryItem(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Only items at or below their reorder level are indexed, so low-stock
+            # lookups stay small no matter how large the catalogue grows.
+            models.Index(
+                fields=["owned_by", "quantity"],
+                name="inventory_low_stock_idx",
+                condition=Q(quantity__lte=F("reorder_level")),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.quantity} {self.unit_of_measurement})"
+
+    @property
+    def is_low_stock(self):
+        return self.quantity <= self.reorder_level
+
+
+class LowStockAlert(models.Model):
+    """An item that dropped to its reorder level. Stays open until the item is restocked."""
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name="low_stock_alerts")
+    unit = models.ForeignKey(Unit, on_delete=models.SET_NULL, null=True, blank=True)
+    quantity = models.PositiveIntegerField()
+    reorder_level = models.PositiveIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item"],
+                condition=Q(resolved_at__isnull=True),
+                name="one_open_low_stock_alert_per_item",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Low stock: {self.item.name} ({self.quantity}/{self.reorder_level})"
+
+
+class MaterialForecast(models.Model):
+    """Nightly consumption forecast for one item, rebuilt by `refresh_material_forecasts`."""
+    item = models.OneToOneField(InventoryItem, on_delete=models.CASCADE, related_name="forecast")
+    unit = models.ForeignKey(Unit, on_delete=models.SET_NULL, null=True, blank=True)
+    weekly_usage = models.FloatField(default=0, help_text="Smoothed units consumed per week")
+    days_until_stockout = models.FloatField(null=True, blank=True, help_text="Empty when the item is not being consumed")
+    weeks_of_history = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Forecast for {self.item.name}"
+
+    @property
+    def stockout_date(self):
+        if self.days_until_stockout is None:
+            return None
+        return (self.computed_at + datetime.timedelta(days=self.days_until_stockout)).date()
@@ -1,3 +1,180 @@
-from django.test import TestCase
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from apps.notifications.models import Notification
+from core.testing import QueryBudgetMixin, seed_sample_data
+from .forecasting import days_until_stockout, smooth_consumption
+from .models import InventoryItem, LowStockAlert
+from .utils import notify_low_stock, sync_low_stock_alerts
+from .views import INVENTORY_PAGE_SIZE
+
+
+# -------------------------------
+# Query Budgets
+# -------------------------------
+class InventoryViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Inventory pages must stay within their @query_budget regardless of row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=30)
+
+    def test_gso_inventory(self):
+        self.client.force_login(self.users["gso"])
+        self.assertWithinQueryBudget(reverse("gso_inventory:gso_inventory"))
+
+    def test_unit_head_inventory(self):
+        self.client.force_login(self.users["unit_head"])
+        self.assertWithinQueryBudget(reverse("gso_inventory:unit_head_inventory"))
+
+    def test_personnel_inventory(self):
+        self.client.force_login(self.users["personnel"])
+        self.assertWithinQueryBudget(reverse("gso_inventory:personnel_inventory"))
+
+
+# -------------------------------
+# Paginated List and On-Demand Edit Form
+# -------------------------------
+class InventoryListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=0)
+        InventoryItem.objects.bulk_create([
+            InventoryItem(name=f"Bulk item {i:03}", quantity=5, category="Bulk") for i in range(INVENTORY_PAGE_SIZE)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.users["gso"])
+
+    def test_list_is_paginated(self):
+        first = self.client.get(reverse("gso_inventory:gso_inventory"), HTTP_HOST="127.0.0.1")
+        last = self.client.get(reverse("gso_inventory:gso_inventory"), {"page": 2}, HTTP_HOST="127.0.0.1")
+
+        self.assertEqual(len(first.context["page_obj"]), INVENTORY_PAGE_SIZE)
+        self.assertEqual(first.context["page_obj"].paginator.count, InventoryItem.objects.count())
+        self.assertEqual(len(last.context["page_obj"]), 10)
+        # Rows link to their edit form instead of rendering one each
+        self.assertContains(first, 'data-form-url="/gso_inventory/gso/form/', count=INVENTORY_PAGE_SIZE)
+        self.assertNotContains(first, "/gso_inventory/gso/update/")
+
+    def test_edit_form_is_rendered_per_item(self):
+        item = InventoryItem.objects.get(name="Material 3")
+        response = self.client.get(reverse("gso_inventory:inventory_item_form", args=[item.id]), HTTP_HOST="127.0.0.1")
+
+        self.assertContains(response, reverse("gso_inventory:update_inventory_item", args=[item.id]))
+        self.assertContains(response, 'value="Material 3"')
+
+    def test_edit_form_requires_gso_or_director(self):
+        item = InventoryItem.objects.first()
+        self.client.force_login(self.users["personnel"])
+        response = self.client.get(reverse("gso_inventory:inventory_item_form", args=[item.id]), HTTP_HOST="127.0.0.1")
+
+        self.assertEqual(response.status_code, 302)
+
+
+# -------------------------------
+# Low-Stock Alerts
+# -------------------------------
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class LowStockAlertTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=0)
+        cls.wire, cls.bulb = InventoryItem.objects.filter(name__in=["Material 0", "Material 1"]).order_by("name")
+
+    def set_stock(self, *quantities):
+        items = [self.wire, self.bulb][:len(quantities)]
+        for item, quantity in zip(items, quantities):
+            item.quantity = quantity
+            item.save(update_fields=["quantity"])
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_low_stock_alerts(items)
+
+    def head_notifications(self):
+        return Notification.objects.filter(user=self.users["unit_head"])
+
+    def test_alert_opens_at_reorder_level_and_closes_on_restock(self):
+        self.set_stock(11)
+        self.assertFalse(LowStockAlert.objects.exists())
+
+        self.set_stock(10)
+        alert = LowStockAlert.objects.get()
+        self.assertEqual((alert.quantity, alert.reorder_level, alert.unit_id), (10, 10, self.wire.owned_by_id))
+
+        self.set_stock(4)
+        alert.refresh_from_db()
+        self.assertEqual((LowStockAlert.objects.count(), alert.quantity), (1, 4))
+
+        self.set_stock(11)
+        alert.refresh_from_db()
+        self.assertIsNotNone(alert.resolved_at)
+
+        self.set_stock(2)
+        self.assertEqual(LowStockAlert.objects.filter(resolved_at__isnull=True).count(), 1)
+        self.assertEqual(LowStockAlert.objects.count(), 2)
+
+    def test_unit_head_is_notified_once_per_alert(self):
+        self.set_stock(3, 5)
+        notification = self.head_notifications().get()
+        self.assertIn("Material 0 (3 pcs left, reorder at 10)", notification.message)
+        self.assertIn("Material 1 (5 pcs left", notification.message)
+
+        # Still low, or a later run: nothing new to say
+        self.set_stock(2, 4)
+        self.assertEqual(notify_low_stock(), 0)
+        self.assertEqual(self.head_notifications().count(), 1)
+
+        # Restocked and low again is a new alert
+        self.set_stock(50)
+        self.set_stock(1)
+        self.assertEqual(self.head_notifications().count(), 2)
+
+    def test_item_added_below_reorder_level_opens_an_alert(self):
+        self.client.force_login(self.users["gso"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("gso_inventory:add_inventory_item"), {
+                "name": "Fuse", "category": "Electrical", "quantity": 2, "reorder_level": 5,
+                "unit_of_measurement": "pcs", "owned_by": self.wire.owned_by_id,
+            })
+
+        alert = LowStockAlert.objects.get(item__name="Fuse")
+        self.assertEqual((alert.quantity, alert.reorder_level), (2, 5))
+        self.assertIn("Fuse (2 pcs left, reorder at 5)", self.head_notifications().get().message)
+
+
+# -------------------------------
+# Consumption Forecasts
+# -------------------------------
+class ForecastSmoothingTests(SimpleTestCase):
+
+    def smooth_row(self, series, alpha):
+        """Textbook simple exponential smoothing, one week at a time."""
+        level = series[0]
+        for value in series[1:]:
+            level = alpha * value + (1 - alpha) * level
+        return level
+
+    def test_vectorized_smoothing_matches_the_recursion(self):
+        matrix = np.array([
+            [4, 0, 6, 2, 0, 9],
+            [0, 0, 0, 0, 0, 0],
+            [1, 1, 1, 1, 1, 1],
+            [0, 0, 0, 0, 0, 12],
+        ], dtype=float)
+
+        for alpha in (0.1, 0.3, 0.9):
+            expected = [self.smooth_row(row, alpha) for row in matrix]
+            np.testing.assert_allclose(smooth_consumption(matrix, alpha), expected)
+
+    def test_single_week_and_no_history(self):
+        np.testing.assert_allclose(smooth_consumption(np.array([[5.0], [0.0]])), [5.0, 0.0])
+        self.assertEqual(smooth_consumption(np.zeros((3, 0))).tolist(), [0.0, 0.0, 0.0])
+
+    def test_days_until_stockout(self):
+        days = days_until_stockout(np.array([14.0, 5.0]), np.array([7.0, 0.0]))
+
+        self.assertEqual(days[0], 14.0)
+        self.assertTrue(np.isnan(days[1]))
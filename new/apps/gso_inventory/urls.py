@@ -7,6 +7,7 @@ urlpatterns = [
     # GSO Inventory
     path('gso/', views.gso_inventory, name='gso_inventory'),
     path('gso/add/', views.add_inventory_item, name='add_inventory_item'),
+    path('gso/form/<int:item_id>/', views.inventory_item_form, name='inventory_item_form'),
     path('gso/update/<int:item_id>/', views.update_inventory_item, name='update_inventory_item'),
     path('gso/remove/<int:item_id>/', views.remove_inventory_item, name='remove_inventory_item'),
 
@@ -0,0 +1,90 @@
+# gso_inventory/utils.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.gso_accounts.models import User
+from apps.notifications.models import Notification
+from apps.notifications.services import create_notifications
+from .models import LowStockAlert
+
+
+# -------------------------------
+# Low-Stock Alerts
+# -------------------------------
+def sync_low_stock_alerts(items):
+    """
+    Open or resolve low-stock alerts for items whose quantity just changed.
+    Call it inside the transaction that changed the stock, so the feed never
+    disagrees with the inventory; unit heads are notified once it commits.
+    """
+    items = {item.id: item for item in items}
+    if not items:
+        return
+
+    open_alerts = {
+        alert.item_id: alert
+        for alert in LowStockAlert.objects.filter(item_id__in=items, resolved_at__isnull=True)
+    }
+
+    new_alerts, changed_alerts, resolved_ids = [], [], []
+    for item in items.values():
+        alert = open_alerts.get(item.id)
+        if item.is_low_stock:
+            if alert is None:
+                new_alerts.append(LowStockAlert(
+                    item=item,
+                    unit_id=item.owned_by_id,
+                    quantity=item.quantity,
+                    reorder_level=item.reorder_level,
+                ))
+            elif alert.quantity != item.quantity:
+                alert.quantity = item.quantity
+                changed_alerts.append(alert)
+        elif alert is not None:
+            resolved_ids.append(alert.id)
+
+    if new_alerts:
+        # An alert opened by a concurrent sync wins; the open-alert constraint drops ours
+        LowStockAlert.objects.bulk_create(new_alerts, ignore_conflicts=True)
+        transaction.on_commit(notify_low_stock)
+    if changed_alerts:
+        LowStockAlert.objects.bulk_update(changed_alerts, ["quantity"])
+    if resolved_ids:
+        LowStockAlert.objects.filter(id__in=resolved_ids).update(resolved_at=timezone.now())
+
+
+def notify_low_stock():
+    """
+    Send every pending low-stock alert to the head of the owning unit, one
+    notification per unit head however many items dropped at once.
+    """
+    with transaction.atomic():
+        pending = list(
+            LowStockAlert.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(notified_at__isnull=True, resolved_at__isnull=True, unit__isnull=False)
+            .select_related("item")
+            .order_by("item__name")
+        )
+        if not pending:
+            return 0
+
+        alerts_by_unit = defaultdict(list)
+        for alert in pending:
+            alerts_by_unit[alert.unit_id].append(alert)
+
+        link = reverse("gso_inventory:unit_head_inventory")
+        notifications = []
+        unit_heads = User.objects.filter(role="unit_head", unit_id__in=alerts_by_unit, is_active=True)
+        for head in unit_heads:
+            items = ", ".join(
+                f"{alert.item.name} ({alert.quantity} {alert.item.unit_of_measurement} left, reorder at {alert.reorder_level})"
+                for alert in alerts_by_unit[head.unit_id]
+            )
+            notifications.append(Notification(user=head, message=f"⚠️ Low stock: {items}", link=link))
+
+        create_notifications(notifications)
+        LowStockAlert.objects.filter(id__in=[alert.id for alert in pending]).update(notified_at=timezone.now())
+        return len(notifications)
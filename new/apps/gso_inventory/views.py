@@ -1,10 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
-from apps.gso_accounts.models import Unit, User
+from django.core.paginator import Paginator
+from apps.gso_accounts.models import User
+from django.db import transaction
 from django.db.models import Q
+from core.query_budget import query_budget
+from core.reference_data import get_units
 from .models import InventoryItem
 from .forms import InventoryItemForm
+from .utils import sync_low_stock_alerts
 
+INVENTORY_PAGE_SIZE = 50
 
 
 
@@ -29,6 +35,7 @@ def can_access_inventory(user):
 # -------------------------------
 # GSO / Director Inventory Views
 # -------------------------------
+@query_budget(queries=10)
 @login_required
 @user_passes_test(can_access_inventory)
 def gso_inventory(request):
@@ -47,23 +54,38 @@ def gso_inventory(request):
             Q(description__icontains=query)
         )
 
-    items = items.order_by("name")
+    # Only the columns shown in the table; edit forms are loaded per item on demand
+    items = items.select_related("owned_by", "forecast").only(
+        "id", "name", "quantity", "reorder_level", "unit_of_measurement", "category", "owned_by", "owned_by__name",
+        "forecast__weekly_usage", "forecast__days_until_stockout", "forecast__computed_at",
+    ).order_by("name", "id")
+    page_obj = Paginator(items, INVENTORY_PAGE_SIZE).get_page(request.GET.get("page"))
+
     categories = InventoryItem.objects.values_list("category", flat=True).distinct()
     form = InventoryItemForm()
-    forms_per_item = {item.id: InventoryItemForm(instance=item) for item in items}
 
     context = {
-        "inventory_items": items,
+        "inventory_items": page_obj,
+        "page_obj": page_obj,
         "categories": categories,
         "selected_category": category,
         "search_query": query,
         "form": form,
-        "forms_per_item": forms_per_item,
-        "units": Unit.objects.all(),
     }
     return render(request, "gso_office/inventory/gso_inventory.html", context)
 
 
+@login_required
+@user_passes_test(can_access_inventory)
+def inventory_item_form(request, item_id):
+    """Render the edit form for a single inventory item (loaded into the edit modal)."""
+    item = get_object_or_404(InventoryItem.objects.select_related("owned_by"), id=item_id)
+    return render(request, "gso_office/partials/inventory_edit_form.html", {
+        "item": item,
+        "units": get_units(),
+    })
+
+
 @login_required
 @user_passes_test(can_access_inventory)
 def add_inventory_item(request):
@@ -71,12 +93,17 @@ def add_inventory_item(request):
     if request.method == "POST":
         form = InventoryItemForm(request.POST)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                item = form.save()
+                sync_low_stock_alerts([item])
         else:
             # Optional: keep user on the same page if form invalid
+            items = InventoryItem.objects.select_related("owned_by").order_by("name", "id")
+            page_obj = Paginator(items, INVENTORY_PAGE_SIZE).get_page(1)
             return render(request, "gso_office/inventory/gso_inventory.html", {
                 "form": form,
-                "inventory_items": InventoryItem.objects.all(),
+                "inventory_items": page_obj,
+                "page_obj": page_obj,
             })
     return redirect("gso_inventory:gso_inventory")
 
@@ -87,9 +114,13 @@ def update_inventory_item(request, item_id):
     """Update an existing inventory item."""
     item = get_object_or_404(InventoryItem, id=item_id)
     if request.method == "POST":
-        form = InventoryItemForm(request.POST, instance=item)
-        if form.is_valid():
-            form.save()
+        with transaction.atomic():
+            # Lock the row so a concurrent stock change cannot race this alert sync
+            item = InventoryItem.objects.select_for_update().get(id=item.id)
+            form = InventoryItemForm(request.POST, instance=item)
+            if form.is_valid():
+                item = form.save()
+                sync_low_stock_alerts([item])
     return redirect("gso_inventory:gso_inventory")
 
 
@@ -114,6 +145,7 @@ def remove_inventory_item(request, item_id):
 # -------------------------------
 # Unit Head Inventory
 # -------------------------------
+@query_budget(queries=8)
 @login_required
 def unit_head_inventory(request):
     user = request.user  # Current logged-in unit head
@@ -131,7 +163,7 @@ def unit_head_inventory(request):
         inventory_items = InventoryItem.objects.none()
     else:
         # ✅ Show only inventory belonging to this unit
-        inventory_items = InventoryItem.objects.filter(owned_by=unit, is_active=True)
+        inventory_items = InventoryItem.objects.filter(owned_by=unit, is_active=True).select_related("forecast")
 
     # --- Filters ---
     search_query = request.GET.get("q", "")
@@ -185,6 +217,7 @@ def unit_head_inventory(request):
 # -------------------------------
 # Personnel Inventory (placeholder)
 # -------------------------------
+@query_budget(queries=6)
 @login_required
 def personnel_inventory(request):
     # Currently personnel cannot see inventory
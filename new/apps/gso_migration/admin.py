@@ -1,27 +1,55 @@
 # gso_migration/admin.py
 from django.contrib import admin
+from core.jobs import running_now
 from .models import MigrationUpload
-from .utils import migrate_excel
+from .tasks import start_migration_upload
+
+PROGRESS_FIELDS = (
+    'status', 'total_rows', 'rows_read', 'rows_imported', 'rows_updated', 'rows_unchanged', 'rows_failed',
+    'rows_per_second', 'eta_seconds', 'started_at', 'heartbeat_at', 'finished_at',
+)
+
 
 @admin.register(MigrationUpload)
 class MigrationUploadAdmin(admin.ModelAdmin):
-    list_display = ('migration_type', 'target_unit', 'uploaded_by', 'uploaded_at', 'processed')
-    readonly_fields = ('uploaded_at', 'result_message', 'processed', 'uploaded_by')
-    fields = ('migration_type', 'target_unit', 'file', 'uploaded_by', 'uploaded_at', 'processed', 'result_message')
+    list_display = ('migration_type', 'target_unit', 'uploaded_by', 'uploaded_at', 'status', 'progress', 'processed')
+    list_filter = ('status', 'migration_type')
+    readonly_fields = ('uploaded_at', 'result_message', 'processed', 'uploaded_by') + PROGRESS_FIELDS
+    fields = ('migration_type', 'target_unit', 'file', 'uploaded_by', 'uploaded_at', 'processed') + PROGRESS_FIELDS + ('result_message',)
+    actions = ['reprocess_uploads']
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        if obj.is_stale:
+            return "Stalled (no progress reported); re-run it"
+        if obj.status == 'PROCESSING':
+            eta = f", ETA {obj.eta_seconds}s" if obj.eta_seconds is not None else ""
+            return f"{obj.progress_percent}% ({obj.rows_read} rows, {obj.rows_per_second}/s{eta})"
+        if obj.status == 'COMPLETED':
+            return (
+                f"{obj.rows_imported} imported, {obj.rows_updated} updated, "
+                f"{obj.rows_unchanged} unchanged, {obj.rows_failed} failed"
+            )
+        return "—"
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['has_running_uploads'] = MigrationUpload.objects.filter(running_now()).exists()
+        return super().changelist_view(request, extra_context=extra_context)
 
     def save_model(self, request, obj, form, change):
         if not obj.uploaded_by:
             obj.uploaded_by = request.user
         super().save_model(request, obj, form, change)
 
-        if not obj.processed:
-            try:
-                result = migrate_excel(obj.file.path, obj.migration_type, obj.target_unit)
-                obj.result_message = result
-                obj.processed = True
-                obj.save()
-                self.message_user(request, f"✅ {result}")
-            except Exception as e:
-                obj.result_message = f"❌ Error: {str(e)}"
-                obj.save()
-                self.message_user(request, f"❌ Migration failed: {e}", level='error')
+        # Editing other fields of an upload does not import it again
+        if (not change or 'file' in form.changed_data) and start_migration_upload(obj):
+            self.message_user(request, "⏳ Migration started in the background. This page refreshes with its progress.")
+
+    @admin.action(description="Re-run selected migrations")
+    def reprocess_uploads(self, request, queryset):
+        started = sum(start_migration_upload(upload) for upload in queryset)
+        message = f"⏳ {started} migration(s) queued."
+        if started < len(queryset):
+            message += f" {len(queryset) - started} already queued or running were left alone."
+        self.message_user(request, message)
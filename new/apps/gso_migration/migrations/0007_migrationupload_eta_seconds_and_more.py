@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:06
+
+from django.db import migrations, models
+
+
+def mark_processed_uploads(apps, schema_editor):
+    MigrationUpload = apps.get_model('gso_migration', 'MigrationUpload')
+    MigrationUpload.objects.filter(processed=True).update(status='COMPLETED')
+    # Older uploads that never finished were abandoned; do not present them as queued work
+    MigrationUpload.objects.filter(processed=False).update(
+        status='FAILED',
+        result_message='Not imported: uploaded before background processing was added. Re-run it only if the file still needs importing.',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_migration', '0006_migrationupload_target_unit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationupload',
+            name='eta_seconds',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='rows_failed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='rows_imported',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='rows_per_second',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='rows_read',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='total_rows',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated from the worksheet dimensions', null=True),
+        ),
+        migrations.RunPython(mark_processed_uploads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_migration', '0007_migrationupload_eta_seconds_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationupload',
+            name='rows_unchanged',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='migrationupload',
+            name='rows_updated',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_migration', '0008_migrationupload_rows_unchanged_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationupload',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life from the import thread', null=True),
+        ),
+    ]
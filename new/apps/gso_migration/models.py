@@ -2,10 +2,11 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from apps.gso_accounts.models import Unit  # <-- add this import
+from core.jobs import HeartbeatMixin
 
 User = get_user_model()
 
-class MigrationUpload(models.Model):
+class MigrationUpload(HeartbeatMixin, models.Model):
     MIGRATION_TYPE_CHOICES = [
         ('WORK_REPORT', 'Work Accomplishment Report'),
         ('IPMT', 'IPMT Records'),
@@ -21,9 +22,39 @@ class MigrationUpload(models.Model):
     processed = models.BooleanField(default=False)
     result_message = models.TextField(blank=True)
 
+    # Background processing progress
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    total_rows = models.PositiveIntegerField(null=True, blank=True, help_text="Estimated from the worksheet dimensions")
+    rows_read = models.PositiveIntegerField(default=0)
+    rows_imported = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    rows_per_second = models.FloatField(default=0)
+    eta_seconds = models.PositiveIntegerField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life from the import thread")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         verbose_name = "Data Migration"
         verbose_name_plural = "Data Migrations"
 
     def __str__(self):
         return f"{self.get_migration_type_display()} ({self.uploaded_at:%Y-%m-%d})"
+
+    @property
+    def is_running(self):
+        return self.status in ('PENDING', 'PROCESSING')
+
+    @property
+    def progress_percent(self):
+        if not self.total_rows:
+            return 100 if self.status == 'COMPLETED' else 0
+        return min(100, round(self.rows_read * 100 / self.total_rows))
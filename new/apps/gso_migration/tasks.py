@@ -0,0 +1,101 @@
+# gso_migration/tasks.py
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.jobs import claim, heartbeat
+from .models import MigrationUpload
+from .utils import migrate_excel, count_excel_rows
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------
+# Background Upload Processing
+# -------------------------------
+def process_migration_upload(upload_id: int):
+    """
+    Import a MigrationUpload file and record progress on the row after every chunk.
+    Runs outside the admin request, so failures are stored in result_message
+    instead of being raised.
+    """
+    upload = MigrationUpload.objects.select_related("target_unit").get(id=upload_id)
+    uploads = MigrationUpload.objects.filter(id=upload_id)
+
+    try:
+        total_rows = count_excel_rows(upload.file.path)
+        uploads.update(
+            status="PROCESSING",
+            total_rows=total_rows,
+            rows_read=0,
+            rows_imported=0,
+            rows_updated=0,
+            rows_unchanged=0,
+            rows_failed=0,
+            rows_per_second=0,
+            eta_seconds=None,
+            started_at=timezone.now(),
+            finished_at=None,
+        )
+
+        def record_progress(report):
+            throughput = report["rows_read"] / report["seconds"] if report["seconds"] else 0
+            eta = None
+            if total_rows and throughput:
+                eta = max(round((total_rows - report["rows_read"]) / throughput), 0)
+            uploads.update(
+                rows_read=report["rows_read"],
+                rows_imported=report["imported"],
+                rows_updated=report["updated"],
+                rows_unchanged=report["unchanged"],
+                rows_failed=len(report["errors"]),
+                rows_per_second=round(throughput, 1),
+                eta_seconds=eta,
+            )
+
+        with heartbeat(uploads):
+            result = migrate_excel(
+                upload.file.path,
+                upload.migration_type,
+                upload.target_unit,
+                progress=record_progress,
+            )
+        uploads.update(
+            status="COMPLETED",
+            processed=True,
+            result_message=result,
+            eta_seconds=0,
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception("Migration upload #%s failed", upload_id)
+        uploads.update(
+            status="FAILED",
+            result_message=f"❌ Error: {e}",
+            eta_seconds=None,
+            finished_at=timezone.now(),
+        )
+    finally:
+        connection.close()
+
+
+def start_migration_upload(upload: MigrationUpload):
+    """
+    Process an upload in a background thread once the current transaction commits,
+    so the admin POST returns immediately. An upload that is already queued or
+    running (and not stale) is left alone; returns whether it was started.
+    """
+    if not claim(MigrationUpload.objects.filter(id=upload.id)):
+        return False
+
+    def launch():
+        threading.Thread(
+            target=process_migration_upload,
+            args=(upload.id,),
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(launch)
+    return True
@@ -1,3 +1,153 @@
+import datetime
+import os
+import tempfile
+
+import pandas as pd
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.gso_accounts.models import Unit, User
+from apps.gso_inventory.models import InventoryItem
+from apps.gso_reports.models import IPMT, SuccessIndicator, WorkAccomplishmentReport
+from .models import MigrationUpload
+from .tasks import start_migration_upload
+from .utils import import_dataframe, migrate_excel
+
+
+# -------------------------------
+# Natural-Key Upsert
+# -------------------------------
+class NaturalKeyUpsertTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = Unit.objects.create(name="Electrical")
+        cls.personnel = User.objects.create_user("personnel", password="pass", role="personnel", unit=cls.unit)
+        cls.indicator = SuccessIndicator.objects.create(unit=cls.unit, code="CF1", description="Repairs completed")
+
+    def wars(self, **changes):
+        rows = {
+            "control_number": ["C1", "C2"],
+            "activity_name": ["Rewiring", "Lighting"],
+            "description": ["Rewired room 1", "Replaced bulbs"],
+            "date_started": [datetime.date(2025, 1, 2)] * 2,
+            "material_cost": [10, None],
+            "labor_cost": [5, 1],
+        }
+        return pd.DataFrame({**rows, **changes})
+
+    def counts(self, report):
+        return report["imported"], report["updated"], report["unchanged"], report["errors"]
+
+    def test_work_reports_upsert_on_control_number(self):
+        self.assertEqual(self.counts(import_dataframe(self.wars(), "WORK_REPORT", self.unit)), (2, 0, 0, []))
+
+        report = import_dataframe(self.wars(description=["Rewired room 1", "Replaced LED bulbs"]), "WORK_REPORT", self.unit)
+        self.assertEqual(self.counts(report), (0, 1, 1, []))
+        self.assertEqual(WorkAccomplishmentReport.objects.get(control_number="C2").description, "Replaced LED bulbs")
+        self.assertEqual(WorkAccomplishmentReport.objects.count(), 2)
+
+    def test_work_reports_without_control_number_are_always_inserted(self):
+        wars = self.wars(control_number=["C1", None])
+        self.assertEqual(self.counts(import_dataframe(wars, "WORK_REPORT", self.unit)), (2, 0, 0, []))
+        self.assertEqual(self.counts(import_dataframe(wars, "WORK_REPORT", self.unit)), (1, 0, 1, []))
+        self.assertEqual(WorkAccomplishmentReport.objects.filter(control_number__isnull=True).count(), 2)
+
+    def test_inventory_upserts_items_without_a_unit(self):
+        items = pd.DataFrame({"name": ["Wire", "Screw"], "quantity": [3, 10], "unit": [None, "electrical"]})
+        self.assertEqual(self.counts(import_dataframe(items, "INVENTORY")), (2, 0, 0, []))
+        self.assertEqual(self.counts(import_dataframe(items, "INVENTORY")), (0, 0, 2, []))
+
+        report = import_dataframe(items.assign(quantity=[4, 10]), "INVENTORY")
+        self.assertEqual(self.counts(report), (0, 1, 1, []))
+        self.assertEqual(list(InventoryItem.objects.filter(name="Wire").values_list("quantity", "owned_by")), [(4, None)])
+        self.assertEqual(InventoryItem.objects.get(name="Screw").owned_by, self.unit)
+
+    def test_ipmt_upserts_on_personnel_month_and_indicator(self):
+        rows = pd.DataFrame({
+            "personnel": ["personnel", "personnel"], "month": ["Jan 2025", "Feb 2025"],
+            "indicator_id": [self.indicator.id] * 2, "accomplishment": ["x", "y"],
+        })
+        self.assertEqual(self.counts(import_dataframe(rows, "IPMT", self.unit)), (2, 0, 0, []))
+
+        report = import_dataframe(rows.assign(accomplishment=["x", "z"]), "IPMT", self.unit)
+        self.assertEqual(self.counts(report), (0, 1, 1, []))
+        self.assertEqual(IPMT.objects.get(month="Feb 2025").accomplishment, "z")
+
+    def test_unparseable_numbers_are_errors(self):
+        items = pd.DataFrame({"name": ["Wire", "Screw"], "quantity": ["x", None]})
+        report = import_dataframe(items, "INVENTORY", self.unit)
+
+        self.assertEqual(self.counts(report), (1, 0, 0, [(2, "invalid quantity")]))
+        self.assertEqual(InventoryItem.objects.get().quantity, 0)
+
+    def test_reimporting_a_file_changes_nothing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wars.xlsx")
+            self.wars().rename(columns=lambda name: name.replace("_", " ").title()).to_excel(path, index=False)
+
+            self.assertTrue(migrate_excel(path, "WORK_REPORT", self.unit).startswith("2 records imported"))
+            self.assertEqual(
+                migrate_excel(path, "WORK_REPORT", self.unit),
+                "0 records imported successfully. 2 unchanged rows skipped.",
+            )
+
+    def test_duplicate_keys_are_found_across_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wars.xlsx")
+            pd.concat([self.wars(), self.wars().iloc[:1]]).to_excel(path, index=False)
+
+            result = migrate_excel(path, "WORK_REPORT", self.unit, chunk_size=2)
+
+        self.assertIn("Row 4: duplicate control_number in file", result)
+        self.assertEqual(WorkAccomplishmentReport.objects.count(), 2)
+
+
+# -------------------------------
+# Background Uploads
+# -------------------------------
+class MigrationUploadStartTests(TestCase):
+
+    def setUp(self):
+        self.upload = MigrationUpload.objects.create(migration_type="INVENTORY", file="migration_files/items.xlsx")
+
+    def test_queued_or_running_upload_is_not_started_twice(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(start_migration_upload(self.upload))
+            self.assertFalse(start_migration_upload(self.upload))
+            MigrationUpload.objects.filter(pk=self.upload.pk).update(status="PROCESSING")
+            self.assertFalse(start_migration_upload(self.upload))
+
+        self.assertEqual(len(callbacks), 1)
+
+    def test_stalled_upload_can_be_rerun(self):
+        MigrationUpload.objects.filter(pk=self.upload.pk).update(
+            status="PROCESSING", heartbeat_at=timezone.now() - datetime.timedelta(hours=1),
+        )
+        self.upload.refresh_from_db()
+        self.assertTrue(self.upload.is_stale)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(start_migration_upload(self.upload))
+        self.assertEqual(len(callbacks), 1)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, "PENDING")
+        self.assertFalse(self.upload.is_stale)
+
+    def test_editing_an_upload_does_not_import_it_again(self):
+        MigrationUpload.objects.filter(pk=self.upload.pk).update(status="FAILED")
+        admin_user = User.objects.create_superuser("admin", password="pass", role="gso")
+        self.client.force_login(admin_user)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse("admin:gso_migration_migrationupload_change", args=[self.upload.pk]),
+                {"migration_type": "WORK_REPORT", "target_unit": ""},
+                HTTP_HOST="127.0.0.1",
+            )
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(callbacks, [])
+        self.upload.refresh_from_db()
+        self.assertEqual((self.upload.migration_type, self.upload.status), ("WORK_REPORT", "FAILED"))
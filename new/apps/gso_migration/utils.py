@@ -1,7 +1,11 @@
 # gso_migration/utils.py
+import time
 import pandas as pd
+from openpyxl import load_workbook
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import transaction, DatabaseError
+from django.db.models import Q
 from apps.gso_requests.models import ServiceRequest
 from apps.gso_inventory.models import InventoryItem
 from apps.gso_reports.models import WorkAccomplishmentReport, IPMT, SuccessIndicator
@@ -9,100 +13,501 @@ from apps.gso_accounts.models import Unit
 
 User = get_user_model()
 
-def safe_text(value, fallback="N/A"):
-    if pd.isna(value) or str(value).strip() == "":
-        return fallback
-    return str(value).strip()
+DEFAULT_CHUNK_SIZE = getattr(settings, "MIGRATION_CHUNK_SIZE", 1000)
+ERROR_REPORT_LIMIT = 50
+
+
+# -------------------------------
+# Vectorized Column Helpers
+# -------------------------------
+def get_column(df, name):
+    """Return a column by normalized name, or an all-empty column if it is missing."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype="object")
+
+
+def clean_text(series, fallback="N/A"):
+    """Strip text values; blanks and NaN become `fallback` (which may be None)."""
+    text = series.astype("string").str.strip()
+    text = text.mask(text.isna() | (text == ""), fallback)
+    return text.astype("object").where(text.notna(), None)
+
+
+def clean_number(series, errors, name):
+    """Coerce a column to floats. Blanks become 0.0; anything else unparseable is a row error."""
+    numbers = pd.to_numeric(series, errors="coerce")
+    add_error(errors, numbers.isna() & ~is_blank(series), f"invalid {name}")
+    return numbers.fillna(0.0)
+
+
+def clean_date(series):
+    """Coerce a column to `datetime.date`; unparseable values become None."""
+    dates = pd.to_datetime(series, errors="coerce")
+    return dates.dt.date.astype("object").where(dates.notna(), None)
+
+
+def is_blank(series):
+    return series.isna() | (series.astype("string").str.strip() == "")
+
+
+def add_error(errors, mask, message):
+    """Append `message` to the error text of every row where `mask` is True."""
+    errors[mask] = errors[mask] + message + "; "
+
+
+# -------------------------------
+# Lookup Pre-Resolution (one query per table)
+# -------------------------------
+def load_lookups(df, migration_type):
+    units = list(Unit.objects.values_list("id", "name"))
+    lookups = {
+        "units": {name.strip().lower(): pk for pk, name in units},
+        "unit_names": dict(units),
+        "users": {},
+        "indicators": set(),
+    }
+
+    username_column = {"SERVICE_REQUEST": "requestor", "IPMT": "personnel"}.get(migration_type)
+    if username_column and username_column in df.columns:
+        usernames = clean_text(df[username_column], None).dropna().unique().tolist()
+        lookups["users"] = dict(
+            User.objects.filter(username__in=usernames).values_list("username", "id")
+        )
+
+    if migration_type == "IPMT" and "indicator_id" in df.columns:
+        ids = pd.to_numeric(df["indicator_id"], errors="coerce").dropna().astype(int).unique().tolist()
+        lookups["indicators"] = set(
+            SuccessIndicator.objects.filter(id__in=ids).values_list("id", flat=True)
+        )
+
+    return lookups
+
+
+def resolve_unit_ids(df, lookups, target_unit=None):
+    """Map every row to a Unit id (the target unit wins over the 'unit' column)."""
+    if target_unit:
+        return pd.Series(target_unit.id, index=df.index, dtype="Int64")
+    names = clean_text(get_column(df, "unit"), "").str.lower()
+    return names.map(lookups["units"]).astype("Int64")
+
+
+# -------------------------------
+# Per-Type Row Preparation
+# -------------------------------
+def prepare_inventory(df, lookups, target_unit, errors):
+    quantity = clean_number(get_column(df, "quantity"), errors, "quantity")
+    add_error(errors, quantity < 0, "quantity cannot be negative")
+
+    return pd.DataFrame({
+        "name": clean_text(get_column(df, "name")),
+        "description": clean_text(get_column(df, "description"), ""),
+        "quantity": quantity.clip(lower=0).round().astype(int),
+        "unit_of_measurement": clean_text(get_column(df, "unit_of_measurement"), "pcs"),
+        "category": clean_text(get_column(df, "category"), "N/A"),
+        "owned_by_id": resolve_unit_ids(df, lookups, target_unit),
+    }, index=df.index)
+
+
+def prepare_service_request(df, lookups, target_unit, errors):
+    unit_ids = resolve_unit_ids(df, lookups, target_unit)
+    add_error(errors, unit_ids.isna(), "unit not found")
+
+    usernames = clean_text(get_column(df, "requestor"), None)
+    requestor_ids = usernames.map(lookups["users"]).astype("Int64")
+    add_error(errors, requestor_ids.isna(), "requestor not found")
+
+    status = clean_text(get_column(df, "status"), "Pending")
+    valid_statuses = {value for value, _ in ServiceRequest.STATUS_CHOICES}
+    add_error(errors, ~status.isin(valid_statuses), "invalid status")
+
+    return pd.DataFrame({
+        "requestor_id": requestor_ids,
+        "unit_id": unit_ids,
+        "description": clean_text(get_column(df, "description"), ""),
+        "activity_name": clean_text(get_column(df, "activity_name"), "N/A"),
+        "status": status,
+    }, index=df.index)
+
+
+def prepare_work_report(df, lookups, target_unit, errors):
+    unit_ids = resolve_unit_ids(df, lookups, target_unit)
+    add_error(errors, unit_ids.isna(), "unit not found")
+
+    date_started = clean_date(get_column(df, "date_started"))
+    add_error(errors, date_started.isna(), "missing or invalid date_started")
+
+    control_numbers = clean_text(get_column(df, "control_number"), None)
+
+    # Text-only fallback values for migrated data
+    unit_names = unit_ids.astype("object").map(lookups["unit_names"])
+    requesting_office = clean_text(get_column(df, "requesting_office"), None)
+    requesting_office = requesting_office.fillna(unit_names).fillna("N/A")
+
+    material_cost = clean_number(get_column(df, "material_cost"), errors, "material_cost").round(2)
+    labor_cost = clean_number(get_column(df, "labor_cost"), errors, "labor_cost").round(2)
+
+    return pd.DataFrame({
+        "unit_id": unit_ids,
+        "date_started": date_started,
+        "date_completed": clean_date(get_column(df, "date_completed")),
+        "activity_name": clean_text(get_column(df, "activity_name")),
+        "description": clean_text(get_column(df, "description")),
+        "status": clean_text(get_column(df, "status"), "Completed"),
+        "material_cost": material_cost,
+        "labor_cost": labor_cost,
+        "total_cost": material_cost + labor_cost,
+        "control_number": control_numbers,
+        "requesting_office_name": requesting_office,
+        "personnel_names": clean_text(get_column(df, "assigned_personnel"), "Unassigned"),
+    }, index=df.index)
+
+
+def prepare_ipmt(df, lookups, target_unit, errors):
+    unit_ids = resolve_unit_ids(df, lookups, target_unit)
+    add_error(errors, unit_ids.isna(), "unit not found")
+
+    usernames = clean_text(get_column(df, "personnel"), None)
+    personnel_ids = usernames.map(lookups["users"]).astype("Int64")
+    add_error(errors, personnel_ids.isna(), "personnel not found")
+
+    indicator_ids = pd.to_numeric(get_column(df, "indicator_id"), errors="coerce").astype("Int64")
+    add_error(errors, ~indicator_ids.isin(lookups["indicators"]), "success indicator not found")
+
+    return pd.DataFrame({
+        "personnel_id": personnel_ids,
+        "unit_id": unit_ids,
+        "month": clean_text(get_column(df, "month")),
+        "indicator_id": indicator_ids,
+        "accomplishment": clean_text(get_column(df, "accomplishment"), ""),
+        "remarks": clean_text(get_column(df, "remarks"), ""),
+    }, index=df.index)
+
+
+def skip_blank_work_reports(df):
+    return is_blank(get_column(df, "activity_name")) & is_blank(get_column(df, "description"))
+
+
+# Each type declares the natural key used to upsert re-imported rows.
+# Key parts listed in "nullable_key" may be empty and then match stored rows
+# where that column IS NULL. A row with an empty "optional_key" part has no
+# identity (e.g. legacy WARs without a control number) and is always inserted.
+# A row missing any other key part is an error. Types without a key are
+# always inserted.
+MIGRATION_HANDLERS = {
+    "INVENTORY": {
+        "model": InventoryItem,
+        "prepare": prepare_inventory,
+        "skip": None,
+        "key": ("name", "owned_by_id"),
+        "nullable_key": ("owned_by_id",),
+        "optional_key": (),
+    },
+    "SERVICE_REQUEST": {
+        "model": ServiceRequest,
+        "prepare": prepare_service_request,
+        "skip": None,
+        "key": (),
+        "nullable_key": (),
+        "optional_key": (),
+    },
+    "WORK_REPORT": {
+        "model": WorkAccomplishmentReport,
+        "prepare": prepare_work_report,
+        "skip": skip_blank_work_reports,
+        "key": ("control_number",),
+        "nullable_key": (),
+        "optional_key": ("control_number",),
+    },
+    "IPMT": {
+        "model": IPMT,
+        "prepare": prepare_ipmt,
+        "skip": None,
+        "key": ("personnel_id", "month", "indicator_id"),
+        "nullable_key": (),
+        "optional_key": (),
+    },
+}
 
-def safe_number(value):
-    try:
-        if pd.isna(value) or value == "":
-            return 0.0
-        return float(value)
-    except Exception:
-        return 0.0
 
+# -------------------------------
+# Chunked Writer
+# -------------------------------
+def to_records(frame):
+    """Convert a prepared frame into plain Python dicts (NaN/NA -> None)."""
+    return frame.astype("object").where(frame.notna(), None).to_dict("records")
 
-def migrate_excel(file_path, migration_type, target_unit=None):
-    df = pd.read_excel(file_path)
-    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]  # normalize headers
-    count = 0
-    errors = []
 
-    for index, row in df.iterrows():
+def write_rows(model, frame, chunk_size, report, counter, update_fields=None):
+    """
+    Write prepared rows in chunks, one savepoint per chunk: bulk_create for new
+    rows, or bulk_update on `update_fields` for rows carrying an `id` column.
+    A failing chunk is retried row by row so only the bad rows are reported.
+    """
+    def write(objs):
+        if update_fields:
+            model.objects.bulk_update(objs, update_fields, batch_size=chunk_size)
+        else:
+            model.objects.bulk_create(objs, batch_size=chunk_size)
+
+    row_numbers = (frame.index + 2).tolist()  # spreadsheet row (header is row 1)
+    records = to_records(frame)
+
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        chunk_rows = row_numbers[start:start + chunk_size]
         try:
             with transaction.atomic():
-                # --- INVENTORY ---
-                if migration_type == 'INVENTORY':
-                    InventoryItem.objects.create(
-                        name=safe_text(row.get('name')),
-                        description=safe_text(row.get('description'), ''),
-                        quantity=safe_number(row.get('quantity')),
-                        unit_of_measurement=safe_text(row.get('unit_of_measurement'), 'pcs'),
-                        category=safe_text(row.get('category'), 'N/A'),
-                    )
-
-                # --- SERVICE REQUEST ---
-                elif migration_type == 'SERVICE_REQUEST':
-                    unit = target_unit or Unit.objects.filter(name=row.get('unit')).first()
-                    requestor = User.objects.filter(username=row.get('requestor')).first()
-                    ServiceRequest.objects.create(
-                        requestor=requestor,
-                        unit=unit,
-                        description=safe_text(row.get('description'), ''),
-                        activity_name=safe_text(row.get('activity_name'), 'N/A'),
-                        status=safe_text(row.get('status'), 'Pending'),
-                    )
-
-                # --- WORK REPORT (WAR) ---
-                elif migration_type == 'WORK_REPORT':
-                    if pd.isna(row.get('activity_name')) and pd.isna(row.get('description')):
-                        continue
-                    
-                    unit = target_unit or Unit.objects.filter(name=row.get('unit')).first()
-                    # Text-only fallback values for migrated data
-                    requesting_office_name = safe_text(row.get('requesting_office'), unit.name if unit else "N/A")
-                    personnel_names = safe_text(row.get('assigned_personnel'), "Unassigned")
-
-                    WorkAccomplishmentReport.objects.create(
-                        unit=unit,
-                        date_started=row.get('date_started'),
-                        date_completed=row.get('date_completed'),
-                        activity_name=safe_text(row.get('activity_name')),
-                        description=safe_text(row.get('description')),
-                        status=safe_text(row.get('status'), 'Completed'),
-                        material_cost=safe_number(row.get('material_cost')),
-                        labor_cost=safe_number(row.get('labor_cost')),
-                        total_cost=safe_number(row.get('material_cost')) + safe_number(row.get('labor_cost')),
-                        control_number=safe_text(row.get('control_number'), None),
-
-                        # New fallback text fields (for migrated records)
-                        requesting_office_name=requesting_office_name,
-                        personnel_names=personnel_names,
-                    )
-
-                # --- IPMT ---
-                elif migration_type == 'IPMT':
-                    personnel = User.objects.filter(username=row.get('personnel')).first()
-                    unit = target_unit or Unit.objects.filter(name=row.get('unit')).first()
-                    indicator = SuccessIndicator.objects.filter(id=row.get('indicator_id')).first()
-                    IPMT.objects.create(
-                        personnel=personnel,
-                        unit=unit,
-                        month=safe_text(row.get('month')),
-                        indicator=indicator,
-                        accomplishment=safe_text(row.get('accomplishment'), ''),
-                        remarks=safe_text(row.get('remarks'), ''),
-                    )
-
-                count += 1
-
-        except Exception as e:
-            errors.append(f"Row {index + 1}: {e}")
-            continue
-
-    message = f"{count} records imported successfully."
-    if errors:
-        message += f" {len(errors)} rows failed to import."
-        print("\n".join(errors))
+                write([model(**r) for r in chunk])
+            report[counter] += len(chunk)
+        except DatabaseError:
+            for row_number, record in zip(chunk_rows, chunk):
+                try:
+                    with transaction.atomic():
+                        write([model(**record)])
+                    report[counter] += 1
+                except DatabaseError as e:
+                    report["errors"].append((row_number, str(e).strip()))
+
+
+# -------------------------------
+# Natural-Key Upsert
+# -------------------------------
+def content_hashes(frame, fields):
+    """Hash the given columns row by row, independent of the frame index."""
+    return pd.util.hash_pandas_object(frame[list(fields)].astype("string").fillna(""), index=False)
+
+
+def match_existing(model, frame, key_fields):
+    """
+    Look up existing rows for every natural key in `frame` (one query) and
+    return them as a DataFrame coerced to the frame's dtypes. Empty key parts
+    match NULL columns.
+    """
+    fields = list(frame.columns)
+    query = Q()
+    for name in key_fields:
+        condition = Q(**{f"{name}__in": frame[name].dropna().unique().tolist()})
+        if frame[name].isna().any():
+            condition |= Q(**{f"{name}__isnull": True})
+        query &= condition
+    existing = pd.DataFrame.from_records(
+        model.objects.filter(query).order_by("id").values("id", *fields),
+        columns=["id", *fields],
+    )
+    existing = existing.drop_duplicates(list(key_fields), keep="first")
+
+    for name in fields:
+        dtype = frame[name].dtype
+        if pd.api.types.is_float_dtype(dtype):
+            existing[name] = pd.to_numeric(existing[name], errors="coerce").astype(float)
+        elif pd.api.types.is_integer_dtype(dtype):
+            existing[name] = pd.to_numeric(existing[name], errors="coerce").astype(dtype)
+    return existing
+
+
+def bulk_upsert(model, frame, key_fields, chunk_size, report):
+    """
+    Insert new rows and update changed ones, matched on the natural key
+    (empty key parts match NULL). Rows whose content hash equals the stored
+    row are left untouched.
+    """
+    if not key_fields or frame.empty:
+        write_rows(model, frame, chunk_size, report, "imported")
+        return
+
+    fields = list(frame.columns)
+    existing = match_existing(model, frame, key_fields)
+
+    merged = frame.reset_index().merge(
+        existing, on=list(key_fields), how="left", suffixes=("", "_db")
+    ).set_index("index")
+    merged.index.name = None
+
+    found = merged["id"].notna()
+    db_columns = {f"{name}_db": name for name in fields if name not in key_fields}
+    stored = merged.rename(columns={name: f"{name}_new" for name in db_columns.values()}) \
+        .rename(columns=db_columns)
+    unchanged = found & (
+        content_hashes(merged, fields).to_numpy() == content_hashes(stored, fields).to_numpy()
+    )
+    changed = found & ~unchanged
+
+    report["unchanged"] += int(unchanged.sum())
+
+    updates = merged.loc[changed, fields].assign(id=merged.loc[changed, "id"].astype("int64"))
+    update_fields = [name for name in fields if name not in key_fields]
+    write_rows(model, updates, chunk_size, report, "updated", update_fields=update_fields)
+
+    inserts = merged.loc[~found, fields]
+    write_rows(model, inserts, chunk_size, report, "imported")
+
+
+# -------------------------------
+# Import Engine
+# -------------------------------
+def key_label(key_fields):
+    return ", ".join(name.removesuffix("_id") for name in key_fields)
+
+
+def import_dataframe(df, migration_type, target_unit=None, chunk_size=DEFAULT_CHUNK_SIZE, seen_keys=None):
+    """
+    Validate, coerce and bulk-upsert a normalized DataFrame.
+    `seen_keys` carries the natural keys of earlier chunks of the same file,
+    so a key repeated anywhere in the file is reported, not only within a chunk.
+
+    Returns a report dict:
+    {"imported": int, "updated": int, "unchanged": int, "skipped": int,
+     "errors": [(row_number, message), ...]}
+    """
+    if migration_type not in MIGRATION_HANDLERS:
+        raise ValueError(f"Unsupported migration type: {migration_type}")
+
+    handler = MIGRATION_HANDLERS[migration_type]
+    report = {"imported": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": []}
+
+    if handler["skip"]:
+        skipped = handler["skip"](df)
+        report["skipped"] = int(skipped.sum())
+        df = df[~skipped]
+    if df.empty:
+        return report
+
+    lookups = load_lookups(df, migration_type)
+    errors = pd.Series("", index=df.index, dtype="object")
+    frame = handler["prepare"](df, lookups, target_unit, errors)
+
+    key_fields = handler["key"]
+    keyless = pd.Series(False, index=frame.index)
+    if key_fields:
+        optional = list(handler["optional_key"])
+        if optional:
+            keyless = frame[optional].isna().any(axis=1)
+        required = [
+            name for name in key_fields if name not in handler["nullable_key"] and name not in optional
+        ]
+        missing = frame[required].isna().any(axis=1)
+        add_error(errors, missing & (errors == ""), f"missing {key_label(required)}")
+
+        seen_keys = set() if seen_keys is None else seen_keys
+        keys = pd.Series(
+            [tuple(record.values()) for record in to_records(frame[list(key_fields)])],
+            index=frame.index, dtype="object",
+        )
+        checked = ~missing & ~keyless
+        duplicated = checked & (keys.duplicated(keep="first") | keys.map(seen_keys.__contains__).astype(bool))
+        add_error(errors, duplicated, f"duplicate {key_label(key_fields)} in file")
+        seen_keys.update(keys[checked])
+
+    invalid = errors != ""
+    report["errors"].extend(
+        (index + 2, message.rstrip("; ")) for index, message in errors[invalid].items()
+    )
+
+    bulk_upsert(handler["model"], frame[~invalid & ~keyless], key_fields, chunk_size, report)
+    write_rows(handler["model"], frame[~invalid & keyless], chunk_size, report, "imported")
+    report["errors"].sort()
+    return report
+
+
+def format_report(report, limit=ERROR_REPORT_LIMIT):
+    message = f"{report['imported']} records imported successfully."
+    if report["updated"]:
+        message += f" {report['updated']} existing records updated."
+    if report["unchanged"]:
+        message += f" {report['unchanged']} unchanged rows skipped."
+    if report["skipped"]:
+        message += f" {report['skipped']} blank rows skipped."
+    if report["errors"]:
+        message += f" {len(report['errors'])} rows failed to import."
+        lines = [f"Row {row}: {error}" for row, error in report["errors"][:limit]]
+        if len(report["errors"]) > limit:
+            lines.append(f"... and {len(report['errors']) - limit} more.")
+        message += "\n" + "\n".join(lines)
     return message
+
+
+# -------------------------------
+# Streaming Workbook Reader
+# -------------------------------
+def normalize_headers(columns):
+    return [
+        str(col).strip().lower().replace(" ", "_") if col is not None else f"unnamed_{i}"
+        for i, col in enumerate(columns)
+    ]
+
+
+def count_excel_rows(file_path):
+    """Estimate data rows from the worksheet dimensions (None if unknown)."""
+    if not str(file_path).lower().endswith((".xlsx", ".xlsm")):
+        return None
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        max_row = wb.worksheets[0].max_row
+        return max(max_row - 1, 0) if max_row else None
+    finally:
+        wb.close()
+
+
+def iter_excel_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield normalized DataFrames of up to `chunk_size` rows from the first sheet.
+    .xlsx files are streamed with openpyxl's read-only parser, so only one chunk
+    is held in memory. The frame index is the 0-based data row, which keeps
+    spreadsheet row numbers (index + 2) stable across chunks.
+    """
+    if not str(file_path).lower().endswith((".xlsx", ".xlsm")):
+        df = pd.read_excel(file_path)
+        df.columns = normalize_headers(df.columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = normalize_headers(header)
+        width = len(columns)
+
+        buffer, indexes = [], []
+        for index, row in enumerate(rows):
+            if row is None or all(value is None or value == "" for value in row):
+                continue  # blank spreadsheet rows
+            buffer.append((tuple(row) + (None,) * width)[:width])
+            indexes.append(index)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame.from_records(buffer, columns=columns, index=indexes)
+                buffer, indexes = [], []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=columns, index=indexes)
+    finally:
+        wb.close()
+
+
+def migrate_excel(file_path, migration_type, target_unit=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Import a spreadsheet chunk by chunk.
+    `progress(report)` is called after every chunk with the running totals
+    (imported, updated, unchanged, skipped, errors, rows_read, seconds).
+    """
+    report = {
+        "imported": 0, "updated": 0, "unchanged": 0, "skipped": 0,
+        "errors": [], "rows_read": 0, "seconds": 0.0,
+    }
+    started = time.perf_counter()
+
+    seen_keys = set()
+    for df in iter_excel_chunks(file_path, chunk_size):
+        chunk_report = import_dataframe(df, migration_type, target_unit, chunk_size, seen_keys)
+        for counter in ("imported", "updated", "unchanged", "skipped"):
+            report[counter] += chunk_report[counter]
+        report["errors"].extend(chunk_report["errors"])
+        report["rows_read"] += len(df)
+        report["seconds"] = time.perf_counter() - started
+        if progress:
+            progress(report)
+
+    return format_report(report)
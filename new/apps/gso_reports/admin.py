@@ -1,4 +1,6 @@
 from django.contrib import admin
+from apps.ai_service.models import WarRegenerationJob
+from apps.ai_service.regeneration import start_regeneration_job
 from .models import WorkAccomplishmentReport, SuccessIndicator
 
 @admin.register(SuccessIndicator)
@@ -11,5 +13,28 @@ class SuccessIndicatorAdmin(admin.ModelAdmin):
 @admin.register(WorkAccomplishmentReport)
 class WorkAccomplishmentReportAdmin(admin.ModelAdmin):
     list_display = ("activity_name", "unit", "date_started", "status", "total_cost")
-    list_filter = ("unit", "status", "date_started")
+    list_filter = ("unit", "status", "success_indicator", "date_started")
+    date_hierarchy = "date_started"
     search_fields = ("activity_name", "description")
+    actions = ["regenerate_descriptions", "force_regenerate_descriptions"]
+
+    def _start_regeneration(self, request, queryset, force):
+        job = WarRegenerationJob.objects.create(
+            war_ids=list(queryset.values_list("id", flat=True)),
+            requested_by=request.user,
+            force=force,
+        )
+        start_regeneration_job(job)
+        self.message_user(
+            request,
+            f"⏳ Regenerating {len(job.war_ids)} WAR description(s) in the background (job #{job.pk}); "
+            "follow its progress under WAR Regeneration Jobs.",
+        )
+
+    @admin.action(description="Regenerate AI descriptions (changed inputs only)")
+    def regenerate_descriptions(self, request, queryset):
+        self._start_regeneration(request, queryset, force=False)
+
+    @admin.action(description="Regenerate AI descriptions (force all)")
+    def force_regenerate_descriptions(self, request, queryset):
+        self._start_regeneration(request, queryset, force=True)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('gso_reports', '0005_remove_successindicator_activity_name_and_more'),
+        ('gso_requests', '0008_servicerequest_attachment_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workaccomplishmentreport',
+            index=models.Index(fields=['unit', 'date_started'], name='war_unit_date_started_idx'),
+        ),
+    ]
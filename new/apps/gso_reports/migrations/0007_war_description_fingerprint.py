@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_reports', '0006_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workaccomplishmentreport',
+            name='description_fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the AI prompt the description was generated from; unchanged inputs skip regeneration', max_length=64),
+        ),
+    ]
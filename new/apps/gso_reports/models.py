@@ -47,6 +47,10 @@ class WorkAccomplishmentReport(models.Model):
 
     activity_name = models.CharField(max_length=255, blank=True, null=True)  # <-- changed from project_name
     description = models.TextField(blank=True)
+    description_fingerprint = models.CharField(
+        max_length=64, blank=True, editable=False,
+        help_text="SHA-256 of the AI prompt the description was generated from; unchanged inputs skip regeneration"
+    )
 
      # ✅ New field (manual success indicator)
     success_indicator = models.ForeignKey(
@@ -76,6 +80,12 @@ class WorkAccomplishmentReport(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Monthly IPMT/WAR reports filter one unit over a date_started range
+            models.Index(fields=["unit", "date_started"], name="war_unit_date_started_idx"),
+        ]
+
     def generate_description(self):
         """
         Returns the WAR description, or fallback text if missing.
@@ -1,3 +1,63 @@
+import datetime
+
 from django.test import TestCase
+from django.urls import reverse
+
+from apps.gso_accounts.models import Unit
+from core.testing import QueryBudgetMixin, QueryPlanMixin, seed_sample_data
+from .models import WorkAccomplishmentReport
+from .utils import month_filter_kwargs
+
+
+# -------------------------------
+# Query Plans
+# -------------------------------
+class WorkAccomplishmentReportQueryPlanTests(QueryPlanMixin, TestCase):
+    """Monthly WAR/IPMT lookups must stay index-backed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.units = Unit.objects.bulk_create([Unit(name=f"Unit {i}") for i in range(8)])
+        start = datetime.date(2024, 1, 1)
+        WorkAccomplishmentReport.objects.bulk_create([
+            WorkAccomplishmentReport(
+                unit=cls.units[i % 8],
+                date_started=start + datetime.timedelta(days=i % 365),
+                activity_name=f"Activity {i}",
+            )
+            for i in range(2000)
+        ])
+        cls.analyze_tables(WorkAccomplishmentReport)
+
+    def test_unit_month_lookup_uses_index(self):
+        queryset = WorkAccomplishmentReport.objects.filter(unit=self.units[0], **month_filter_kwargs(2024, 3))
+        self.assertUsesIndex(queryset, "war_unit_date_started_idx")
+
+    def test_month_filter_covers_december(self):
+        self.assertEqual(
+            month_filter_kwargs(2024, 12),
+            {"date_started__gte": datetime.date(2024, 12, 1), "date_started__lt": datetime.date(2025, 1, 1)},
+        )
+
+
+# -------------------------------
+# Query Budgets
+# -------------------------------
+class ReportViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Report pages must stay within their @query_budget regardless of row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=30)
+
+    def setUp(self):
+        self.client.force_login(self.users["gso"])
+
+    def test_accomplishment_report(self):
+        self.assertWithinQueryBudget(reverse("gso_reports:accomplishment_report"))
+
+    def test_gso_analytics(self):
+        self.assertWithinQueryBudget(reverse("gso_reports:gso_analytics"))
 
-# Create your tests here.
+    def test_feedback_reports(self):
+        self.assertWithinQueryBudget(reverse("gso_reports:feedback_reports"))
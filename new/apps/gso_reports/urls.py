@@ -8,6 +8,8 @@ urlpatterns = [
     path("ipmt/save/", views.save_ipmt, name="save_ipmt"),  # save edited IPMT rows
     path('ipmt/generate/', views.generate_ipmt, name='generate_ipmt'),
     path("ipmt/preview/", views.preview_ipmt, name="preview_ipmt"),
+    path("ipmt/summaries/", views.start_ipmt_summaries, name="start_ipmt_summaries"),
+    path("ipmt/summaries/<int:job_id>/", views.ipmt_summary_job_status, name="ipmt_summary_job_status"),
     path('war-description/<int:war_id>/', views.get_war_description, name='get_war_description'),
 
     #kasama sa 10/28/25 edits#
@@ -8,6 +8,20 @@ import calendar
 import pandas as pd
 
 
+# -------------------------------
+# Month Filters
+# -------------------------------
+def month_filter_kwargs(year, month_num, field="date_started"):
+    """
+    Filter for one calendar month as a half-open date range. Unlike
+    __year/__month (EXTRACT on PostgreSQL), a range can use the
+    (unit, date_started) index.
+    """
+    start = datetime(year, month_num, 1).date()
+    end = datetime(year + month_num // 12, month_num % 12 + 1, 1).date()
+    return {f"{field}__gte": start, f"{field}__lt": end}
+
+
 # -------------------------------
 # Normalize Reports (for Accomplishment Report)
 # -------------------------------
@@ -65,10 +79,41 @@ def normalize_report(obj):
 # -------------------------------
 # Collect IPMT Reports (based on WAR Success Indicators)
 # -------------------------------
-def collect_ipmt_reports(year: int, month_num: int, unit_name: str = None, personnel_names: list = None):
-    from apps.ai_service.tasks import generate_ipmt_summary
+def ipmt_personnel(unit, personnel_names=None):
+    """Personnel for an IPMT: the named ones (by first name) or every personnel of the unit."""
+    if personnel_names and "all" not in [p.lower() for p in personnel_names]:
+        return User.objects.filter(
+            first_name__in=[p.split()[0].capitalize() for p in personnel_names],
+            unit=unit
+        )
+    return User.objects.filter(unit=unit, role="personnel")
+
+
+def group_ipmt_wars(unit, year: int, month_num: int, users):
+    """
+    [(user, success indicator or None, [WARs])] for every user, one entry per
+    indicator the user has WARs under that month. WARs stay in id order, so
+    new ones come last (see ai_service/summarize.py).
+    """
+    wars = list(
+        WorkAccomplishmentReport.objects.filter(unit=unit, **month_filter_kwargs(year, month_num))
+        .select_related("success_indicator").prefetch_related("assigned_personnel").order_by("id")
+    )
+    groups = []
+    for user in users:
+        grouped = {}
+        for w in wars:
+            if user in w.assigned_personnel.all():
+                grouped.setdefault(w.success_indicator, []).append(w)
+        groups.extend((user, indicator, war_list) for indicator, war_list in grouped.items())
+    return groups
+
+
+def collect_ipmt_reports(year: int, month_num: int, unit_name: str = None, personnel_names: list = None, force: bool = False):
     """
     Collect IPMT preview rows using the success indicator directly from WARs.
+    Rows with several WARs get an AI summary: saved ones are reused while
+    their WARs are unchanged, and the rest are generated concurrently.
 
     Returns a list of dicts per personnel:
     [
@@ -85,66 +130,29 @@ def collect_ipmt_reports(year: int, month_num: int, unit_name: str = None, perso
         }
     ]
     """
+    from apps.ai_service.ipmt import indicator_label, summarize_ipmt_groups
 
-    result = []
-
-    # 1. Get unit
     try:
         unit = Unit.objects.get(name__iexact=unit_name)
     except Unit.DoesNotExist:
         return []
 
-    # 2. Filter personnel
-    if personnel_names and "all" not in [p.lower() for p in personnel_names]:
-        users = User.objects.filter(
-            first_name__in=[p.split()[0].capitalize() for p in personnel_names],
-            unit=unit
-        )
-    else:
-        users = User.objects.filter(unit=unit, role="personnel")
-
-    # 3. Filter WARs for this unit/month
-    wars = WorkAccomplishmentReport.objects.filter(
-        unit=unit,
-        date_started__year=year,
-        date_started__month=month_num
-    ).prefetch_related("assigned_personnel", "success_indicator")
-
-    for user in users:
-        personnel_rows = []
-
-        # Get all WARs assigned to this user
-        user_wars = [w for w in wars if user in w.assigned_personnel.all()]
-
-        # Group WARs by their success indicator
-        grouped = {}
-        for w in user_wars:
-            indicator_name = w.success_indicator.name if w.success_indicator else "Unspecified Indicator"
-            grouped.setdefault(indicator_name, []).append(w)
-
-        # Build rows for each indicator
-        for indicator_name, war_list in grouped.items():
-            if len(war_list) == 1:
-                description = war_list[0].description
-                war_ids = [war_list[0].id]
-            else:
-                war_descriptions = [w.description for w in war_list if w.description]
-                description = generate_ipmt_summary(indicator_name, war_descriptions)
-                war_ids = [w.id for w in war_list]
-
-            personnel_rows.append({
-                "indicator": indicator_name,
-                "description": description,
-                "remarks": description,
-                "war_ids": war_ids
-            })
-
-        result.append({
-            "personnel": user.get_full_name() or user.username,
-            "rows": personnel_rows
+    users = list(ipmt_personnel(unit, personnel_names))
+    groups = group_ipmt_wars(unit, year, month_num, users)
+    summaries, _stats = summarize_ipmt_groups(unit, f"{year:04d}-{month_num:02d}", groups, force=force)
+
+    result = {user.id: {"personnel": user.get_full_name() or user.username, "rows": []} for user in users}
+    for user, indicator, war_list in groups:
+        description = summaries.get((user.id, indicator.id if indicator else None))
+        if description is None:
+            description = " ".join(w.description for w in war_list if w.description)
+        result[user.id]["rows"].append({
+            "indicator": indicator_label(indicator),
+            "description": description,
+            "remarks": description,
+            "war_ids": [w.id for w in war_list],
         })
-
-    return result
+    return list(result.values())
 
 
 # -------------------------------
@@ -163,10 +171,7 @@ def generate_ipmt_excel(month_filter: str, unit_name: str = None, personnel_name
 
     if not personnel_names or "all" in [p.lower() for p in personnel_names]:
         personnel_names = set()
-        wars = WorkAccomplishmentReport.objects.filter(
-            date_started__year=year,
-            date_started__month=month_num,
-        )
+        wars = WorkAccomplishmentReport.objects.filter(**month_filter_kwargs(year, month_num))
         if unit_name and unit_name.lower() != "all":
             wars = wars.filter(unit__name__iexact=unit_name)
         for war in wars:
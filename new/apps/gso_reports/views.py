@@ -7,16 +7,20 @@ import openpyxl
 from datetime import datetime
 from django.conf import settings
 from django.http import HttpResponse, JsonResponse
-from django.db.models import Q
+from django.db.models import F, Q
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.csrf import csrf_exempt
 
 from apps.gso_requests.models import ServiceRequest, Feedback
-from apps.gso_accounts.models import User, Unit
+from apps.gso_accounts.models import User
 from .models import WorkAccomplishmentReport, SuccessIndicator, IPMT
-from .utils import normalize_report
-from apps.ai_service.utils import generate_war_description
+from .utils import month_filter_kwargs, normalize_report
+from apps.ai_service.ipmt import group_fingerprint, start_ipmt_summary_job
+from apps.ai_service.models import IpmtSummary, IpmtSummaryJob
+from apps.ai_service.regeneration import queue_war_descriptions
+from core.query_budget import query_budget
+from core.reference_data import get_success_indicators, get_unit_by_name
 
 
 # -------------------------------
@@ -29,11 +33,13 @@ def is_gso_or_director(user):
 # -------------------------------
 # Accomplishment Report View
 # -------------------------------
+@query_budget(queries=10)
 @login_required
 @user_passes_test(is_gso_or_director)
 def accomplishment_report(request):
-    completed_requests = ServiceRequest.objects.filter(status="Completed").order_by("-created_at")
-    all_wars = WorkAccomplishmentReport.objects.select_related("request", "unit") \
+    completed_requests = ServiceRequest.objects.filter(status="Completed").select_related("department", "unit") \
+        .prefetch_related("assigned_personnel").order_by("-created_at")
+    all_wars = WorkAccomplishmentReport.objects.select_related("request__department", "request__unit", "unit", "success_indicator") \
         .prefetch_related("assigned_personnel").all().order_by("-date_started")
 
     reports = []
@@ -45,42 +51,24 @@ def accomplishment_report(request):
             continue
         norm = normalize_report(r)
         norm["id"] = r.id
-
-        if not norm.get("description") or not norm["description"].strip():
-            try:
-                desc = generate_war_description(
-                    activity_name=getattr(r, "activity_name", getattr(r, "title", "Task")),
-                    unit=getattr(r.unit, "name", None),
-                    personnel_names=[p.get_full_name() for p in r.assigned_personnel.all()] if hasattr(r, "assigned_personnel") else None
-                )
-                r.description = desc or "No description generated."
-                r.save(update_fields=["description"])
-                norm["description"] = r.description
-            except Exception as e:
-                norm["description"] = f"Error generating description: {e}"
-
         reports.append(norm)
 
-    # Process existing WARs
+    # Process existing WARs; missing AI descriptions are generated in the background
+    missing_descriptions = []
     for war in all_wars:
         norm = normalize_report(war)
         norm["id"] = war.id
 
-        if not norm.get("description") or not norm["description"].strip():
-            try:
-                desc = generate_war_description(
-                    activity_name=getattr(war, "activity_name", getattr(war, "title", "Task")),
-                    unit=getattr(war.unit, "name", None),
-                    personnel_names=[p.get_full_name() for p in war.assigned_personnel.all()] if hasattr(war, "assigned_personnel") else None
-                )
-                war.description = desc or "No description generated."
-                war.save(update_fields=["description"])
-                norm["description"] = war.description
-            except Exception as e:
-                norm["description"] = f"Error generating description: {e}"
+        if not war.description.strip():
+            norm["description"] = war.generate_description()
+            if war.request_id:
+                missing_descriptions.append(war.id)
 
         reports.append(norm)
 
+    if missing_descriptions:
+        queue_war_descriptions(missing_descriptions)
+
     # Filters
     search_query = request.GET.get("q")
     if search_query:
@@ -266,10 +254,17 @@ def preview_ipmt(request):
     except ValueError:
         return HttpResponse("Invalid month format. Use YYYY-MM.", status=400)
 
-    unit = Unit.objects.filter(name__iexact=unit_filter).first()
+    unit = get_unit_by_name(unit_filter)
     if not unit:
         return HttpResponse("Unit not found.", status=404)
 
+    # AI summaries saved by IPMT summary jobs, used while their WARs are unchanged
+    month_key = f"{year:04d}-{month_num:02d}"
+    saved_summaries = {
+        (summary.personnel_id, summary.indicator_id): summary
+        for summary in IpmtSummary.objects.filter(unit=unit, month=month_key)
+    }
+
     reports = []
 
     for person_name in personnel_names:
@@ -278,20 +273,22 @@ def preview_ipmt(request):
             continue
 
         # Fetch all active success indicators under the unit
-        indicators = SuccessIndicator.objects.filter(unit=unit, is_active=True)
+        indicators = get_success_indicators(unit=unit)
 
         for indicator in indicators:
             # Get WARs for this user and indicator within the selected month
-            wars = WorkAccomplishmentReport.objects.filter(
+            wars = list(WorkAccomplishmentReport.objects.filter(
                 unit=unit,
                 assigned_personnel=user,
                 success_indicator=indicator,
-                date_started__year=year,
-                date_started__month=month_num
-            )
+                **month_filter_kwargs(year, month_num),
+            ).order_by("id"))
 
-            # Combine descriptions from all WARs
+            # Combine descriptions from all WARs, or use their AI summary
             description = " ".join([w.description for w in wars if w.description]) or ""
+            saved = saved_summaries.get((user.id, indicator.id))
+            if len(wars) > 1 and saved and saved.input_fingerprint == group_fingerprint(indicator, wars):
+                description = saved.summary
 
             reports.append({
                 "indicator": indicator.code,
@@ -305,10 +302,57 @@ def preview_ipmt(request):
         "month_filter": month_filter,
         "unit_filter": unit_filter,
         "personnel_names": personnel_names,
+        "summary_job": IpmtSummaryJob.objects.filter(unit=unit, month=month_key).first(),
     }
 
     return render(request, "gso_office/ipmt/ipmt_preview.html", context)
 
+
+# -------------------------------
+# IPMT AI Summary Jobs (AJAX)
+# -------------------------------
+def ipmt_summary_job_json(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "is_running": job.is_running and not job.is_stale,
+        "progress": job.progress_percent,
+        "total_groups": job.total_groups,
+        "groups_done": job.groups_done,
+        "groups_reused": job.groups_reused,
+        "groups_failed": job.groups_failed,
+        "message": job.result_message,
+    }
+
+
+@login_required
+@user_passes_test(is_gso_or_director)
+def start_ipmt_summaries(request):
+    """Start (or rejoin) the background job that summarizes a unit's IPMT rows for a month."""
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required"}, status=400)
+
+    unit = get_unit_by_name(request.POST.get("unit"))
+    if not unit:
+        return JsonResponse({"error": "Unit not found"}, status=404)
+    try:
+        year, month_num = map(int, request.POST.get("month", "").split("-"))
+        month_key = f"{year:04d}-{month_num:02d}"
+    except ValueError:
+        return JsonResponse({"error": "Invalid month format. Use YYYY-MM."}, status=400)
+
+    job = start_ipmt_summary_job(unit, month_key, request.user, force=request.POST.get("force") == "1")
+    return JsonResponse(ipmt_summary_job_json(job))
+
+
+@login_required
+@user_passes_test(is_gso_or_director)
+def ipmt_summary_job_status(request, job_id):
+    job = IpmtSummaryJob.objects.filter(id=job_id).first()
+    if not job:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(ipmt_summary_job_json(job))
+
 # -------------------------------
 # Save IPMT
 # -------------------------------
@@ -327,7 +371,7 @@ def save_ipmt(request):
     except Exception as e:
         return JsonResponse({"error": f"Invalid JSON: {str(e)}"}, status=400)
 
-    unit = Unit.objects.filter(name__iexact=unit_name).first()
+    unit = get_unit_by_name(unit_name)
     if not unit:
         return JsonResponse({"error": "Unit not found"}, status=404)
 
@@ -432,6 +476,7 @@ from django.shortcuts import render
 from apps.gso_requests.models import ServiceRequest as Request
 from apps.gso_inventory.models import InventoryItem as Material
 
+@query_budget(queries=12)
 @login_required
 def gso_analytics(request):
     # ===== REQUEST ANALYTICS =====
@@ -442,7 +487,7 @@ def gso_analytics(request):
 
     # ===== INVENTORY ANALYTICS =====
     total_materials = Material.objects.count()
-    low_stock_materials = Material.objects.filter(quantity__lte=10).count()  # threshold for low stock
+    low_stock_materials = Material.objects.filter(quantity__lte=F('reorder_level')).count()  # per-item threshold
     out_of_stock = Material.objects.filter(quantity=0).count()
 
     # ===== CONTEXT =====
@@ -462,6 +507,7 @@ def gso_analytics(request):
     return render(request, 'gso_office/analytics/gso_analytics.html', context)
 
 
+@query_budget(queries=8)
 @login_required
 @user_passes_test(is_gso_or_director)
 def feedback_reports(request):
@@ -481,6 +527,7 @@ def feedback_reports(request):
             "SQD1", "SQD2", "SQD3", "SQD4", "SQD5", "SQD6", "SQD7", "SQD8", "SQD9",
             "CC1", "CC2", "CC3",
             "Average Score",
+            "Sentiment",
             "Suggestions",
             "Date Submitted"
         ])
@@ -509,6 +556,7 @@ def feedback_reports(request):
                 fb.sqd5 or "", fb.sqd6 or "", fb.sqd7 or "", fb.sqd8 or "", fb.sqd9 or "",
                 fb.cc1 or "", fb.cc2 or "", fb.cc3 or "",
                 round(fb.average_score, 2),
+                fb.sentiment or "",
                 fb.suggestions or "",
                 formatted_date
             ])
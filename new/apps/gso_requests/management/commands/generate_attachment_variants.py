@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from apps.gso_requests.models import ServiceRequest
+from apps.gso_requests.tasks import generate_attachment_variants
+
+
+class Command(BaseCommand):
+    help = "Build thumbnail and preview images for request attachments that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild variants for every attachment.")
+
+    def handle(self, *args, **options):
+        requests_qs = ServiceRequest.objects.exclude(Q(attachment="") | Q(attachment__isnull=True))
+        if not options["all"]:
+            requests_qs = requests_qs.filter(Q(attachment_thumbnail="") | Q(attachment_thumbnail__isnull=True))
+
+        request_ids = list(requests_qs.order_by("id").values_list("id", flat=True))
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Building variants for {len(request_ids)} attachment(s)..."))
+
+        for request_id in request_ids:
+            generate_attachment_variants(request_id)
+
+        self.stdout.write(self.style.SUCCESS("Attachment variants are up to date."))
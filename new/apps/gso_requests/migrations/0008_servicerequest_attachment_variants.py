@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_requests', '0007_alter_servicerequest_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequest',
+            name='attachment_preview',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='request_attachments/'),
+        ),
+        migrations.AddField(
+            model_name='servicerequest',
+            name='attachment_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='request_attachments/'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('gso_inventory', '0003_materialforecast'),
+        ('gso_reports', '0006_access_path_indexes'),
+        ('gso_requests', '0008_servicerequest_attachment_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['-is_emergency', '-created_at'], name='request_default_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['unit', 'status'], name='request_unit_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['requestor', 'status'], name='request_requestor_status_idx'),
+        ),
+    ]
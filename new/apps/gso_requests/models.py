@@ -35,6 +35,9 @@ class ServiceRequest(models.Model):
     custom_email = models.EmailField(blank=True, null=True)
     custom_contact_number = models.CharField(max_length=50, blank=True, null=True)
     attachment = models.ImageField(upload_to='request_attachments/', blank=True, null=True)
+    # Resized copies of the attachment, generated in the background (see tasks.py)
+    attachment_thumbnail = models.ImageField(upload_to='request_attachments/', blank=True, null=True, editable=False)
+    attachment_preview = models.ImageField(upload_to='request_attachments/', blank=True, null=True, editable=False)
 
     # 🚨 Emergency flag
     is_emergency = models.BooleanField(default=False)
@@ -87,11 +90,31 @@ class ServiceRequest(models.Model):
     # === GLOBAL DEFAULT ORDERING (Emergency requests first) ===
     class Meta:
         ordering = ['-is_emergency', '-created_at']
+        indexes = [
+            models.Index(fields=['-is_emergency', '-created_at'], name='request_default_order_idx'),
+            # Role-scoped lists: unit heads by unit, requestors by their own requests
+            models.Index(fields=['unit', 'status'], name='request_unit_status_idx'),
+            models.Index(fields=['requestor', 'status'], name='request_requestor_status_idx'),
+        ]
 
     def __str__(self):
         display_name = self.custom_full_name or self.requestor.get_full_name()
         return f"Request #{self.id} by {display_name} - {self.unit.name}"
 
+    @property
+    def attachment_thumbnail_url(self):
+        """Small variant for lists; falls back to the original until it is generated."""
+        if self.attachment_thumbnail:
+            return self.attachment_thumbnail.url
+        return self.attachment.url if self.attachment else ""
+
+    @property
+    def attachment_preview_url(self):
+        """Screen-sized variant for detail pages; falls back to the original."""
+        if self.attachment_preview:
+            return self.attachment_preview.url
+        return self.attachment.url if self.attachment else ""
+
     @property
     def assigned_personnel_names(self):
         personnel = self.assigned_personnel.all()
@@ -0,0 +1,58 @@
+# apps/gso_requests/signals.py
+"""Publish task assignments and status changes to the affected users' websockets."""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_init, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+
+from apps.notifications.realtime import send_to_users
+from .models import ServiceRequest, Unit
+
+
+@receiver(post_init, sender=ServiceRequest)
+def remember_status(sender, instance, **kwargs):
+    # __dict__ so a deferred status field is not loaded just for this
+    instance._loaded_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=ServiceRequest)
+def publish_status_change(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_status", None)
+    instance._loaded_status = instance.status
+    if created or previous is None or previous == instance.status:
+        return
+
+    request_id, status, unit_id, requestor_id = instance.pk, instance.status, instance.unit_id, instance.requestor_id
+
+    def send():
+        message = f"🔄 Request #{request_id} is now {status}"
+        event = {"type": "request_status", "request_id": request_id, "status": status, "message": message}
+        payloads = {}
+        if unit_id:
+            head_id = Unit.objects.filter(pk=unit_id).values_list("unit_head_id", flat=True).first()
+            if head_id:
+                payloads[head_id] = {**event, "link": reverse("gso_requests:unit_head_request_detail", args=[request_id])}
+        for user_id in instance.assigned_personnel.values_list("id", flat=True):
+            payloads[user_id] = {**event, "link": reverse("gso_requests:personnel_task_detail", args=[request_id])}
+        if requestor_id:
+            payloads[requestor_id] = {**event, "link": reverse("gso_requests:requestor_request_management")}
+        send_to_users(payloads)
+
+    transaction.on_commit(send)
+
+
+@receiver(m2m_changed, sender=ServiceRequest.assigned_personnel.through)
+def publish_assignment(sender, instance, action, pk_set, **kwargs):
+    # kwargs["reverse"] is True when personnel are added from the user side
+    if action != "post_add" or kwargs["reverse"] or not pk_set:
+        return
+
+    event = {
+        "type": "task_assigned",
+        "request_id": instance.pk,
+        "message": f"🛠️ You have been assigned to request #{instance.pk}",
+        "link": reverse("gso_requests:personnel_task_detail", args=[instance.pk]),
+    }
+    user_ids = set(pk_set)
+    transaction.on_commit(lambda: send_to_users({user_id: event for user_id in user_ids}))
+
@@ -0,0 +1,93 @@
+# gso_requests/tasks.py
+import io
+import logging
+import os
+import threading
+
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ServiceRequest
+
+logger = logging.getLogger(__name__)
+
+# Variant field -> (longest side in px, JPEG quality, filename suffix)
+ATTACHMENT_VARIANTS = {
+    "attachment_thumbnail": (320, 70, "thumb"),
+    "attachment_preview": (1280, 80, "preview"),
+}
+
+
+# -------------------------------
+# Attachment Variants
+# -------------------------------
+def build_image_variant(image, max_size, quality):
+    """Resize an opened image to fit max_size and return it as compressed JPEG bytes."""
+    variant = image.copy()
+    variant.thumbnail((max_size, max_size), Image.LANCZOS)
+
+    if variant.mode in ("RGBA", "LA", "P"):
+        # JPEG has no alpha channel; flatten onto white instead of black
+        variant = variant.convert("RGBA")
+        background = Image.new("RGB", variant.size, "white")
+        background.paste(variant, mask=variant.split()[-1])
+        variant = background
+    elif variant.mode != "RGB":
+        variant = variant.convert("RGB")
+
+    buffer = io.BytesIO()
+    variant.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_attachment_variants(request_id: int):
+    """
+    Write thumbnail and preview JPEGs next to a request's attachment.
+    Runs outside the request cycle, so unreadable files are logged and skipped.
+    """
+    try:
+        service_request = ServiceRequest.objects.only(
+            "id", "attachment", "attachment_thumbnail", "attachment_preview"
+        ).get(id=request_id)
+        if not service_request.attachment:
+            return
+
+        stem = os.path.splitext(os.path.basename(service_request.attachment.name))[0]
+        with service_request.attachment.open("rb") as original:
+            with Image.open(original) as image:
+                # Phone photos are often stored sideways with an EXIF rotation flag
+                image = ImageOps.exif_transpose(image)
+                image.load()
+
+        names = {}
+        for field_name, (max_size, quality, suffix) in ATTACHMENT_VARIANTS.items():
+            field = getattr(service_request, field_name)
+            if field:
+                field.delete(save=False)
+            field.save(f"{stem}_{suffix}.jpg", ContentFile(build_image_variant(image, max_size, quality)), save=False)
+            names[field_name] = field.name
+
+        # Only touch the variant columns so concurrent edits to the request are kept
+        ServiceRequest.objects.filter(id=request_id).update(**names)
+    except ServiceRequest.DoesNotExist:
+        pass
+    except (UnidentifiedImageError, OSError):
+        logger.exception("Could not build attachment variants for request #%s", request_id)
+    finally:
+        connection.close()
+
+
+def queue_attachment_variants(service_request: ServiceRequest):
+    """Generate attachment variants in a background thread once the request is committed."""
+    if not service_request.attachment:
+        return
+
+    def launch():
+        threading.Thread(
+            target=generate_attachment_variants,
+            args=(service_request.id,),
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(launch)
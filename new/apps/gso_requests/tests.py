@@ -1,3 +1,256 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from apps.gso_accounts.models import Unit, User
+from apps.gso_inventory.models import InventoryItem, LowStockAlert
+from core.testing import QueryBudgetMixin, QueryPlanMixin, seed_sample_data
+from .models import ServiceRequest
+from .tasks import generate_attachment_variants, queue_attachment_variants
+
+STATUSES = ["Pending", "Approved", "In Progress", "Completed", "Cancelled"]
+
+
+# -------------------------------
+# Query Plans
+# -------------------------------
+class ServiceRequestQueryPlanTests(QueryPlanMixin, TestCase):
+    """The role-scoped request lists in views.py must stay index-backed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.units = Unit.objects.bulk_create([Unit(name=f"Unit {i}") for i in range(8)])
+        cls.requestors = User.objects.bulk_create([
+            User(username=f"requestor{i}", role="requestor") for i in range(40)
+        ])
+        cls.personnel = User.objects.bulk_create([
+            User(username=f"personnel{i}", role="personnel", unit=cls.units[i % 8]) for i in range(16)
+        ])
+
+        requests = ServiceRequest.objects.bulk_create([
+            ServiceRequest(
+                requestor=cls.requestors[i % 40],
+                unit=cls.units[i % 8],
+                description=f"Request {i}",
+                status=STATUSES[i % len(STATUSES)],
+                is_emergency=(i % 25 == 0),
+            )
+            for i in range(2000)
+        ])
+        Through = ServiceRequest.assigned_personnel.through
+        Through.objects.bulk_create([
+            Through(servicerequest_id=req.id, user_id=cls.personnel[i % 16].id)
+            for i, req in enumerate(requests)
+        ])
+        cls.analyze_tables(ServiceRequest, Through, User)
+
+    def test_default_ordering_uses_index(self):
+        self.assertUsesIndex(ServiceRequest.objects.all()[:50], "request_default_order_idx")
+
+    def test_unit_head_list_uses_unit_status_index(self):
+        queryset = ServiceRequest.objects.filter(unit=self.units[0], status="Pending")
+        self.assertUsesIndex(queryset, "request_unit_status_idx")
+
+    def test_requestor_list_uses_requestor_status_index(self):
+        queryset = ServiceRequest.objects.filter(requestor=self.requestors[0], status__in=["Completed", "Cancelled"])
+        self.assertUsesIndex(queryset, "request_requestor_status_idx")
+
+    def test_personnel_tasks_use_assignment_index(self):
+        through_table = ServiceRequest.assigned_personnel.through._meta.db_table
+        queryset = ServiceRequest.objects.filter(assigned_personnel=self.personnel[0], status="Completed")
+        self.assertUsesIndex(queryset, self.index_on(through_table, ["user_id"]))
+
+
+# -------------------------------
+# Query Budgets
+# -------------------------------
+class RequestViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """List pages must stay within their @query_budget regardless of row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=30)
+
+    def test_gso_request_management(self):
+        self.client.force_login(self.users["gso"])
+        self.assertWithinQueryBudget(reverse("gso_requests:request_management"))
+
+    def test_gso_request_modal(self):
+        self.client.force_login(self.users["gso"])
+        service_request = ServiceRequest.objects.filter(reports__isnull=False).first()
+        response = self.assertWithinQueryBudget(reverse("gso_requests:request_modal", args=[service_request.pk]))
+        self.assertContains(response, "Replaced the fixture.")
+
+    def test_request_list_leaves_reports_to_modal(self):
+        self.client.force_login(self.users["gso"])
+        response = self.client.get(reverse("gso_requests:request_management"))
+        self.assertNotContains(response, "Replaced the fixture.")
+
+    def test_unit_head_lists(self):
+        self.client.force_login(self.users["unit_head"])
+        self.assertWithinQueryBudget(reverse("gso_requests:unit_head_request_management"))
+        self.assertWithinQueryBudget(reverse("gso_requests:unit_head_request_history"))
+
+    def test_personnel_lists(self):
+        self.client.force_login(self.users["personnel"])
+        self.assertWithinQueryBudget(reverse("gso_requests:personnel_task_management"))
+        self.assertWithinQueryBudget(reverse("gso_requests:personnel_history"))
+
+    def test_requestor_lists(self):
+        self.client.force_login(self.users["requestor"])
+        self.assertWithinQueryBudget(reverse("gso_requests:requestor_request_management"))
+        self.assertWithinQueryBudget(reverse("gso_requests:requestor_request_history"))
+
+
+# -------------------------------
+# Live Events
+# -------------------------------
+class RequestLiveEventTests(TestCase):
+    """Assignments and status changes are pushed to the affected users after commit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=1)
+        cls.service_request = ServiceRequest.objects.get()
+
+    def test_assignment_publishes_to_new_personnel(self):
+        extra = User.objects.create_user("extra", role="personnel")
+        with mock.patch("apps.gso_requests.signals.send_to_users") as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service_request.assigned_personnel.add(extra)
+        payloads = send.call_args.args[0]
+        self.assertEqual(list(payloads), [extra.pk])
+        self.assertEqual(payloads[extra.pk]["type"], "task_assigned")
+
+    def test_status_change_publishes_to_everyone_involved(self):
+        service_request = ServiceRequest.objects.get(pk=self.service_request.pk)
+        service_request.status = "Cancelled" if service_request.status != "Cancelled" else "Pending"
+        with mock.patch("apps.gso_requests.signals.send_to_users") as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                service_request.save()
+                service_request.save()  # unchanged status: no second event
+        send.assert_called_once()
+        recipients = set(send.call_args.args[0])
+        self.assertEqual(recipients, {self.users["unit_head"].pk, self.users["personnel"].pk, self.users["requestor"].pk})
+
+
+# -------------------------------
+# Material Assignments
+# -------------------------------
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class MaterialAssignmentTests(TestCase):
+    """Reassigning materials returns the old stock, takes the new and keeps low-stock alerts in step."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_sample_data(requests=1)
+        cls.service_request = ServiceRequest.objects.get()
+        cls.wire, cls.bulb = InventoryItem.objects.filter(name__in=["Material 0", "Material 1"]).order_by("name")
+
+    def assign(self, **quantities):
+        self.client.force_login(self.users["unit_head"])
+        data = {"form_type": "assign_materials", "material_ids": []}
+        for item, quantity in quantities.items():
+            material = getattr(self, item)
+            data["material_ids"].append(material.id)
+            data[f"quantity_{material.id}"] = quantity
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("gso_requests:unit_head_request_detail", args=[self.service_request.pk]), data)
+
+    def stock(self):
+        return list(InventoryItem.objects.filter(id__in=[self.wire.id, self.bulb.id]).order_by("name").values_list("quantity", flat=True))
+
+    def test_reassignment_moves_stock_and_opens_alerts(self):
+        self.assign(wire=3, bulb=95)
+
+        self.assertEqual(self.stock(), [98, 5])
+        self.assertEqual(list(self.service_request.requestmaterial_set.order_by("material__name").values_list("quantity", flat=True)), [3, 95])
+        self.assertEqual(list(LowStockAlert.objects.values_list("item__name", "quantity")), [("Material 1", 5)])
+
+    def test_shortage_rolls_back_the_whole_assignment(self):
+        self.assign(wire=3, bulb=101)
+
+        self.assertEqual(self.stock(), [100, 100])
+        self.assertEqual(list(self.service_request.requestmaterial_set.values_list("material__name", "quantity")), [("Material 0", 1)])
+
+    def test_items_of_another_unit_are_not_found(self):
+        self.bulb.owned_by = Unit.objects.create(name="Plumbing")
+        self.bulb.save(update_fields=["owned_by"])
+
+        self.assertEqual(self.assign(bulb=1).status_code, 404)
+        self.assertEqual(self.stock(), [100, 100])
+
+
+# -------------------------------
+# Attachment Variants
+# -------------------------------
+class AttachmentVariantTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.requestor = User.objects.create_user("requestor", password="pass", role="requestor")
+        cls.unit = Unit.objects.create(name="Carpentry")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_request(self, name, content):
+        service_request = ServiceRequest(requestor=self.requestor, unit=self.unit, description="Broken window")
+        service_request.attachment.save(name, ContentFile(content))
+        return service_request
+
+    def png(self, size):
+        buffer = io.BytesIO()
+        Image.new("RGBA", size, (200, 0, 0, 128)).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def generate(self, service_request):
+        # The worker closes its own connection; keep the test's open
+        with mock.patch("apps.gso_requests.tasks.connection"):
+            generate_attachment_variants(service_request.id)
+        service_request.refresh_from_db()
+
+    def test_variants_fit_their_sizes(self):
+        service_request = self.create_request("window.png", self.png((2000, 1000)))
+        self.generate(service_request)
+
+        for field_name, size, suffix in (("attachment_thumbnail", (320, 160), "thumb"), ("attachment_preview", (1280, 640), "preview")):
+            field = getattr(service_request, field_name)
+            self.assertTrue(field.name.endswith(f"window_{suffix}.jpg"))
+            with Image.open(field.path) as variant:
+                self.assertEqual((variant.format, variant.mode, variant.size), ("JPEG", "RGB", size))
+        self.assertEqual(service_request.attachment_thumbnail_url, service_request.attachment_thumbnail.url)
+        self.assertEqual(service_request.attachment_preview_url, service_request.attachment_preview.url)
+
+    def test_small_images_are_not_enlarged(self):
+        service_request = self.create_request("small.png", self.png((100, 50)))
+        self.generate(service_request)
+
+        with Image.open(service_request.attachment_preview.path) as preview:
+            self.assertEqual(preview.size, (100, 50))
+
+    def test_unreadable_attachment_falls_back_to_the_original(self):
+        service_request = self.create_request("scan.png", b"not an image")
+        with self.assertLogs("apps.gso_requests.tasks", "ERROR"):
+            self.generate(service_request)
+
+        self.assertFalse(service_request.attachment_thumbnail)
+        self.assertEqual(service_request.attachment_thumbnail_url, service_request.attachment.url)
+        self.assertEqual(service_request.attachment_preview_url, service_request.attachment.url)
+
+    def test_variants_are_queued_only_for_attachments(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_attachment_variants(ServiceRequest.objects.create(requestor=self.requestor, unit=self.unit, description="No photo"))
+            queue_attachment_variants(self.create_request("window.png", self.png((10, 10))))
+
+        self.assertEqual(len(callbacks), 1)
@@ -12,6 +12,7 @@ urlpatterns = [
 
     # GSO Office
     path('management/', views.request_management, name='request_management'),
+    path('management/<int:pk>/modal/', views.request_modal, name='request_modal'),
 
     # Unit Head
     path('unit-head/management/', views.unit_head_request_management, name='unit_head_request_management'),
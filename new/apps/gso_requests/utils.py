@@ -2,10 +2,8 @@ from django.db.models import Q
 from apps.gso_requests.models import ServiceRequest
 from apps.gso_inventory.models import InventoryItem
 from apps.gso_reports.models import WorkAccomplishmentReport, SuccessIndicator
-from apps.ai_service.utils import generate_war_description  # AI util
-from apps.notifications.models import Notification
+from apps.ai_service.regeneration import queue_war_descriptions  # AI descriptions
 from django.utils import timezone
-import threading
 
 
 # -------------------------------
@@ -88,33 +86,8 @@ def create_war_from_request(request):
         war.save(update_fields=["success_indicator"])
 
     # ---------------------------
-    # Generate AI description asynchronously
+    # Generate AI description asynchronously (skipped if the inputs are unchanged)
     # ---------------------------
-    def generate_description_thread(war_instance, req):
-        description = generate_war_description(req)
-        if description:
-            war_instance.description = description
-            war_instance.save(update_fields=["description"])
-
-    threading.Thread(
-        target=generate_description_thread,
-        args=(war, request),
-        daemon=True,
-    ).start()
+    queue_war_descriptions([war.id])
 
     return war
-
-# ---------------------------
-# Notification Helper
-# ---------------------------
-def notify_users(users, message, url=None):
-    """
-    Send notifications to a list of users, automatically deduplicating.
-    `users` can be a list or queryset.
-    """
-    for user in set(users):  # set() removes duplicates
-        Notification.objects.create(
-            user=user,
-            message=message,
-            url=url
-        )
\ No newline at end of file
@@ -3,13 +3,21 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.utils import timezone
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.urls import reverse
 
-from .models import ServiceRequest, RequestMaterial, Unit, TaskReport, Feedback
+from .models import ServiceRequest, RequestMaterial, TaskReport, Feedback
 from apps.gso_accounts.models import User
 from apps.gso_inventory.models import InventoryItem
-from .utils import filter_requests, get_unit_inventory, create_war_from_request, notify_users
+from apps.gso_inventory.utils import sync_low_stock_alerts
+from apps.notifications.services import queue_notifications
+from .tasks import queue_attachment_variants
+from .utils import filter_requests, get_unit_inventory, create_war_from_request
 from apps.gso_reports.models import WorkAccomplishmentReport, SuccessIndicator
+from core.query_budget import query_budget
+from core.reference_data import get_success_indicators, get_units
 
 # -------------------------------
 # Role checks
@@ -23,9 +31,13 @@ def is_director(user): return user.is_authenticated and user.role == "director"
 # -------------------------------
 # Request Management Views (single template)
 # -------------------------------
+@query_budget(queries=8)
 @login_required
 def request_management(request):
-    requests_qs = ServiceRequest.objects.select_related("requestor", "unit").prefetch_related("assigned_personnel").order_by("-is_emergency", "-created_at")
+    # Only the summary columns; materials and reports load with the detail modal
+    requests_qs = ServiceRequest.objects.select_related("requestor__department", "unit").prefetch_related(
+        "assigned_personnel"
+    ).order_by("-is_emergency", "-created_at")
 
 
     # Apply filters
@@ -35,7 +47,7 @@ def request_management(request):
         unit_filter=request.GET.get("unit"),
     )
 
-    units = Unit.objects.all()
+    units = get_units()
 
     # Pass user role to template for role-specific buttons
     user_role = request.user.role
@@ -51,6 +63,25 @@ def request_management(request):
 
 
 
+@query_budget(queries=8)
+@login_required
+@user_passes_test(lambda u: is_gso(u) or is_director(u))
+def request_modal(request, pk):
+    """Render one request's detail modal on demand for request_management."""
+    req = get_object_or_404(
+        ServiceRequest.objects.select_related("requestor__department", "unit").prefetch_related(
+            "assigned_personnel",
+            "requestmaterial_set__material",
+            Prefetch("reports", queryset=TaskReport.objects.select_related("personnel").order_by("created_at")),
+        ),
+        pk=pk,
+    )
+    return render(request, "gso_office/partials/request_modal_content.html", {
+        "req": req,
+        "user_role": request.user.role,
+    })
+
+
 @login_required
 @user_passes_test(is_director)
 def approve_request(request, pk):
@@ -77,12 +108,15 @@ def approve_request(request, pk):
 # -------------------------------
 # Unit Head Views
 # -------------------------------
+@query_budget(queries=8)
 @login_required
 @user_passes_test(is_unit_head)
 def unit_head_request_management(request):
     requests_qs = ServiceRequest.objects.filter(
         unit=request.user.unit
-    ).exclude(status__in=["Completed", "Cancelled"]).order_by("-is_emergency", "-created_at")
+    ).exclude(status__in=["Completed", "Cancelled"]).select_related(
+        "requestor__department", "unit", "department"
+    ).prefetch_related("assigned_personnel").order_by("-is_emergency", "-created_at")
 
 
     # Apply filters
@@ -143,10 +177,7 @@ def unit_head_request_detail(request, pk):
     war = getattr(service_request, "war", None)
 
     # --- All available success indicators for that unit ---
-    indicators = SuccessIndicator.objects.filter(
-        unit=service_request.unit,
-        is_active=True
-    ).order_by("code")
+    indicators = get_success_indicators(unit=service_request.unit_id)
 
     # --- Handle Form Submissions ---
     if request.method == "POST":
@@ -184,29 +215,52 @@ def unit_head_request_detail(request, pk):
 
         # === Assign Materials ===
         elif form_type == "assign_materials":
-            # Restore previously used materials
-            for rm in service_request.requestmaterial_set.all():
-                rm.material.quantity += rm.quantity
-                rm.material.save()
-            service_request.requestmaterial_set.all().delete()
-
-            material_ids = request.POST.getlist("material_ids")
-            for material_id in material_ids:
-                qty = request.POST.get(f"quantity_{material_id}")
-                if qty and int(qty) > 0:
-                    material = get_object_or_404(InventoryItem, pk=material_id, owned_by=service_request.unit)
-                    qty = int(qty)
-                    if material.quantity < qty:
-                        messages.error(request, f"❌ Not enough {material.name} in stock.")
-                        return redirect("gso_requests:unit_head_request_detail", pk=pk)
-
-                    material.quantity -= qty
+            with transaction.atomic():
+                touched = {}
+                previous = list(service_request.requestmaterial_set.all())
+                material_ids = request.POST.getlist("material_ids")
+
+                # Lock every item being returned or taken, in id order, so concurrent
+                # assignments neither lose stock updates nor open duplicate alerts
+                locked = {
+                    item.id: item
+                    for item in InventoryItem.objects.select_for_update().filter(
+                        Q(id__in=[rm.material_id for rm in previous])
+                        | Q(id__in=material_ids, owned_by=service_request.unit)
+                    ).order_by("id")
+                }
+
+                # Restore previously used materials
+                for rm in previous:
+                    material = locked[rm.material_id]
+                    material.quantity += rm.quantity
                     material.save()
-                    RequestMaterial.objects.create(
-                        request=service_request,
-                        material=material,
-                        quantity=qty
-                    )
+                    touched[material.id] = material
+                service_request.requestmaterial_set.all().delete()
+
+                for material_id in material_ids:
+                    qty = request.POST.get(f"quantity_{material_id}")
+                    if qty and int(qty) > 0:
+                        material = locked.get(int(material_id))
+                        if material is None or material.owned_by_id != service_request.unit_id:
+                            raise Http404("No InventoryItem matches the given query.")
+                        qty = int(qty)
+                        if material.quantity < qty:
+                            # Undo the partial reassignment so stock stays consistent
+                            transaction.set_rollback(True)
+                            messages.error(request, f"❌ Not enough {material.name} in stock.")
+                            return redirect("gso_requests:unit_head_request_detail", pk=pk)
+
+                        material.quantity -= qty
+                        material.save()
+                        touched[material.id] = material
+                        RequestMaterial.objects.create(
+                            request=service_request,
+                            material=material,
+                            quantity=qty
+                        )
+
+                sync_low_stock_alerts(touched.values())
 
             messages.success(request, "✅ Material assignments saved successfully.")
             return redirect("gso_requests:unit_head_request_detail", pk=pk)
@@ -303,12 +357,15 @@ def unit_head_request_detail(request, pk):
 
 
 
+@query_budget(queries=8)
 @login_required
 @user_passes_test(is_unit_head)
 def unit_head_request_history(request):
     requests_qs = ServiceRequest.objects.filter(
         unit=request.user.unit,
         status__in=["Completed", "Cancelled"]
+    ).select_related("requestor__department", "unit", "department").prefetch_related(
+        "assigned_personnel"
     ).order_by("-created_at")
 
     requests_qs = filter_requests(requests_qs, search_query=request.GET.get("q"))
@@ -334,9 +391,12 @@ def unit_head_material_detail(request, item_id):
 # -------------------------------
 # Personnel Views
 # -------------------------------
+@query_budget(queries=8)
 @login_required
 def personnel_task_management(request):
-    tasks = ServiceRequest.objects.filter(assigned_personnel=request.user).exclude(status__in=["Completed", "Cancelled"]).distinct()
+    tasks = ServiceRequest.objects.filter(assigned_personnel=request.user).exclude(status__in=["Completed", "Cancelled"]).select_related(
+        "requestor__department", "unit", "department"
+    ).prefetch_related("assigned_personnel").distinct()
     tasks = filter_requests(tasks, search_query=request.GET.get("q"), status_filter=request.GET.get("status"))
     return render(request, "personnel/personnel_task_management/personnel_task_management.html", {"tasks": tasks})
 
@@ -358,7 +418,7 @@ def personnel_task_detail(request, pk):
     task = get_object_or_404(ServiceRequest, pk=pk, assigned_personnel=request.user)
     materials = task.requestmaterial_set.select_related("material")
     reports = task.reports.select_related("personnel").order_by("-created_at")
-    indicators = SuccessIndicator.objects.filter(is_active=True).order_by("code")
+    indicators = get_success_indicators()
 
     # ✅ Materials available in inventory for this unit
     available_materials = InventoryItem.objects.filter(
@@ -412,11 +472,14 @@ def personnel_task_detail(request, pk):
             selected_ids = request.POST.getlist("material_ids")
 
             with transaction.atomic():
+                touched = {}
+
                 # Restore inventory for previously assigned materials (in case of change)
                 for req_mat in materials:
                     inv_item = req_mat.material
                     inv_item.quantity += req_mat.quantity
                     inv_item.save()
+                    touched[inv_item.id] = inv_item
                     req_mat.delete()
 
                 # Assign new selected materials
@@ -435,6 +498,7 @@ def personnel_task_detail(request, pk):
                         # Deduct from inventory
                         material.quantity -= quantity
                         material.save()
+                        touched[material.id] = material
 
                         # Create new RequestMaterial
                         task.requestmaterial_set.create(
@@ -444,6 +508,8 @@ def personnel_task_detail(request, pk):
                     except (ValueError, InventoryItem.DoesNotExist):
                         continue
 
+                sync_low_stock_alerts(touched.values())
+
             messages.success(request, "Materials updated successfully.")
             return redirect("gso_requests:personnel_task_detail", pk=task.id)
 
@@ -476,9 +542,12 @@ def personnel_task_detail(request, pk):
 
 
 
+@query_budget(queries=8)
 @login_required
 def personnel_history(request):
-    history = ServiceRequest.objects.filter(assigned_personnel=request.user, status="Completed").order_by("-created_at")
+    history = ServiceRequest.objects.filter(assigned_personnel=request.user, status="Completed").select_related(
+        "requestor__department", "unit", "department"
+    ).prefetch_related("assigned_personnel").order_by("-created_at")
     return render(request, "personnel/personnel_history/personnel_history.html", {"history": history})
 
 
@@ -501,11 +570,14 @@ def personnel_inventory(request):
 # -------------------------------
 # Requestor Views
 # -------------------------------
+@query_budget(queries=8)
 @login_required
 @user_passes_test(is_requestor)
 def requestor_request_management(request):
-    requests_qs = ServiceRequest.objects.filter(requestor=request.user).order_by("-created_at")
-    units = Unit.objects.all()
+    requests_qs = ServiceRequest.objects.filter(requestor=request.user).select_related(
+        "requestor__department", "unit", "department"
+    ).prefetch_related("assigned_personnel").order_by("-created_at")
+    units = get_units()
     return render(request, "requestor/requestor_request_management/requestor_request_management.html", {
         "requests": requests_qs,
         "units": units,
@@ -516,7 +588,7 @@ def requestor_request_management(request):
 @user_passes_test(is_requestor)
 def add_request(request):
     if request.method == "POST":
-        ServiceRequest.objects.create(
+        service_request = ServiceRequest.objects.create(
             requestor=request.user,
             unit_id=request.POST.get("unit"),
             description=request.POST.get("description"),
@@ -527,6 +599,7 @@ def add_request(request):
             custom_contact_number=request.POST.get("custom_contact_number") or "",
             attachment=request.FILES.get("attachment"),
         )
+        queue_attachment_variants(service_request)
         return redirect("gso_requests:requestor_request_management")
     
 
@@ -544,12 +617,15 @@ def cancel_request(request, pk):
     return redirect("gso_requests:requestor_request_management")
 
 
+@query_budget(queries=8)
 @login_required
 @user_passes_test(is_requestor)
 def requestor_request_history(request):
     history = ServiceRequest.objects.filter(
         requestor=request.user,
         status__in=["Completed", "Cancelled"]
+    ).select_related("requestor__department", "unit", "department").prefetch_related(
+        "assigned_personnel"
     ).order_by("-created_at")
     return render(request, "requestor/requestor_request_history/requestor_request_history.html", {
         "request_history": history
@@ -669,21 +745,14 @@ def submit_feedback(request):
                 setattr(feedback, f"sqd{i}", int(val) if val else None)
             feedback.save()
 
-            # 🔔 Notification: GSO, Director, and Unit Head(s)
-            # GSO & Director
-            recipients_gso_director = User.objects.filter(role__in=["gso", "director"], is_active=True)
-            notify_users(
-                recipients_gso_director,
-                message=f"📝 Feedback submitted for request #{req.id} by {user.get_full_name()}",
-                url=f"/gso_requests/{req.id}/"
-            )
-
-            # Unit Head(s) of the request's unit
-            recipients_unit_heads = User.objects.filter(role="unit_head", unit=req.unit, is_active=True)
-            notify_users(
-                recipients_unit_heads,
-                message=f"📝 Feedback submitted for request #{req.id} by {user.get_full_name()}",
-                url=f"/unit_head/request/{req.id}/"
+            # 🔔 Notification: GSO, Director, and Unit Head(s) of the request's unit
+            queue_notifications(
+                f"📝 Feedback submitted for request #{req.id} by {user.get_full_name()}",
+                [
+                    (Q(role__in=["gso", "director"]), reverse("gso_requests:request_management")),
+                    (Q(role="unit_head", unit=req.unit_id), reverse("gso_requests:unit_head_request_detail", args=[req.id])),
+                ],
+                digest_key="feedback",
             )
 
             return JsonResponse({
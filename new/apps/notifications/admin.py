@@ -1,4 +1,13 @@
 from django.contrib import admin
+from .counters import delete_notifications
 from .models import Notification
 
-admin.site.register(Notification)
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    # Deletes go through the counters so unread badges stay right; saves are counted in signals.py
+    def delete_model(self, request, obj):
+        delete_notifications(Notification.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_notifications(queryset)
@@ -0,0 +1,34 @@
+# apps/notifications/consumers.py
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .counters import get_unread_count
+from .realtime import user_group
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """One socket per browser tab; receives everything published to the user's group."""
+
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = user_group(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send_json({"type": "unread", "unread": await self.unread_count(user)})
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notification_event(self, event):
+        await self.send_json(event["payload"])
+
+    @database_sync_to_async
+    def unread_count(self, user):
+        return get_unread_count(user.pk)
@@ -0,0 +1,15 @@
+# apps/notifications/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from .counters import get_unread_count
+
+
+def unread_notifications(request):
+    """{{ unread_notification_count }} for the badge; read from the cache only when a template uses it."""
+    def count():
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return 0
+        return get_unread_count(user.pk)
+
+    return {"unread_notification_count": SimpleLazyObject(count)}
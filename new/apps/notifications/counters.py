@@ -0,0 +1,135 @@
+# apps/notifications/counters.py
+"""
+Per-user unread notification counters.
+
+UnreadCounter keeps each user's unread count so the badge never needs a
+COUNT(*) over Notification. Every change is a single UPDATE with
+F("unread") + delta, so concurrent requests cannot lose increments:
+
+    bulk creates    adjust_unread(Counter(n.user_id for n in notifications))
+    single saves    signals.py (create, or is_read flipped through save())
+    mark read       adjust_unread({user_id: -rows_updated})
+    deletes         delete_notifications(queryset)
+
+Reads go through the cache (CACHES["default"]); a hit costs no queries.
+Each adjustment drops the cached value right away and again on commit, the
+same way core/reference_data.py does. recount_unread() rebuilds counters
+from the Notification table if they ever drift.
+"""
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadCounter
+
+CACHE_PREFIX = "notifications:unread"
+CACHE_TIMEOUT = 60 * 60
+
+
+def _key(user_id):
+    # Include the database name so test databases never share entries with the real one
+    return f"{CACHE_PREFIX}:{connection.settings_dict['NAME']}:{user_id}"
+
+
+def _invalidate(user_ids):
+    keys = [_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# -------------------------------
+# Reads
+# -------------------------------
+def get_unread_counts(user_ids):
+    """{user_id: unread} for the given users; one query for the cache misses, none on a full hit."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    cached = cache.get_many([_key(user_id) for user_id in user_ids])
+    counts = {user_id: cached[_key(user_id)] for user_id in user_ids if _key(user_id) in cached}
+
+    missing = user_ids - counts.keys()
+    if missing:
+        stored = dict(UnreadCounter.objects.filter(user_id__in=missing).values_list("user_id", "unread"))
+        loaded = {user_id: stored.get(user_id, 0) for user_id in missing}
+        cache.set_many({_key(user_id): count for user_id, count in loaded.items()}, CACHE_TIMEOUT)
+        counts.update(loaded)
+    return counts
+
+
+def get_unread_count(user_id):
+    return get_unread_counts([user_id])[user_id]
+
+
+# -------------------------------
+# Writes
+# -------------------------------
+def adjust_unread(deltas):
+    """Apply {user_id: delta}; one UPDATE per distinct delta, never going below zero."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    if any(delta > 0 for delta in deltas.values()):
+        # Users who never had a notification have no row yet; create it at zero, then add
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id) for user_id, delta in deltas.items() if delta > 0],
+            ignore_conflicts=True,
+        )
+
+    by_delta = {}
+    for user_id, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(user_id)
+    for delta, user_ids in by_delta.items():
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(unread=Greatest(F("unread") + delta, 0))
+
+    _invalidate(deltas)
+
+
+def mark_read(queryset):
+    """Mark the notifications in `queryset` read and decrement their owners' counters; returns how many changed."""
+    with transaction.atomic():
+        # Lock the rows so two concurrent "mark read" requests cannot both count the same notification
+        rows = list(queryset.filter(is_read=False).select_for_update().values_list("id", "user_id"))
+        if not rows:
+            return 0
+        Notification.objects.filter(id__in=[row_id for row_id, _ in rows]).update(is_read=True)
+        adjust_unread({user_id: -total for user_id, total in Counter(user_id for _, user_id in rows).items()})
+    return len(rows)
+
+
+def delete_notifications(queryset):
+    """Delete the notifications in `queryset`, decrementing counters for the unread ones."""
+    with transaction.atomic():
+        per_user = dict(
+            queryset.filter(is_read=False).values("user_id").annotate(total=Count("id"))
+            .values_list("user_id", "total")
+        )
+        deleted, _ = queryset.delete()
+        adjust_unread({user_id: -total for user_id, total in per_user.items()})
+    return deleted
+
+
+def recount_unread(user_ids=None):
+    """Rebuild counters from the Notification table, for the given users or everyone."""
+    notifications = Notification.objects.filter(is_read=False)
+    counters = UnreadCounter.objects.all()
+    if user_ids is not None:
+        user_ids = set(user_ids)
+        notifications = notifications.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        counts = dict(notifications.values("user_id").annotate(total=Count("id")).values_list("user_id", "total"))
+        counters.exclude(user_id__in=counts).update(unread=0)
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id, unread=total) for user_id, total in counts.items()],
+            update_conflicts=True, unique_fields=["user"], update_fields=["unread"],
+        )
+        stale = set(counts) | (user_ids or set())
+        if user_ids is None:
+            stale |= set(UnreadCounter.objects.values_list("user_id", flat=True))
+        _invalidate(stale)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.notifications.partitions import apply_retention
+
+
+class Command(BaseCommand):
+    help = "Drop expired notification partitions, delete old read notifications and create upcoming partitions (run monthly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=settings.NOTIFICATION_RETENTION_MONTHS,
+                            help="Keep this many whole months before the current one.")
+        parser.add_argument("--include-unread", action="store_true",
+                            help="Also remove unread notifications past the retention period.")
+        parser.add_argument("--months-ahead", type=int, default=3, help="Partitions to create ahead of time.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without removing it.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Pruning notifications older than {options['months']} months{' (dry run)' if options['dry_run'] else ''}..."
+        ))
+
+        stats = apply_retention(
+            months=options["months"], include_unread=options["include_unread"],
+            dry_run=options["dry_run"], months_ahead=options["months_ahead"],
+        )
+
+        for name in stats["created"]:
+            self.stdout.write(f"  Created partition {name}")
+        for name, rows in stats["dropped"]:
+            self.stdout.write(f"  Dropped partition {name} ({rows} rows)")
+        for name, rows in stats["kept"]:
+            self.stdout.write(self.style.WARNING(f"  Kept partition {name} ({rows} rows): it still has unread notifications"))
+        self.stdout.write(
+            f"{len(stats['dropped'])} partition(s) dropped, {stats['deleted_rows']} other row(s) "
+            f"deleted from before {stats['cutoff']:%Y-%m}."
+        )
+        self.stdout.write(self.style.SUCCESS("Notification retention applied."))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counters(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadCounter = apps.get_model("notifications", "UnreadCounter")
+    counts = (
+        Notification.objects.filter(is_read=False)
+        .values("user_id").annotate(total=Count("id")).values_list("user_id", "total")
+    )
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, unread=total) for user_id, total in counts],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gso_accounts', '0002_unit_unit_head'),
+        ('notifications', '0002_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Converts notifications_notification into a table partitioned by month of
+# created_at (PostgreSQL only; other databases keep the plain table).
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_notifications(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Notification = apps.get_model("notifications", "Notification")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    table, old = Notification._meta.db_table, f"{Notification._meta.db_table}_unpartitioned"
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+        # id loses its identity here (not supported on partitioned tables before PG 17); a sequence replaces it below
+        cursor.execute(f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)')
+
+        cursor.execute(f"""SELECT date_trunc('month', min(created_at) AT TIME ZONE 'UTC')::date FROM "{old}" """)
+        this_month = datetime.datetime.now(datetime.timezone.utc).date().replace(day=1)
+        month = min(cursor.fetchone()[0] or this_month, this_month)
+        while month <= _add_months(this_month, MONTHS_AHEAD):
+            end = _add_months(month, 1)
+            cursor.execute(
+                f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+            )
+            month = end
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+        cursor.execute(f'DROP TABLE "{old}"')
+
+        cursor.execute(f'CREATE SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+        cursor.execute(f"""ALTER TABLE "{table}" ALTER COLUMN id SET DEFAULT nextval('"{table}_id_seq"')""")
+        cursor.execute(f"""SELECT setval('"{table}_id_seq"', coalesce(max(id), 0) + 1, false) FROM "{table}" """)
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, created_at)')
+        cursor.execute(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_user_id_fk" FOREIGN KEY (user_id) '
+            f'REFERENCES "{User._meta.db_table}" (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+
+    for index in Notification._meta.indexes:
+        schema_editor.add_index(Notification, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_digest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # No reverse step: the partitioned table serves the earlier schema unchanged
+        migrations.RunPython(partition_notifications, migrations.RunPython.noop),
+    ]
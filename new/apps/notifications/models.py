@@ -3,11 +3,34 @@ from django.conf import settings
 
 
 class Notification(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
+    # Indexed through notification_user_read_idx, whose leading column is user
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications", db_index=False)
     message = models.TextField()
     link = models.URLField(blank=True, null=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bursts of the same kind of event (e.g. "feedback") are coalesced into one unread row; see services.py
+    digest_key = models.CharField(max_length=50, blank=True, default="")
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        # On PostgreSQL the table is partitioned by month of created_at; see partitions.py
+        indexes = [
+            # Unread rows for one user (digest lookups, "unread only" list)
+            models.Index(fields=["user", "is_read", "-created_at"], name="notification_user_read_idx"),
+            # Newest-first notification list for one user
+            models.Index(fields=["user", "-created_at"], name="notification_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user}: {self.message[:30]}"
+
+
+class UnreadCounter(models.Model):
+    """Denormalized unread count per user; maintained by apps/notifications/counters.py."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name="unread_counter")
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread} unread"
@@ -0,0 +1,164 @@
+# apps/notifications/partitions.py
+"""
+Monthly partitions for the notification table (PostgreSQL only).
+
+Migration 0005 turns notifications_notification into a table partitioned by
+RANGE (created_at), one partition per calendar month (UTC):
+
+    notifications_notification_p2026_10    [2026-10-01, 2026-11-01)
+    notifications_notification_default     anything without a month partition
+
+Dropping a month that has passed the retention period is a DETACH + DROP
+TABLE, which costs the same however many rows the month held and leaves no
+dead tuples behind for VACUUM. The primary key is (id, created_at), since
+PostgreSQL requires the partition key in every unique constraint; ids still
+come from a single sequence, so they stay unique and Django keeps using id as
+the pk.
+
+apply_retention() (python manage.py prune_notifications) creates upcoming
+months ahead of time, drops expired ones and deletes whatever expired rows
+are left elsewhere. That covers the DEFAULT partition, months kept for their
+unread rows, and the plain table on other databases.
+"""
+import datetime
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .counters import adjust_unread, delete_notifications
+from .models import Notification
+
+TABLE = "notifications_notification"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def _bound(month):
+    # Partition bounds are literals; spell out UTC so the session time zone does not shift them
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """{month: partition name} for every attached monthly partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            partitions[datetime.date(int(match[1]), int(match[2]), 1)] = name
+    return dict(sorted(partitions.items()))
+
+
+def create_partition(month):
+    """Create and attach the partition for `month`, moving its rows out of the DEFAULT partition."""
+    name, start, end = partition_name(month), _bound(month), _bound(add_months(month, 1))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        # ATTACH refuses while the DEFAULT partition still holds rows for this month
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        # Indexes, the primary key and the user FK are created on attach from the parent's definitions
+        cursor.execute(f"ALTER TABLE \"{TABLE}\" ATTACH PARTITION \"{name}\" FOR VALUES FROM ('{start}') TO ('{end}')")
+    return name
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    """Create any missing partitions from this month to `months_ahead` months out; returns the new names."""
+    current = month_start(today or datetime.datetime.now(datetime.timezone.utc))
+    existing = list_partitions()
+    return [
+        create_partition(month)
+        for month in (add_months(current, offset) for offset in range(months_ahead + 1))
+        if month not in existing
+    ]
+
+
+def drop_expired_partitions(before, include_unread=False, dry_run=False):
+    """
+    Drop monthly partitions that end on or before `before` (a month start).
+
+    A partition that still has unread notifications is kept unless
+    include_unread is set, in which case its owners' unread counters are
+    decremented first. Returns (dropped, kept) lists of (name, rows).
+    """
+    dropped, kept = [], []
+    for month, name in list_partitions().items():
+        if add_months(month, 1) > before:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM "{name}"')
+            rows = cursor.fetchone()[0]
+            cursor.execute(f'SELECT user_id, count(*) FROM "{name}" WHERE NOT is_read GROUP BY user_id')
+            unread = dict(cursor.fetchall())
+            if unread and not include_unread:
+                kept.append((name, rows))
+                continue
+            dropped.append((name, rows))
+            if dry_run:
+                continue
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+            adjust_unread({user_id: -total for user_id, total in unread.items()})
+    return dropped, kept
+
+
+def apply_retention(months=None, include_unread=False, dry_run=False, months_ahead=3):
+    """Remove notifications older than `months` whole months (read ones only unless include_unread)."""
+    months = settings.NOTIFICATION_RETENTION_MONTHS if months is None else months
+    cutoff_month = add_months(month_start(datetime.datetime.now(datetime.timezone.utc)), -months)
+    stats = {"cutoff": cutoff_month, "partitioned": is_partitioned(), "created": [], "dropped": [], "kept": []}
+
+    if stats["partitioned"]:
+        if not dry_run:
+            stats["created"] = ensure_partitions(months_ahead)
+        stats["dropped"], stats["kept"] = drop_expired_partitions(cutoff_month, include_unread, dry_run)
+
+    cutoff = datetime.datetime.combine(cutoff_month, datetime.time.min, tzinfo=datetime.timezone.utc)
+    leftovers = Notification.objects.filter(created_at__lt=cutoff)
+    if not include_unread:
+        leftovers = leftovers.filter(is_read=True)
+    if dry_run:
+        stats["deleted_rows"] = leftovers.count()
+    elif include_unread:
+        stats["deleted_rows"] = delete_notifications(leftovers)
+    else:
+        # Read rows do not affect unread counters, so a plain DELETE is enough
+        stats["deleted_rows"] = leftovers.delete()[0]
+    return stats
@@ -0,0 +1,80 @@
+# apps/notifications/realtime.py
+"""
+Push events to users' browsers over the notification websocket.
+
+Every connected browser tab joins its user's group (see consumers.py).
+Publishing happens after the surrounding transaction commits, so clients
+never see data that is later rolled back. Without a channel layer, or when
+it is unreachable, publishing does nothing; the next page load still
+shows the right counts.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .counters import get_unread_counts
+
+logger = logging.getLogger(__name__)
+
+
+def user_group(user_id):
+    return f"notifications.user.{user_id}"
+
+
+async def _group_send_all(layer, messages):
+    # The Postgres layer can NOTIFY every group in one round trip
+    if hasattr(layer, "group_send_many"):
+        await layer.group_send_many(messages)
+        return
+    for group, message in messages:
+        await layer.group_send(group, message)
+
+
+def send_to_users(payloads):
+    """Send {user_id: payload} to each user's open websockets right away."""
+    layer = get_channel_layer()
+    if layer is None or not payloads:
+        return
+    messages = [
+        (user_group(user_id), {"type": "notification.event", "payload": payload})
+        for user_id, payload in payloads.items()
+    ]
+    try:
+        async_to_sync(_group_send_all)(layer, messages)
+    except Exception:
+        logger.exception("Could not publish %s websocket event(s)", len(messages))
+
+
+def publish(payloads):
+    """Send {user_id: payload} once the current transaction commits."""
+    payloads = dict(payloads)
+    transaction.on_commit(lambda: send_to_users(payloads))
+
+
+def publish_notifications(notifications):
+    """Push freshly created Notification rows along with each user's new unread count."""
+    notifications = list(notifications)
+    if not notifications:
+        return
+
+    def send():
+        counts = get_unread_counts({n.user_id for n in notifications})
+        send_to_users({
+            n.user_id: {
+                "type": "notification", "message": n.message, "link": n.link, "count": n.count,
+                "unread": counts[n.user_id],
+            }
+            for n in notifications
+        })
+
+    transaction.on_commit(send)
+
+
+def publish_unread_counts(user_ids):
+    """Refresh the badge in every open tab, e.g. after notifications are marked read."""
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: send_to_users({
+        user_id: {"type": "unread", "unread": count} for user_id, count in get_unread_counts(user_ids).items()
+    }))
@@ -0,0 +1,139 @@
+# apps/notifications/services.py
+"""
+Notification fan-out.
+
+Recipients are given as groups: a Q filter on User, optionally paired with
+the link that group should get, e.g.
+
+    queue_notifications("📝 New feedback", [
+        (Q(role__in=["gso", "director"]), reverse("gso_requests:request_management")),
+        (Q(role="unit_head", unit=unit), reverse("gso_requests:unit_head_request_detail", args=[pk])),
+    ])
+
+All groups are resolved with a single values_list query. A user matched by
+several groups is notified once, with the link of the first group that
+matches, and every row is written with one bulk_create.
+
+Events that come in bursts pass a digest_key. A recipient who still has an
+unread notification with that key from the last NOTIFICATION_DIGEST_WINDOW
+seconds gets that row updated instead of a new one: it takes the latest
+message and link, its count goes up and it moves back to the top of the list.
+Thirty feedback submissions in an afternoon then leave one row per recipient.
+"""
+import datetime
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.utils import timezone
+
+from apps.gso_accounts.models import User
+from .counters import adjust_unread
+from .models import Notification
+from .realtime import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_groups(groups, link=None):
+    normalized = []
+    for group in groups:
+        condition, group_link = group if isinstance(group, tuple) else (group, link)
+        normalized.append((condition, group_link))
+    return normalized
+
+
+def resolve_recipients(groups, link=None):
+    """{user_id: link} for every active user matched by any group, in one query."""
+    groups = _normalize_groups(groups, link)
+    if not groups:
+        return {}
+
+    matches_any = Q()
+    for condition, _link in groups:
+        matches_any |= condition
+    rows = (
+        User.objects.filter(matches_any, is_active=True)
+        .annotate(notification_link=Case(
+            *[When(condition, then=Value(group_link)) for condition, group_link in groups],
+            output_field=CharField(null=True),
+        ))
+        .values_list("id", "notification_link")
+    )
+    return dict(rows)
+
+
+def create_notifications(notifications):
+    """bulk_create unsaved Notifications, bump their owners' unread counters and push them live."""
+    notifications = Notification.objects.bulk_create(notifications)
+    adjust_unread(Counter(n.user_id for n in notifications if not n.is_read))
+    publish_notifications(notifications)
+    return notifications
+
+
+def coalesce_into_digests(message, recipients, digest_key):
+    """Fold the event into each recipient's recent unread `digest_key` row; returns the rows updated."""
+    since = timezone.now() - datetime.timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW)
+    with transaction.atomic():
+        latest = {}
+        for row_id, user_id in (
+            Notification.objects.filter(
+                user_id__in=recipients, digest_key=digest_key, is_read=False, created_at__gte=since,
+            ).select_for_update().order_by("-created_at").values_list("id", "user_id")
+        ):
+            latest.setdefault(user_id, row_id)
+        if not latest:
+            return []
+
+        Notification.objects.filter(id__in=latest.values()).update(
+            message=message,
+            link=Case(*[When(user_id=user_id, then=Value(recipients[user_id])) for user_id in latest],
+                      output_field=CharField(null=True)),
+            count=F("count") + 1,
+            created_at=timezone.now(),
+        )
+        return list(Notification.objects.filter(id__in=latest.values()))
+
+
+def send_notifications(message, groups, link=None, digest_key=""):
+    """Notify each distinct recipient once, coalescing into digests when digest_key is given; returns how many."""
+    recipients = resolve_recipients(groups, link)
+    digested = []
+    if digest_key and recipients:
+        digested = coalesce_into_digests(message, recipients, digest_key)
+        for notification in digested:
+            recipients.pop(notification.user_id)
+        # The unread count is unchanged; only the live toast goes out
+        publish_notifications(digested)
+
+    notifications = create_notifications([
+        Notification(user_id=user_id, message=message, link=user_link, digest_key=digest_key)
+        for user_id, user_link in recipients.items()
+    ])
+    return len(notifications) + len(digested)
+
+
+def _send_in_background(message, groups, link, digest_key):
+    try:
+        send_notifications(message, groups, link, digest_key)
+    except Exception:
+        logger.exception("Could not send notification %r", message[:50])
+    finally:
+        connection.close()
+
+
+def queue_notifications(message, groups, link=None, digest_key=""):
+    """Send notifications from a background thread once the current transaction commits."""
+    groups = list(groups)
+
+    def launch():
+        threading.Thread(
+            target=_send_in_background,
+            args=(message, groups, link, digest_key),
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(launch)
@@ -0,0 +1,28 @@
+# apps/notifications/signals.py
+"""Keep unread counters right for notifications created or edited one at a time with save()."""
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from .counters import adjust_unread
+from .models import Notification
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    # __dict__ so a deferred is_read field is not loaded just for this
+    instance._loaded_is_read = instance.__dict__.get("is_read")
+    instance._loaded_user_id = instance.__dict__.get("user_id")
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_change(sender, instance, created, **kwargs):
+    was_unread = not created and instance._loaded_is_read is False
+    previous_user_id = instance._loaded_user_id
+    instance._loaded_is_read, instance._loaded_user_id = instance.is_read, instance.user_id
+
+    deltas = {}
+    if was_unread:
+        deltas[previous_user_id] = -1
+    if not instance.is_read:
+        deltas[instance.user_id] = deltas.get(instance.user_id, 0) + 1
+    adjust_unread(deltas)
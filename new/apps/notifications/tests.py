@@ -1,3 +1,269 @@
-from django.test import TestCase
+import datetime
+import json
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.gso_accounts.models import Unit, User
+from core.testing import QueryBudgetMixin, QueryPlanMixin
+from . import partitions
+from .consumers import NotificationConsumer
+from .context_processors import unread_notifications
+from .counters import delete_notifications, get_unread_count, recount_unread
+from .models import Notification, UnreadCounter
+from .realtime import send_to_users
+from .services import queue_notifications, send_notifications
+
+
+# -------------------------------
+# Query Plans
+# -------------------------------
+class NotificationQueryPlanTests(QueryPlanMixin, TestCase):
+    """Unread badges and the notification list must stay index-backed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create([User(username=f"user{i}", role="requestor") for i in range(20)])
+        Notification.objects.bulk_create([
+            Notification(user=cls.users[i % 20], message=f"Notification {i}", is_read=(i % 10 != 0))
+            for i in range(3000)
+        ])
+        cls.analyze_tables(Notification)
+
+    # SQLite gets "NOT is_read", which it cannot match to an index column, and falls back to the user prefix
+    @unittest.skipUnless(connection.vendor == "postgresql", "SQLite cannot index NOT is_read")
+    def test_unread_list_uses_index(self):
+        queryset = self.users[0].notifications.filter(is_read=False).order_by("-created_at")
+        self.assertUsesIndex(queryset, "notification_user_read_idx")
+
+    def test_full_list_uses_index(self):
+        queryset = self.users[0].notifications.order_by("-created_at")[:25]
+        self.assertUsesIndex(queryset, "notification_user_created_idx")
+
+
+# -------------------------------
+# Fan-out
+# -------------------------------
+class NotificationServiceTests(TestCase):
+    """Recipients resolve in one query and are inserted with one bulk_create."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = Unit.objects.create(name="Plumbing")
+        cls.gso = User.objects.create_user("gso", role="gso")
+        cls.director = User.objects.create_user("director", role="director")
+        cls.head = User.objects.create_user("head", role="unit_head", unit=cls.unit)
+        cls.other_head = User.objects.create_user("other_head", role="unit_head")
+        cls.inactive = User.objects.create_user("old_gso", role="gso", is_active=False)
+
+    def test_groups_are_deduplicated_with_first_link(self):
+        groups = [
+            (Q(role__in=["gso", "director"]), "/gso/"),
+            (Q(role="unit_head", unit=self.unit) | Q(role="gso"), "/head/"),
+        ]
+        # resolve + insert, then create-missing + F() update for the unread counters
+        with self.assertNumQueries(4):
+            sent = send_notifications("Feedback submitted", groups)
+
+        self.assertEqual(sent, 3)
+        links = dict(Notification.objects.values_list("user__username", "link"))
+        self.assertEqual(links, {"gso": "/gso/", "director": "/gso/", "head": "/head/"})
+
+    def test_plain_filters_use_default_link(self):
+        send_notifications("Heads up", [Q(role="unit_head")], link="/inventory/")
+        self.assertEqual(set(Notification.objects.values_list("link", flat=True)), {"/inventory/"})
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_digest_coalesces_bursts(self):
+        for i in range(3):
+            send_notifications(f"Feedback #{i}", [(Q(role="gso"), f"/feedback/{i}/")], digest_key="feedback")
+        send_notifications("Unrelated", [Q(role="gso")])
+
+        digest = Notification.objects.get(user=self.gso, digest_key="feedback")
+        self.assertEqual((digest.message, digest.link, digest.count), ("Feedback #2", "/feedback/2/", 3))
+        self.assertEqual(get_unread_count(self.gso.pk), 2)
+
+    def test_read_digest_starts_a_new_one(self):
+        send_notifications("Feedback #1", [Q(role="gso")], digest_key="feedback")
+        Notification.objects.filter(user=self.gso).update(is_read=True)
+        send_notifications("Feedback #2", [Q(role="gso")], digest_key="feedback")
+        self.assertEqual(Notification.objects.filter(user=self.gso).count(), 2)
+
+    def test_queue_waits_for_commit(self):
+        with mock.patch("apps.notifications.services.threading.Thread") as thread:
+            with self.captureOnCommitCallbacks() as callbacks:
+                queue_notifications("Later", [Q(role="gso")])
+            thread.assert_not_called()
+            callbacks[0]()
+        thread.return_value.start.assert_called_once()
+
+
+# -------------------------------
+# Unread Counters
+# -------------------------------
+class UnreadCounterTests(TestCase):
+    """The denormalized counter follows creates, reads and deletes, and the badge reads it from the cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("counted", password="pass", role="personnel")
+        cls.other = User.objects.create_user("other", role="personnel")
+
+    def setUp(self):
+        cache.clear()
+        send_notifications("First", [Q(pk=self.user.pk) | Q(pk=self.other.pk)], link="/a/")
+        send_notifications("Second", [Q(pk=self.user.pk)], link="/b/")
+
+    def stored(self, user):
+        return UnreadCounter.objects.get(user=user).unread
+
+    def test_bulk_and_single_creates_are_counted(self):
+        Notification.objects.create(user=self.user, message="Third")
+        Notification.objects.create(user=self.user, message="Already read", is_read=True)
+        self.assertEqual(self.stored(self.user), 3)
+        self.assertEqual(self.stored(self.other), 1)
+
+    def test_mark_as_read_decrements_once(self):
+        self.client.force_login(self.user)
+        notification = self.user.notifications.first()
+        url = reverse("notifications:mark_as_read", args=[notification.pk])
+        self.client.get(url, HTTP_HOST="127.0.0.1")
+        self.client.get(url, HTTP_HOST="127.0.0.1")
+        self.assertEqual(self.stored(self.user), 1)
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+    def test_mark_all_as_read(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("notifications:mark_all_as_read"), HTTP_HOST="127.0.0.1")
+        self.assertRedirects(response, reverse("notifications:notification_list"), fetch_redirect_response=False)
+        self.assertEqual(self.stored(self.user), 0)
+        self.assertEqual(self.stored(self.other), 1)
+
+    def test_delete_and_recount(self):
+        delete_notifications(self.user.notifications.filter(message="First"))
+        self.assertEqual(self.stored(self.user), 1)
+
+        UnreadCounter.objects.update(unread=40)
+        recount_unread()
+        self.assertEqual((self.stored(self.user), self.stored(self.other)), (1, 1))
+
+    def test_context_processor_costs_no_queries_on_cache_hit(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        self.assertEqual(str(unread_notifications(request)["unread_notification_count"]), "2")
+        with self.assertNumQueries(0):
+            self.assertEqual(str(unread_notifications(request)["unread_notification_count"]), "2")
+
+
+# -------------------------------
+# List and Retention
+# -------------------------------
+class NotificationListTests(QueryBudgetMixin, TestCase):
+    """The list is paginated, rendered inside the user's own dashboard and within its query budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("listed", password="pass", role="requestor")
+        Notification.objects.bulk_create([
+            Notification(user=cls.user, message=f"Notice {i}", is_read=i % 2 == 0) for i in range(60)
+        ])
+
+    def setUp(self):
+        self.client.defaults["HTTP_HOST"] = "127.0.0.1"
+        self.client.force_login(self.user)
+
+    def test_pages_within_budget(self):
+        response = self.assertWithinQueryBudget(reverse("notifications:notification_list"), {"page": 2})
+        self.assertTemplateUsed(response, "requestor/requestor_base_dashboard.html")
+        self.assertEqual(len(response.context["notifications"]), 25)
+        self.assertEqual(response.context["page_obj"].paginator.count, 60)
+
+    def test_unread_only(self):
+        response = self.client.get(reverse("notifications:notification_list"), {"unread": "1"})
+        self.assertEqual(response.context["page_obj"].paginator.count, 30)
+
+
+class NotificationRetentionTests(TestCase):
+    """Old read notifications are removed; old unread ones are kept unless asked."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("retained", role="personnel")
+
+    def notify(self, days_ago, is_read):
+        notification = Notification.objects.create(user=self.user, message=f"{days_ago} days", is_read=is_read)
+        created_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_ago)
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+
+    def test_old_read_notifications_are_removed(self):
+        self.notify(400, is_read=True)
+        self.notify(400, is_read=False)
+        self.notify(1, is_read=True)
+
+        stats = partitions.apply_retention(months=6)
+        self.assertEqual(stats["partitioned"], connection.vendor == "postgresql")
+        self.assertEqual(set(Notification.objects.values_list("message", "is_read")), {("400 days", False), ("1 days", True)})
+
+        partitions.apply_retention(months=6, include_unread=True)
+        self.assertEqual(list(Notification.objects.values_list("message", flat=True)), ["1 days"])
+        self.assertEqual(get_unread_count(self.user.pk), 0)
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+    def test_new_partition_takes_rows_from_default(self):
+        self.notify(365 * 5, is_read=False)
+        month = partitions.month_start(datetime.date.today() - datetime.timedelta(days=365 * 5))
+        self.assertNotIn(month, partitions.list_partitions())
+
+        partitions.create_partition(month)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM "{partitions.partition_name(month)}"')
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+
+# -------------------------------
+# Live Delivery
+# -------------------------------
+# The Postgres layer has its own tests in core; keep consumer tests off shared LISTEN connections
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class NotificationConsumerTests(TransactionTestCase):
+    """The websocket joins the user's group, sends the unread count and relays events."""
+
+    # database_sync_to_async closes connections between calls, which TestCase's wrapping transaction cannot survive
+    def setUp(self):
+        self.user = User.objects.create_user("live", role="personnel")
+        Notification.objects.create(user=self.user, message="Unread")
+
+    async def connect(self, user):
+        # channels.testing needs daphne, so drive the consumer through asgiref directly
+        scope = {"type": "websocket", "path": "/ws/notifications/", "headers": [], "subprotocols": [], "user": user}
+        communicator = ApplicationCommunicator(NotificationConsumer.as_asgi(), scope)
+        await communicator.send_input({"type": "websocket.connect"})
+        response = await communicator.receive_output()
+        return communicator, response["type"] == "websocket.accept"
+
+    async def receive_json(self, communicator):
+        response = await communicator.receive_output()
+        return json.loads(response["text"])
+
+    async def test_anonymous_is_rejected(self):
+        _, connected = await self.connect(AnonymousUser())
+        self.assertFalse(connected)
+
+    async def test_receives_unread_count_and_events(self):
+        communicator, connected = await self.connect(self.user)
+        self.assertTrue(connected)
+        self.assertEqual(await self.receive_json(communicator), {"type": "unread", "unread": 1})
+
+        await sync_to_async(send_to_users)({self.user.pk: {"type": "task_assigned", "request_id": 7}})
+        self.assertEqual(await self.receive_json(communicator), {"type": "task_assigned", "request_id": 7})
+        await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+        await communicator.wait()
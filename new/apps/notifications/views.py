@@ -1,26 +1,53 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from core.query_budget import query_budget
+from .counters import mark_read
 from .models import Notification
+from .realtime import publish_unread_counts
 from django.contrib import messages
 
+NOTIFICATION_PAGE_SIZE = 25
+
+# The list is shared by every role, inside that role's dashboard
+BASE_TEMPLATES = {
+    "director": "gso_office/gso_base_dashboard.html",
+    "gso": "gso_office/gso_base_dashboard.html",
+    "unit_head": "unit_heads/unit_head_base_dashboard.html",
+    "personnel": "personnel/personnel_base_dashboard.html",
+    "requestor": "requestor/requestor_base_dashboard.html",
+}
+
+@query_budget(queries=6)
 @login_required
 def notification_list(request):
-    """Show all notifications for logged-in user"""
-    notifications = request.user.notifications.all().order_by("-created_at")
-    return render(request, "notifications/notification_list.html", {"notifications": notifications})
+    """One page of the logged-in user's notifications, newest first"""
+    unread_only = request.GET.get("unread") == "1"
+    notifications = request.user.notifications.order_by("-created_at")
+    if unread_only:
+        notifications = notifications.filter(is_read=False)
+    # Served by notification_user_created_idx / notification_user_read_idx in every partition
+    page_obj = Paginator(notifications, NOTIFICATION_PAGE_SIZE).get_page(request.GET.get("page"))
+    return render(request, "notifications/notification_list.html", {
+        "base_template": BASE_TEMPLATES.get(request.user.role, BASE_TEMPLATES["requestor"]),
+        "notifications": page_obj,
+        "page_obj": page_obj,
+        "unread_only": unread_only,
+    })
 
 @login_required
 def mark_as_read(request, notification_id):
     """Mark a notification as read"""
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    if mark_read(Notification.objects.filter(pk=notification.pk)):
+        publish_unread_counts([request.user.id])
     messages.success(request, "Notification marked as read.")
-    return redirect("notification_list")
+    return redirect("notifications:notification_list")
 
 @login_required
 def mark_all_as_read(request):
     """Mark all notifications for user as read"""
-    request.user.notifications.filter(is_read=False).update(is_read=True)
+    if mark_read(request.user.notifications.all()):
+        publish_unread_counts([request.user.id])
     messages.success(request, "All notifications marked as read.")
-    return redirect("notification_list")
+    return redirect("notifications:notification_list")
@@ -0,0 +1,351 @@
+# core/channel_layers.py
+"""
+Channel layer on PostgreSQL LISTEN/NOTIFY, so several ASGI worker processes
+can share websocket groups without running Redis.
+
+Each process keeps its own channels and group memberships in memory and
+holds one extra database connection that LISTENs on:
+
+    cl_c_<hash>   one per process (its specific channels) or named channel
+    cl_g_<hash>   one per group that has a member in this process
+
+send() and group_send() are a pg_notify() to the matching Postgres channel,
+so every process with a member receives the message and delivers it to its
+local queues. NOTIFY payloads are limited to 8000 bytes. Larger messages
+are stored in the ChannelLayerMessage table, and only the row id is sent.
+
+Messages are JSON-encoded, so they may only contain JSON types. A plain
+named channel (no "!") is delivered to every process receiving on it, so
+background workers should keep to one process. Requires psycopg2. Configure
+with:
+
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "core.channel_layers.PostgresChannelLayer",
+            "CONFIG": {"database": "default"},
+        },
+    }
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import string
+import threading
+import time
+import uuid
+from copy import deepcopy
+
+import psycopg2
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# pg_notify rejects payloads of 8000 bytes or more; keep headroom for the envelope
+MAX_NOTIFY_BYTES = 7500
+
+
+def overflow_table():
+    from core.models import ChannelLayerMessage
+    return ChannelLayerMessage._meta.db_table
+
+
+def pg_channel_name(kind, name):
+    """Postgres channel for a layer channel ("c") or group ("g"); identifiers max out at 63 bytes."""
+    return f"cl_{kind}_{hashlib.sha1(name.encode()).hexdigest()}"
+
+
+class PostgresChannelLayer(BaseChannelLayer):
+    extensions = ["groups", "flush"]
+
+    def __init__(self, database="default", expiry=60, capacity=100, channel_capacity=None,
+                 overflow_expiry=300, reconnect_delay=1.0, **kwargs):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.database = database
+        self.overflow_expiry = overflow_expiry
+        self.reconnect_delay = reconnect_delay
+        self.client_prefix = f"pg{uuid.uuid4().hex[:12]}"
+
+        # Process-local state, only touched from the listener's event loop
+        self.channels = {}            # channel -> asyncio.Queue of (expires_at, message)
+        self.groups = {}              # group -> set of local channels
+        self._listening = set()       # Postgres channels LISTENed on
+        self._listener = None
+        self._listener_loop = None
+
+        # Senders may run in any thread (async_to_sync), so the NOTIFY connection is locked
+        self._send_connection = None
+        self._send_lock = threading.Lock()
+
+    # -------------------------------
+    # Connections
+    # -------------------------------
+    def _connect(self):
+        params = connections[self.database].get_connection_params()
+        connection = psycopg2.connect(**params)
+        connection.autocommit = True
+        return connection
+
+    def _with_send_cursor(self, work):
+        """Blocking: run work(cursor) on the shared autocommit connection, reconnecting once if it dropped."""
+        with self._send_lock:
+            for attempt in (1, 2):
+                try:
+                    if self._send_connection is None or self._send_connection.closed:
+                        self._send_connection = self._connect()
+                    with self._send_connection.cursor() as cursor:
+                        return work(cursor)
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    self._close_send_connection()
+                    if attempt == 2:
+                        raise
+
+    def _execute_notifies(self, notifies):
+        """pg_notify each (pg_channel, envelope), spilling large ones to the overflow table."""
+        table = overflow_table()
+
+        def work(cursor):
+            overflowed = False
+            for pg_channel, envelope in notifies:
+                payload = json.dumps(envelope, separators=(",", ":"))
+                if len(payload.encode()) > MAX_NOTIFY_BYTES:
+                    cursor.execute(
+                        f'INSERT INTO "{table}" (payload, created_at) VALUES (%s, now()) RETURNING id', [payload]
+                    )
+                    payload = json.dumps({"o": cursor.fetchone()[0]})
+                    overflowed = True
+                cursor.execute("SELECT pg_notify(%s, %s)", [pg_channel, payload])
+            if overflowed:
+                cursor.execute(
+                    f'DELETE FROM "{table}" WHERE created_at < now() - make_interval(secs => %s)',
+                    [self.overflow_expiry],
+                )
+
+        self._with_send_cursor(work)
+
+    def _fetch_overflow(self, message_id):
+        def work(cursor):
+            cursor.execute(f'SELECT payload FROM "{overflow_table()}" WHERE id = %s', [message_id])
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+        return self._with_send_cursor(work)
+
+    def _close_send_connection(self):
+        if self._send_connection is not None:
+            try:
+                self._send_connection.close()
+            except psycopg2.Error:
+                pass
+            self._send_connection = None
+
+    async def _notify(self, notifies):
+        await asyncio.get_running_loop().run_in_executor(None, self._execute_notifies, notifies)
+
+    # -------------------------------
+    # Listener
+    # -------------------------------
+    async def _ensure_listener(self):
+        loop = asyncio.get_running_loop()
+        if self._listener is not None and self._listener_loop is loop and not self._listener.closed:
+            return
+        if self._listener_loop is not None and self._listener_loop is not loop:
+            # The previous loop is gone (e.g. a finished async_to_sync call); start over on this one
+            self._stop_listener()
+        # Connecting blocks the loop briefly, but only once per process (and after a dropped connection)
+        self._listener = self._connect()
+        self._listener_loop = loop
+        for pg_channel in self._listening:
+            self._execute_on_listener(f'LISTEN "{pg_channel}"')
+        loop.add_reader(self._listener.fileno(), self._on_readable)
+
+    def _stop_listener(self):
+        if self._listener is None:
+            return
+        try:
+            if self._listener_loop and not self._listener_loop.is_closed():
+                self._listener_loop.remove_reader(self._listener.fileno())
+        except (ValueError, psycopg2.InterfaceError):
+            pass
+        try:
+            self._listener.close()
+        except psycopg2.Error:
+            pass
+        self._listener = None
+
+    async def _listen(self, pg_channel):
+        await self._ensure_listener()
+        if pg_channel not in self._listening:
+            self._listening.add(pg_channel)
+            self._execute_on_listener(f'LISTEN "{pg_channel}"')
+
+    def _unlisten(self, pg_channel):
+        if pg_channel in self._listening:
+            self._listening.discard(pg_channel)
+            if self._listener is not None and not self._listener.closed:
+                self._execute_on_listener(f'UNLISTEN "{pg_channel}"')
+
+    def _execute_on_listener(self, sql):
+        with self._listener.cursor() as cursor:
+            cursor.execute(sql)
+        # Notifies that arrived with the reply were read off the socket, so it will
+        # not turn readable for them; deliver them now or they wait for the next one
+        self._dispatch_notifies()
+
+    def _on_readable(self):
+        try:
+            self._listener.poll()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            logger.warning("Channel layer lost its LISTEN connection; reconnecting")
+            loop = self._listener_loop
+            self._stop_listener()
+            loop.call_later(self.reconnect_delay, lambda: loop.create_task(self._ensure_listener()))
+            return
+        self._dispatch_notifies()
+
+    def _dispatch_notifies(self):
+        while self._listener.notifies:
+            notify = self._listener.notifies.pop(0)
+            envelope = json.loads(notify.payload)
+            if "o" in envelope:
+                self._listener_loop.create_task(self._deliver_overflow(envelope["o"]))
+            else:
+                self._deliver(envelope)
+
+    async def _deliver_overflow(self, message_id):
+        payload = await asyncio.get_running_loop().run_in_executor(None, self._fetch_overflow, message_id)
+        if payload is None:
+            logger.warning("Channel layer overflow message %s expired before delivery", message_id)
+            return
+        self._deliver(json.loads(payload))
+
+    def _deliver(self, envelope):
+        if envelope["x"] < time.time():
+            return
+        if "g" in envelope:
+            targets = self.groups.get(envelope["g"], ())
+        else:
+            targets = [envelope["c"]]
+        for channel in targets:
+            queue = self._queue(channel)
+            try:
+                queue.put_nowait((envelope["x"], deepcopy(envelope["m"])))
+            except asyncio.QueueFull:
+                logger.warning("Channel %s is full; dropping message", channel)
+
+    # -------------------------------
+    # Channel Layer API
+    # -------------------------------
+    def _queue(self, channel):
+        queue = self.channels.get(channel)
+        if queue is None:
+            queue = self.channels[channel] = asyncio.Queue(maxsize=self.get_capacity(channel))
+        return queue
+
+    def _is_local(self, channel):
+        return "!" in channel and self.non_local_name(channel) == f"specific.{self.client_prefix}!"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+
+        expires_at = time.time() + self.expiry
+        if self._is_local(channel) and self._listener_loop is asyncio.get_running_loop():
+            try:
+                self._queue(channel).put_nowait((expires_at, deepcopy(message)))
+            except asyncio.QueueFull:
+                raise ChannelFull(channel)
+            return
+        envelope = {"c": channel, "m": message, "x": expires_at}
+        await self._notify([(pg_channel_name("c", self.non_local_name(channel)), envelope)])
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        await self._listen(pg_channel_name("c", self.non_local_name(channel)))
+        self._clean_expired()
+
+        queue = self._queue(channel)
+        while True:
+            try:
+                expires_at, message = await queue.get()
+            finally:
+                if queue.empty() and self.channels.get(channel) is queue:
+                    self.channels.pop(channel, None)
+            if expires_at >= time.time():
+                return message
+
+    async def new_channel(self, prefix="specific"):
+        return "%s.%s!%s" % (
+            prefix,
+            self.client_prefix,
+            "".join(random.choice(string.ascii_letters) for _ in range(12)),
+        )
+
+    def _clean_expired(self):
+        # A channel whose oldest message expired has no live reader; drop it from its groups.
+        # Empty queues stay put: another receive() may be waiting on them.
+        now = time.time()
+        for channel, queue in list(self.channels.items()):
+            while not queue.empty() and queue._queue[0][0] < now:
+                queue.get_nowait()
+                self._remove_from_groups(channel)
+
+    def _remove_from_groups(self, channel):
+        for group in list(self.groups):
+            self._discard_local(group, channel)
+
+    def _discard_local(self, group, channel):
+        members = self.groups.get(group)
+        if not members:
+            return
+        members.discard(channel)
+        if not members:
+            del self.groups[group]
+            self._unlisten(pg_channel_name("g", group))
+
+    async def flush(self):
+        self.channels = {}
+        for group in list(self.groups):
+            self._unlisten(pg_channel_name("g", group))
+        self.groups = {}
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._with_send_cursor, lambda cursor: cursor.execute(f'DELETE FROM "{overflow_table()}"')
+        )
+
+    async def close(self):
+        self._stop_listener()
+        with self._send_lock:
+            self._close_send_connection()
+
+    # -------------------------------
+    # Groups Extension
+    # -------------------------------
+    async def group_add(self, group, channel):
+        """Join a group. Call this from the process that owns the channel, as consumers do."""
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._listen(pg_channel_name("g", group))
+        self.groups.setdefault(group, set()).add(channel)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_channel_name(channel)
+        self.require_valid_group_name(group)
+        self._discard_local(group, channel)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        envelope = {"g": group, "m": message, "x": time.time() + self.expiry}
+        await self._notify([(pg_channel_name("g", group), envelope)])
+
+    async def group_send_many(self, messages):
+        """group_send several (group, message) pairs in one round trip; used for notification fan-out."""
+        expires_at = time.time() + self.expiry
+        await self._notify([
+            (pg_channel_name("g", group), {"g": group, "m": message, "x": expires_at})
+            for group, message in messages
+        ])
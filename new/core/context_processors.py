@@ -0,0 +1,23 @@
+# core/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from .reference_data import get_departments, get_units
+
+
+def _find(rows, pk):
+    return next((row for row in rows if row.pk == pk), None) if pk else None
+
+
+def reference_data(request):
+    """
+    {{ user_unit }} and {{ user_department }} for the dashboard headers, read
+    from the reference-data cache instead of querying user.unit and
+    user.department on every page.
+    """
+    user = getattr(request, "user", None)
+    unit_id = getattr(user, "unit_id", None)
+    department_id = getattr(user, "department_id", None)
+    return {
+        "user_unit": SimpleLazyObject(lambda: _find(get_units(), unit_id)),
+        "user_department": SimpleLazyObject(lambda: _find(get_departments(), department_id)),
+    }
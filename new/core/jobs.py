@@ -0,0 +1,87 @@
+# core/jobs.py
+"""
+Liveness of background jobs: migration uploads, WAR regeneration and IPMT
+summary jobs.
+
+These jobs run in daemon threads of the web process, so a restart kills
+them without a trace and leaves their row PENDING or PROCESSING. While a job
+works, heartbeat() stamps heartbeat_at every JOB_HEARTBEAT_SECONDS from a
+side thread, however long a single step takes. A running row whose heartbeat
+is older than JOB_STALE_SECONDS (or missing) is stale: nothing is working on
+it, so it may be started again.
+
+claim() moves a row to PENDING in one conditional UPDATE, only if it is not
+running or is stale. Two admins clicking "re-run" at once therefore launch
+it once.
+"""
+import datetime
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RUNNING_STATUSES = ("PENDING", "PROCESSING")
+
+
+def stale_cutoff():
+    return timezone.now() - datetime.timedelta(seconds=settings.JOB_STALE_SECONDS)
+
+
+def claimable():
+    """Q for rows that may be started: not running, or running without a recent heartbeat."""
+    return (
+        ~Q(status__in=RUNNING_STATUSES)
+        | Q(heartbeat_at__isnull=True)
+        | Q(heartbeat_at__lt=stale_cutoff())
+    )
+
+
+def running_now():
+    """Q for rows that are running and still heartbeating."""
+    return Q(status__in=RUNNING_STATUSES, heartbeat_at__gte=stale_cutoff())
+
+
+def claim(queryset, **changes):
+    """Mark the claimable rows of `queryset` PENDING; returns how many were claimed."""
+    return queryset.filter(claimable()).update(status="PENDING", heartbeat_at=timezone.now(), **changes)
+
+
+class HeartbeatMixin:
+    """is_stale for models with status and heartbeat_at fields."""
+
+    @property
+    def is_stale(self):
+        """Running on paper, but silent for longer than JOB_STALE_SECONDS (e.g. the worker restarted)."""
+        return self.status in RUNNING_STATUSES and (
+            self.heartbeat_at is None or self.heartbeat_at < stale_cutoff()
+        )
+
+
+@contextmanager
+def heartbeat(queryset, interval=None):
+    """Stamp heartbeat_at on `queryset` every `interval` seconds while the block runs."""
+    interval = interval or settings.JOB_HEARTBEAT_SECONDS
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    queryset.update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.warning("Could not record job heartbeat", exc_info=True)
+        finally:
+            connection.close()
+
+    queryset.update(heartbeat_at=timezone.now())
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        yield
+    finally:
+        stop.set()
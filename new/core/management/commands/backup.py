@@ -1,18 +1,25 @@
 from django.core.management.base import BaseCommand
-from django.conf import settings
-from core.scripts.backup import backup_database, backup_media, cleanup_old_backups
+from core.scripts.backup import (
+    backup_database, backup_media, apply_retention_policy,
+    get_backup_dir, get_backup_size, format_size, read_manifest_stats,
+)
 import datetime
 import os
+import time
 
 
 class Command(BaseCommand):
     help = "Performs an automated backup of the database and media files."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=None, help="Parallel pg_dump jobs (default: BACKUP_DUMP_JOBS).")
+        parser.add_argument("--compression", type=int, default=None, help="pg_dump compression level 0-9 (default: BACKUP_DUMP_COMPRESSION).")
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS("Starting automated backup process...\n"))
 
         # Optional: Create a logs directory
-        log_dir = os.path.join(settings.BASE_DIR, 'backups', 'logs')
+        log_dir = os.path.join(get_backup_dir(), 'logs')
         os.makedirs(log_dir, exist_ok=True)
         log_file = os.path.join(log_dir, f"backup_log_{datetime.datetime.now().strftime('%Y-%m-%d')}.txt")
 
@@ -23,9 +30,12 @@ class Command(BaseCommand):
                 # 1️⃣ DATABASE BACKUP
                 self.stdout.write(self.style.MIGRATE_HEADING("Step 1: Database Backup"))
                 try:
-                    db_backup_path = backup_database()
-                    log.write(f"Database backup: {db_backup_path}\n")
-                    self.stdout.write(self.style.SUCCESS("Database backup completed!\n"))
+                    started = time.perf_counter()
+                    db_backup_path = backup_database(jobs=options["jobs"], compression=options["compression"])
+                    elapsed = time.perf_counter() - started
+                    size = format_size(get_backup_size(db_backup_path))
+                    log.write(f"Database backup: {db_backup_path} ({size}, {elapsed:.1f}s)\n")
+                    self.stdout.write(self.style.SUCCESS(f"Database backup completed! {size} in {elapsed:.1f}s\n"))
                 except Exception as e:
                     log.write(f"Database backup failed: {e}\n")
                     self.stderr.write(self.style.ERROR(f"Database backup failed: {e}\n"))
@@ -33,20 +43,28 @@ class Command(BaseCommand):
                 # 2️⃣ MEDIA BACKUP
                 self.stdout.write(self.style.MIGRATE_HEADING("Step 2: Media Files Backup"))
                 try:
+                    started = time.perf_counter()
                     media_backup_path = backup_media()
+                    elapsed = time.perf_counter() - started
                     if media_backup_path:
-                        log.write(f"Media backup: {media_backup_path}\n")
-                        self.stdout.write(self.style.SUCCESS("Media backup completed!\n"))
+                        stats = read_manifest_stats(media_backup_path)
+                        summary = (
+                            f"{stats['new_files']} new of {stats['files']} files, "
+                            f"{format_size(stats['new_bytes'])} stored of {format_size(stats['total_bytes'])}, "
+                            f"{elapsed:.1f}s"
+                        )
+                        log.write(f"Media backup: {media_backup_path} ({summary})\n")
+                        self.stdout.write(self.style.SUCCESS(f"Media backup completed! {summary}\n"))
                 except Exception as e:
                     log.write(f"Media backup failed: {e}\n")
                     self.stderr.write(self.style.ERROR(f"Media backup failed: {e}\n"))
 
-                # 3️⃣ CLEANUP OLD BACKUPS
-                self.stdout.write(self.style.MIGRATE_HEADING("Step 3: Cleaning Old Backups"))
+                # 3️⃣ RETENTION (grandfather-father-son)
+                self.stdout.write(self.style.MIGRATE_HEADING("Step 3: Applying Retention Policy"))
                 try:
-                    cleanup_old_backups(days=7)
-                    log.write("Old backups cleaned up (older than 7 days)\n")
-                    self.stdout.write(self.style.SUCCESS("Old backup cleanup completed!\n"))
+                    deleted = apply_retention_policy()
+                    log.write(f"Retention policy applied ({len(deleted)} old backups deleted)\n")
+                    self.stdout.write(self.style.SUCCESS(f"Retention policy applied! {len(deleted)} old backups deleted.\n"))
                 except Exception as e:
                     log.write(f"Cleanup failed: {e}\n")
                     self.stderr.write(self.style.ERROR(f"Cleanup failed: {e}\n"))
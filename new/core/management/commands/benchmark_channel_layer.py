@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.scripts.channel_layer_benchmark import run_channel_layer_benchmark
+import datetime
+import json
+import os
+
+
+class Command(BaseCommand):
+    help = "Compares group_send throughput and latency of the in-memory and Postgres channel layers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias for the Postgres layer.")
+        parser.add_argument("--messages", type=int, default=2000, help="group_send calls per layer.")
+        parser.add_argument("--groups", type=int, default=20, help="Groups the messages are spread over.")
+        parser.add_argument("--members", type=int, default=5, help="Channels per group.")
+        parser.add_argument("--payload-bytes", type=int, default=200,
+                            help="Padding per message (above ~7500 exercises the overflow table).")
+        parser.add_argument("--batch", type=int, default=100, help="Batch size for the group_send_many run (0 to skip).")
+        parser.add_argument("--processes", type=int, default=4, help="Worker processes for the fan-out run (0 to skip).")
+        parser.add_argument("--output", help="Report path (default: benchmarks/channel_layer_<timestamp>.json).")
+
+    def handle(self, *args, **options):
+        if settings.DATABASES[options["database"]]["ENGINE"] != "django.db.backends.postgresql":
+            raise CommandError("The Postgres channel layer needs a PostgreSQL database.")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Benchmarking channel layers..."))
+
+        def progress(name, result):
+            self.stdout.write(
+                f"  {name}: {result['deliveries']} deliveries ({result['lost']} lost), "
+                f"{result['send_per_s']} sends/s, {result['deliveries_per_s']} deliveries/s, "
+                f"latency p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms"
+            )
+
+        report = run_channel_layer_benchmark(
+            database=options["database"], messages=options["messages"], groups=options["groups"],
+            members=options["members"], payload_bytes=options["payload_bytes"],
+            batch=options["batch"], processes=options["processes"], progress=progress,
+        )
+        report["generated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+
+        output = options["output"]
+        if not output:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            output = os.path.join(settings.BASE_DIR, "benchmarks", f"channel_layer_{timestamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Report saved to: {output}"))
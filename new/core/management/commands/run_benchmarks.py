@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.scripts.benchmark import run_benchmarks, compare_reports
+import datetime
+import json
+import os
+
+
+class Command(BaseCommand):
+    help = "Times the hot views against the seeded benchmark data and writes a JSON report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per view.")
+        parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per view before timing.")
+        parser.add_argument("--only", nargs="+", help="Benchmark only these views (e.g. gso_analytics).")
+        parser.add_argument("--label", help="Free-text label stored in the report (e.g. branch name).")
+        parser.add_argument("--output", help="Report path (default: benchmarks/benchmark_<timestamp>.json).")
+        parser.add_argument("--compare", help="Earlier report to compare this run against.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("Running view benchmarks..."))
+
+        def progress(name, result):
+            self.stdout.write(
+                f"  {name}: median {result['median_ms']}ms, p95 {result['p95_ms']}ms, "
+                f"{result['queries']} queries ({result['db_ms']}ms in DB), status {result['status']}"
+            )
+
+        try:
+            report = run_benchmarks(
+                repeat=options["repeat"], warmup=options["warmup"],
+                only=options["only"], label=options["label"], progress=progress,
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        output = options["output"]
+        if not output:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            output = os.path.join(settings.BASE_DIR, "benchmarks", f"benchmark_{timestamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Report saved to: {output}"))
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline.get("dataset") != report["dataset"]:
+                self.stdout.write(self.style.WARNING("Datasets differ between the two reports; timings may not be comparable."))
+            for name, change in compare_reports(baseline, report).items():
+                before, after = change["median_ms"]
+                q_before, q_after = change["queries"]
+                self.stdout.write(f"  {name}: {before}ms -> {after}ms (x{change['speedup']}), queries {q_before} -> {q_after}")
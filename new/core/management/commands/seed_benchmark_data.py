@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.scripts.seed_data import seed_benchmark_data, clear_benchmark_data, BENCH_PASSWORD, BENCH_PREFIX
+
+
+class Command(BaseCommand):
+    help = "Bulk-generates a realistic dataset for benchmarking (never run against production)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5000, help="Number of users to create.")
+        parser.add_argument("--requests", type=int, default=200000, help="Number of service requests to create.")
+        parser.add_argument("--days", type=int, default=730, help="Spread request dates over this many past days.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Requests written per transaction.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible datasets.")
+        parser.add_argument("--clear", action="store_true", help="Delete previously seeded benchmark data first.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            self.stdout.write(self.style.MIGRATE_HEADING("Removing existing benchmark data..."))
+            deleted = clear_benchmark_data()
+            self.stdout.write(self.style.SUCCESS(f"Removed {deleted} benchmark requests and their related rows."))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Seeding {options['users']} users and {options['requests']} requests..."
+        ))
+
+        def progress(counts):
+            self.stdout.write(f"  {counts['requests']}/{options['requests']} requests written")
+
+        try:
+            counts = seed_benchmark_data(
+                users=options["users"],
+                requests=options["requests"],
+                days=options["days"],
+                batch_size=options["batch_size"],
+                seed=options["seed"],
+                progress=progress,
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        seconds = counts.pop("seconds")
+        self.stdout.write(", ".join(f"{name}: {count}" for name, count in counts.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Benchmark data ready in {seconds}s. Log in as {BENCH_PREFIX}gso / {BENCH_PASSWORD}."
+        ))
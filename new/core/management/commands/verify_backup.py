@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from core.scripts.backup import (
+    get_backup_dir, find_latest_dump, restore_to_scratch, drop_scratch_database,
+    table_fingerprints, get_pg_connection, read_dump_manifest, compare_fingerprints, DUMP_MANIFEST_NAME,
+)
+import datetime
+import json
+import os
+
+
+class Command(BaseCommand):
+    help = (
+        "Restores the latest database backup into a scratch database and checks the key "
+        "tables' row counts and checksums against the manifest recorded with the dump."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dump", help="Backup to verify (default: the newest gso_backup_*).")
+        parser.add_argument("--scratch-db", help="Scratch database name (default: <NAME>_verify).")
+        parser.add_argument("--jobs", type=int, default=None, help="Parallel pg_restore jobs.")
+        parser.add_argument("--keep", action="store_true", help="Keep the scratch database after verifying.")
+
+    def handle(self, *args, **options):
+        dump_path = options["dump"] or find_latest_dump()
+        if not dump_path or not os.path.exists(dump_path):
+            raise CommandError("No database backup found to verify.")
+
+        manifest = read_dump_manifest(dump_path)
+        if manifest is None:
+            raise CommandError(
+                f"{dump_path} has no {DUMP_MANIFEST_NAME} to verify against "
+                "(legacy .sql dumps and dumps made before manifests were recorded)."
+            )
+
+        scratch_db = options["scratch_db"] or f"{settings.DATABASES['default']['NAME']}_verify"
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Restoring {dump_path} into '{scratch_db}'..."))
+        try:
+            restore_seconds = restore_to_scratch(dump_path, scratch_db, jobs=options["jobs"])
+        except Exception as e:
+            drop_scratch_database(scratch_db)
+            raise CommandError(f"Restore failed: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Restore completed in {restore_seconds:.1f}s"))
+
+        try:
+            restored_conn = get_pg_connection(scratch_db)
+            try:
+                with restored_conn.cursor() as cursor:
+                    cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+                    present = {row[0] for row in cursor.fetchall()}
+                    restored = table_fingerprints(cursor, [table for table in manifest["tables"] if table in present])
+            finally:
+                restored_conn.close()
+        finally:
+            if not options["keep"]:
+                drop_scratch_database(scratch_db)
+
+        results = compare_fingerprints(manifest, restored)
+        for table, result in results.items():
+            line = f"{table}: {result['restored_rows']} restored / {result['expected_rows']} backed up"
+            if result["match"]:
+                self.stdout.write(self.style.SUCCESS(f"  ✔ {line}, checksum OK"))
+            else:
+                self.stdout.write(self.style.ERROR(f"  ✖ {line}, checksum differs"))
+
+        record = {
+            "verified_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "dump": dump_path,
+            "restore_seconds": round(restore_seconds, 2),
+            "tables": results,
+        }
+        log_dir = os.path.join(get_backup_dir(), 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+        with open(os.path.join(log_dir, "verify_history.jsonl"), "a", encoding="utf-8") as log:
+            log.write(json.dumps(record) + "\n")
+
+        mismatched = [table for table, result in results.items() if not result["match"]]
+        if mismatched:
+            raise CommandError(f"Backup verification failed: {', '.join(mismatched)} differ from the backup manifest.")
+        self.stdout.write(self.style.SUCCESS("Backup verified: all key tables match the manifest."))
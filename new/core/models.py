@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class ChannelLayerMessage(models.Model):
+    """
+    A channel layer message too large for a NOTIFY payload (see
+    core/channel_layers.py). Receivers read it by id; rows are deleted once
+    older than the layer's overflow_expiry.
+    """
+    payload = models.TextField()
+    created_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Channel layer message #{self.pk}"
@@ -0,0 +1,207 @@
+# core/profiling.py
+"""
+On-demand profiling of a single request, for staff.
+
+A staff user adds ?_profile=<token> to a URL (or sends it in the
+X-Profile-Token header). That one request then runs under cProfile and a
+stack sampler, with every SQL statement timed. The results are written to
+PROFILE_DIR as:
+
+    <id>.prof    cProfile stats (snakeviz, pstats)
+    <id>.folded  collapsed stacks (flamegraph.pl, speedscope)
+    <id>.json    request summary and SQL log
+
+Requests without a valid token skip all of this.
+"""
+import cProfile
+import datetime
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PARAM = "_profile"
+TOKEN_HEADER = "HTTP_X_PROFILE_TOKEN"
+TOKEN_SALT = "core.profiling"
+
+# Profiling is expensive, so only one request is profiled at a time
+_profile_lock = threading.Lock()
+
+
+# -------------------------------
+# Tokens
+# -------------------------------
+def make_profile_token(user):
+    return signing.dumps({"user": user.pk}, salt=TOKEN_SALT)
+
+
+def token_is_valid(token, user):
+    max_age = getattr(settings, "PROFILE_TOKEN_MAX_AGE", 3600)
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return payload.get("user") == user.pk
+
+
+def get_profile_dir():
+    return str(getattr(settings, "PROFILE_DIR", os.path.join(settings.BASE_DIR, "profiles")))
+
+
+# -------------------------------
+# Collectors
+# -------------------------------
+class StackSampler(threading.Thread):
+    """Sample one thread's Python stack at a fixed interval into folded-stack counts."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class SQLRecorder:
+    """execute_wrapper hook that keeps each statement with its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "sql": sql,
+                "params": repr(params)[:500],
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+            })
+
+
+# -------------------------------
+# Middleware
+# -------------------------------
+class ProfilingMiddleware:
+    """Profile a request when a staff user presents a valid profiling token."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def wants_profile(self, request):
+        token = request.GET.get(TOKEN_PARAM) or request.META.get(TOKEN_HEADER)
+        if not token:
+            return False
+        user = getattr(request, "user", None)
+        return bool(user and user.is_authenticated and user.is_staff and token_is_valid(token, user))
+
+    def __call__(self, request):
+        if not self.wants_profile(request) or not _profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request)
+        finally:
+            _profile_lock.release()
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), getattr(settings, "PROFILE_SAMPLE_INTERVAL", 0.001))
+        sql = SQLRecorder()
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sql))
+            sampler.start()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                sampler.stop()
+        total_ms = (time.perf_counter() - started) * 1000
+
+        profile_id = f"{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:8]}"
+        try:
+            save_profile(profile_id, request, response, profiler, sampler, sql, total_ms)
+            response["X-Profile-Id"] = profile_id
+        except OSError:
+            logger.exception("Could not save request profile %s", profile_id)
+        return response
+
+
+def save_profile(profile_id, request, response, profiler, sampler, sql, total_ms):
+    profile_dir = get_profile_dir()
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, profile_id)
+
+    profiler.dump_stats(f"{base}.prof")
+    with open(f"{base}.folded", "w", encoding="utf-8") as f:
+        f.write(sampler.folded())
+
+    sql_ms = sum(query["ms"] for query in sql.queries)
+    match = request.resolver_match
+    summary = {
+        "id": profile_id,
+        "path": request.get_full_path(),
+        "method": request.method,
+        "view": match.view_name if match else None,
+        "user": request.user.get_username(),
+        "status": response.status_code,
+        "total_ms": round(total_ms, 1),
+        "sql_ms": round(sql_ms, 1),
+        "python_ms": round(total_ms - sql_ms, 1),
+        "query_count": len(sql.queries),
+        "samples": sum(sampler.stacks.values()),
+        "profiled_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "queries": sql.queries,
+    }
+    with open(f"{base}.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def list_profiles():
+    """Saved profile summaries, newest first (without the SQL log)."""
+    profile_dir = get_profile_dir()
+    if not os.path.isdir(profile_dir):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(profile_dir), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(profile_dir, name), encoding="utf-8") as f:
+            summary = json.load(f)
+        summary.pop("queries", None)
+        profiles.append(summary)
+    return profiles
@@ -0,0 +1,134 @@
+# core/query_budget.py
+"""
+Per-view SQL query and latency budgets.
+
+Views declare what they are allowed to cost with @query_budget. When
+QUERY_BUDGET_ENABLED is on, QueryBudgetMiddleware measures a sample of
+requests, keeps running totals per view name, and logs any request that
+goes over its budget. core.testing.QueryBudgetMixin enforces the same
+budgets in the test suite.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = {"queries": 50, "ms": 1000}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+# -------------------------------
+# Budget Declaration
+# -------------------------------
+def query_budget(queries=None, ms=None):
+    """Declare the most SQL queries and milliseconds a view may take per request."""
+    def decorator(view_func):
+        view_func.query_budget = {"queries": queries, "ms": ms}
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    """Budget declared on the view, with QUERY_BUDGET_DEFAULT filling any gaps."""
+    budget = dict(getattr(settings, "QUERY_BUDGET_DEFAULT", DEFAULT_BUDGET))
+    declared = getattr(view_func, "query_budget", {})
+    budget.update({key: value for key, value in declared.items() if value is not None})
+    return budget
+
+
+# -------------------------------
+# Measurement
+# -------------------------------
+class QueryRecorder:
+    """execute_wrapper hook that counts queries and their time without needing DEBUG."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def record_view_stats(view_name, queries, db_ms, total_ms):
+    with _stats_lock:
+        stats = _stats.setdefault(view_name, {
+            "requests": 0, "queries": 0, "db_ms": 0.0, "total_ms": 0.0, "max_queries": 0, "max_ms": 0.0,
+        })
+        stats["requests"] += 1
+        stats["queries"] += queries
+        stats["db_ms"] += db_ms
+        stats["total_ms"] += total_ms
+        stats["max_queries"] = max(stats["max_queries"], queries)
+        stats["max_ms"] = max(stats["max_ms"], total_ms)
+
+
+def get_view_stats():
+    """Snapshot of the sampled totals per view name, with per-request averages."""
+    with _stats_lock:
+        snapshot = {name: dict(stats) for name, stats in _stats.items()}
+    for stats in snapshot.values():
+        stats["avg_queries"] = round(stats["queries"] / stats["requests"], 1)
+        stats["avg_db_ms"] = round(stats["db_ms"] / stats["requests"], 1)
+        stats["avg_ms"] = round(stats["total_ms"] / stats["requests"], 1)
+    return snapshot
+
+
+# -------------------------------
+# Middleware
+# -------------------------------
+class QueryBudgetMiddleware:
+    """
+    Measure a sample of requests (QUERY_BUDGET_SAMPLE_RATE) and warn when a
+    view exceeds its budget. Removed from the stack entirely when disabled.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_BUDGET_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "QUERY_BUDGET_SAMPLE_RATE", 0.1)
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.seconds * 1000
+
+        match = request.resolver_match
+        if match is None:
+            return response
+
+        view_name = match.view_name
+        record_view_stats(view_name, recorder.count, db_ms, total_ms)
+        response["Server-Timing"] = f'db;dur={db_ms:.1f};desc="{recorder.count} queries", total;dur={total_ms:.1f}'
+
+        budget = get_query_budget(match.func)
+        if recorder.count > budget["queries"] or total_ms > budget["ms"]:
+            logger.warning(
+                "%s over budget: %s queries (budget %s), %.0fms total (budget %sms), %.0fms in DB [%s %s]",
+                view_name, recorder.count, budget["queries"], total_ms, budget["ms"], db_ms,
+                request.method, request.path,
+            )
+        return response
@@ -0,0 +1,134 @@
+# core/reference_data.py
+"""
+Cached reference data: Units, Departments and active SuccessIndicators.
+
+These tables are small, rarely edited and read on almost every page. Each
+dataset lives in the shared cache (CACHES["default"]) under a version number.
+Saving or deleting a row writes a new version, once right away and again when
+the transaction commits, so every worker reloads it on its next read. Each
+worker also keeps the copy it last loaded in memory, so a read normally costs
+one cache lookup for the version and no SQL.
+
+Bulk changes made with QuerySet.update() do not send signals; call
+invalidate(name) after them.
+
+The returned tuples and model instances are shared between requests and must
+not be modified.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+CACHE_PREFIX = "refdata"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# name -> (version, data) last loaded by this worker
+_local = {}
+
+
+# -------------------------------
+# Loaders
+# -------------------------------
+def _load_units():
+    from apps.gso_accounts.models import Unit
+    return tuple(Unit.objects.order_by("name"))
+
+
+def _load_departments():
+    from apps.gso_accounts.models import Department
+    return tuple(Department.objects.order_by("name"))
+
+
+def _load_success_indicators():
+    from apps.gso_reports.models import SuccessIndicator
+    return tuple(SuccessIndicator.objects.filter(is_active=True).order_by("code"))
+
+
+DATASETS = {
+    "units": ("gso_accounts.Unit", _load_units),
+    "departments": ("gso_accounts.Department", _load_departments),
+    "success_indicators": ("gso_reports.SuccessIndicator", _load_success_indicators),
+}
+
+
+# -------------------------------
+# Versioned Cache
+# -------------------------------
+def _key(name, suffix):
+    # Include the database name so test databases never share entries with the real one
+    return f"{CACHE_PREFIX}:{connection.settings_dict['NAME']}:{name}:{suffix}"
+
+
+def get_version(name):
+    key = _key(name, "version")
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a lost version key can never repeat an old number
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_reference_data(name):
+    version = get_version(name)
+    local = _local.get(name)
+    if version is not None and local and local[0] == version:
+        return local[1]
+
+    data_key = _key(name, f"v{version}")
+    data = cache.get(data_key)
+    if data is None:
+        data = DATASETS[name][1]()
+        cache.set(data_key, data, CACHE_TIMEOUT)
+    _local[name] = (version, data)
+    return data
+
+
+def invalidate(name):
+    # A fresh clock value rather than incr(): the file cache's incr() is a
+    # read-then-write, so two workers could both land on the same version
+    cache.set(_key(name, "version"), time.time_ns(), timeout=None)
+
+
+def _invalidate_on_change(name):
+    def receiver(sender, **kwargs):
+        # Invalidate now so this transaction reads its own change, and again after
+        # commit in case another worker reloaded the old rows in between.
+        invalidate(name)
+        transaction.on_commit(lambda: invalidate(name))
+    return receiver
+
+
+def connect_signals():
+    for name, (model, _loader) in DATASETS.items():
+        receiver = _invalidate_on_change(name)
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f"refdata_{name}_save")
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f"refdata_{name}_delete")
+
+
+# -------------------------------
+# Accessors
+# -------------------------------
+def get_units():
+    return get_reference_data("units")
+
+
+def get_unit_by_name(name):
+    """Case-insensitive match on Unit.name, like name__iexact."""
+    name = (name or "").strip().lower()
+    return next((unit for unit in get_units() if unit.name.lower() == name), None)
+
+
+def get_departments():
+    return get_reference_data("departments")
+
+
+def get_success_indicators(unit=None):
+    """Active success indicators ordered by code, optionally for one unit."""
+    indicators = get_reference_data("success_indicators")
+    if unit is None:
+        return indicators
+    unit_id = getattr(unit, "pk", unit)
+    return tuple(si for si in indicators if si.unit_id == unit_id)
@@ -1,5 +1,7 @@
 import os
+import json
 import datetime
+import hashlib
 from django.conf import settings
 import shutil
 import glob
@@ -7,15 +9,68 @@ import time
 import subprocess
 
 
-def backup_database():
-    """Creates a PostgreSQL database backup (.sql file)."""
+MEDIA_STORE_DIRNAME = 'media_store'        # content-addressed attachment blobs
+MEDIA_MANIFEST_DIRNAME = 'media_manifests'  # one JSON manifest per media backup run
+DUMP_MANIFEST_NAME = 'gso_manifest.json'    # key-table fingerprints, stored inside each dump directory
+
+# Tables fingerprinted with every dump and checked by verify_backup
+KEY_MODELS = [
+    "gso_accounts.User",
+    "gso_accounts.Unit",
+    "gso_requests.ServiceRequest",
+    "gso_requests.TaskReport",
+    "gso_requests.Feedback",
+    "gso_reports.WorkAccomplishmentReport",
+    "gso_reports.IPMT",
+    "gso_inventory.InventoryItem",
+    "notifications.Notification",
+]
+
+
+def get_backup_dir():
+    backup_dir = str(getattr(settings, 'BACKUP_DIR', os.path.join(settings.BASE_DIR, 'backups')))
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+
+def get_backup_size(path):
+    """Returns the size in bytes of a backup file or directory."""
+    if not path or not os.path.exists(path):
+        return 0
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def format_size(num_bytes):
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    size = num_bytes / 1024
+    for unit in ('KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def backup_database(jobs=None, compression=None):
+    """
+    Creates a PostgreSQL database backup as a directory-format dump.
+    Tables are dumped in parallel (`jobs`) and each file is compressed (`compression`, 0-9).
+    Row counts and checksums of the key tables, taken in the same snapshot
+    pg_dump reads, are written into the dump as its manifest.
+    """
     print("Starting database backup...")
 
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    backup_dir = os.path.join(settings.BASE_DIR, 'backups')
-    os.makedirs(backup_dir, exist_ok=True)
-    
-    backup_file = os.path.join(backup_dir, f'gso_backup_{timestamp}.sql')
+    backup_dir = get_backup_dir()
+    backup_path = os.path.join(backup_dir, f'gso_backup_{timestamp}.dump')
+
+    jobs = jobs or getattr(settings, 'BACKUP_DUMP_JOBS', 4)
+    compression = getattr(settings, 'BACKUP_DUMP_COMPRESSION', 6) if compression is None else compression
 
     # === Database settings ===
     db_settings = settings.DATABASES['default']
@@ -25,71 +80,382 @@ def backup_database():
     db_host = db_settings.get('HOST', 'localhost')
     db_port = db_settings.get('PORT', '5432')
 
-    # === Path to pg_dump ===
-    PG_DUMP_PATH = r"C:\Program Files\PostgreSQL\18\bin\pg_dump.exe"
+    # === Path to pg_dump (configurable via PG_DUMP_PATH) ===
+    pg_dump_path = getattr(settings, 'PG_DUMP_PATH', 'pg_dump')
 
     # === Set password in environment temporarily ===
     env = os.environ.copy()
     env["PGPASSWORD"] = db_password
 
+    # === Export a snapshot so the manifest describes exactly what is dumped ===
+    snapshot_conn = get_pg_connection(db_name)
+    snapshot_conn.set_session(isolation_level='REPEATABLE READ', readonly=True, autocommit=False)
+
     try:
+        with snapshot_conn.cursor() as cursor:
+            cursor.execute("SELECT pg_export_snapshot()")
+            snapshot = cursor.fetchone()[0]
+            fingerprints = table_fingerprints(cursor, key_tables())
+
         subprocess.run([
-            PG_DUMP_PATH,
+            pg_dump_path,
             "-h", db_host,
             "-p", str(db_port),
             "-U", db_user,
-            "-F", "p",
-            "-f", backup_file,
+            "-F", "d",
+            "-j", str(jobs),
+            "-Z", str(compression),
+            "--snapshot", snapshot,
+            "-f", backup_path,
             db_name
         ], check=True, env=env)
-        print(f"Database backup created: {backup_file}")
+        write_dump_manifest(backup_path, timestamp, fingerprints)
+        print(f"Database backup created: {backup_path}")
     except subprocess.CalledProcessError as e:
         print(f"Database backup failed: {e}")
-    except FileNotFoundError:
-        print("pg_dump not found. Check your PostgreSQL installation path.")
+        shutil.rmtree(backup_path, ignore_errors=True)
+        raise RuntimeError(f"pg_dump exited with status {e.returncode}") from e
+    except FileNotFoundError as e:
+        print("pg_dump not found. Set PG_DUMP_PATH to your PostgreSQL installation.")
+        raise RuntimeError(f"pg_dump not found at '{pg_dump_path}'") from e
     finally:
         env.pop("PGPASSWORD", None)
+        snapshot_conn.close()
+
+    return backup_path
+
+
+def write_dump_manifest(dump_path, timestamp, fingerprints):
+    manifest = {
+        'created_at': timestamp,
+        'tables': {table: {'rows': rows, 'checksum': checksum} for table, (rows, checksum) in fingerprints.items()},
+    }
+    with open(os.path.join(dump_path, DUMP_MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+
+
+def read_dump_manifest(dump_path):
+    """The manifest written with a dump, or None (legacy .sql dumps and older dumps have none)."""
+    manifest_path = os.path.join(dump_path, DUMP_MANIFEST_NAME)
+    if not os.path.isfile(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
 
-    return backup_file
+
+def hash_file(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_latest_manifest(manifest_dir):
+    manifests = sorted(glob.glob(os.path.join(manifest_dir, 'media_manifest_*.json')))
+    if not manifests:
+        return {}
+    with open(manifests[-1], encoding='utf-8') as f:
+        return json.load(f).get('files', {})
 
 
 def backup_media():
-    """Creates a ZIP archive of uploaded media files."""
+    """
+    Creates an incremental, content-addressed backup of uploaded media files.
+    Each distinct file is stored once under media_store/<sha256>; every run writes
+    a manifest mapping media paths to their content hash. Files whose size and
+    modification time match the previous manifest are not re-hashed.
+    """
     print("Starting media backup...")
 
-    src = settings.MEDIA_ROOT
+    src = str(settings.MEDIA_ROOT) if settings.MEDIA_ROOT else None
     if not src or not os.path.exists(src):
         print("MEDIA_ROOT does not exist or is empty. Skipping media backup.")
         return None
 
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    backup_dir = os.path.join(settings.BASE_DIR, 'backups')
-    os.makedirs(backup_dir, exist_ok=True)
+    backup_dir = get_backup_dir()
+    store_dir = os.path.join(backup_dir, MEDIA_STORE_DIRNAME)
+    manifest_dir = os.path.join(backup_dir, MEDIA_MANIFEST_DIRNAME)
+    os.makedirs(store_dir, exist_ok=True)
+    os.makedirs(manifest_dir, exist_ok=True)
+
+    previous = load_latest_manifest(manifest_dir)
+    files = {}
+    stats = {'files': 0, 'new_files': 0, 'new_bytes': 0, 'total_bytes': 0}
+
+    for root, _, names in os.walk(src):
+        for name in names:
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, src).replace(os.sep, '/')
+            stat = os.stat(path)
+
+            known = previous.get(rel_path)
+            if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                digest = known['sha256']
+            else:
+                digest = hash_file(path)
+
+            blob_path = os.path.join(store_dir, digest[:2], digest)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.tmp"
+                shutil.copy2(path, tmp_path)
+                os.replace(tmp_path, blob_path)
+                stats['new_files'] += 1
+                stats['new_bytes'] += stat.st_size
+
+            files[rel_path] = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            stats['files'] += 1
+            stats['total_bytes'] += stat.st_size
+
+    manifest_path = os.path.join(manifest_dir, f'media_manifest_{timestamp}.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'created_at': timestamp, 'stats': stats, 'files': files}, f, indent=1)
+
+    print(f"Media backup created: {manifest_path} "
+          f"({stats['new_files']} new of {stats['files']} files, {format_size(stats['new_bytes'])} stored)")
+    return manifest_path
+
+
+def read_manifest_stats(manifest_path):
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f).get('stats', {})
+
+
+def restore_media(manifest_path, target_dir):
+    """Restores the media tree described by a manifest into `target_dir`."""
+    store_dir = os.path.join(get_backup_dir(), MEDIA_STORE_DIRNAME)
+    with open(manifest_path, encoding='utf-8') as f:
+        files = json.load(f)['files']
+
+    for rel_path, entry in files.items():
+        destination = os.path.join(target_dir, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copy2(os.path.join(store_dir, entry['sha256'][:2], entry['sha256']), destination)
+    return len(files)
+
+
+def prune_media_store():
+    """Deletes stored blobs that no remaining manifest references."""
+    backup_dir = get_backup_dir()
+    store_dir = os.path.join(backup_dir, MEDIA_STORE_DIRNAME)
+    manifest_dir = os.path.join(backup_dir, MEDIA_MANIFEST_DIRNAME)
+    if not os.path.exists(store_dir):
+        return 0
+
+    referenced = set()
+    for manifest in glob.glob(os.path.join(manifest_dir, 'media_manifest_*.json')):
+        with open(manifest, encoding='utf-8') as f:
+            referenced.update(entry['sha256'] for entry in json.load(f)['files'].values())
 
-    archive_name = os.path.join(backup_dir, f'media_backup_{timestamp}')
-    shutil.make_archive(archive_name, 'zip', src)
+    removed = 0
+    for blob in glob.glob(os.path.join(store_dir, '*', '*')):
+        if os.path.basename(blob) not in referenced:
+            os.remove(blob)
+            removed += 1
+    return removed
+
+
+def remove_backup(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+# ===============================
+# Grandfather-father-son retention
+# ===============================
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+
+def parse_backup_timestamp(path):
+    """Extracts the run timestamp embedded in a backup file name (None if absent)."""
+    stem = os.path.basename(path)
+    for suffix in ('.dump', '.sql', '.zip', '.json'):
+        stem = stem.removesuffix(suffix)
+    try:
+        return datetime.datetime.strptime(stem[-19:], TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def select_retained(timestamps, daily=7, weekly=4, monthly=6):
+    """
+    Returns the timestamps kept by a grandfather-father-son policy: the newest
+    backup of each of the last `daily` days, `weekly` ISO weeks and `monthly` months.
+    """
+    newest_first = sorted(set(timestamps), reverse=True)
+    keep = set()
+    for limit, bucket in (
+        (daily, lambda ts: ts.date()),
+        (weekly, lambda ts: ts.isocalendar()[:2]),
+        (monthly, lambda ts: (ts.year, ts.month)),
+    ):
+        seen = set()
+        for ts in newest_first:
+            key = bucket(ts)
+            if key in seen:
+                continue
+            if len(seen) >= limit:
+                break
+            seen.add(key)
+            keep.add(ts)
+    return keep
+
+
+def list_backup_sets():
+    """Groups backup files by kind: database dumps and media backups (manifests or legacy zips)."""
+    backup_dir = get_backup_dir()
+    return {
+        'database': glob.glob(os.path.join(backup_dir, 'gso_backup_*')),
+        'media': (
+            glob.glob(os.path.join(backup_dir, MEDIA_MANIFEST_DIRNAME, 'media_manifest_*.json'))
+            + glob.glob(os.path.join(backup_dir, 'media_backup_*.zip'))
+        ),
+    }
+
+
+def apply_retention_policy(daily=None, weekly=None, monthly=None):
+    """
+    Deletes database dumps and media backups that fall outside the retention
+    policy (BACKUP_RETENTION), then prunes media blobs nobody references.
+    Returns the list of deleted paths.
+    """
+    policy = {'daily': 7, 'weekly': 4, 'monthly': 6, **getattr(settings, 'BACKUP_RETENTION', {})}
+    daily = policy['daily'] if daily is None else daily
+    weekly = policy['weekly'] if weekly is None else weekly
+    monthly = policy['monthly'] if monthly is None else monthly
+    print(f"Applying retention: {daily} daily, {weekly} weekly, {monthly} monthly backups...")
+
+    deleted = []
+    for kind, paths in list_backup_sets().items():
+        dated = {path: parse_backup_timestamp(path) for path in paths}
+        keep = select_retained([ts for ts in dated.values() if ts], daily, weekly, monthly)
+        for path, ts in dated.items():
+            if ts and ts not in keep:
+                remove_backup(path)
+                deleted.append(path)
+                print(f"Deleted old {kind} backup: {path}")
+
+    removed_blobs = prune_media_store()
+    if removed_blobs:
+        print(f"Deleted {removed_blobs} unreferenced media files.")
+
+    print("Retention policy applied.")
+    return deleted
+
+
+# ===============================
+# Restore verification
+# ===============================
+def pg_tool_path(tool):
+    """Locates a PostgreSQL client tool next to the configured pg_dump."""
+    pg_dump_path = getattr(settings, 'PG_DUMP_PATH', 'pg_dump')
+    directory, filename = os.path.split(pg_dump_path)
+    extension = '.exe' if filename.lower().endswith('.exe') else ''
+    return os.path.join(directory, tool + extension) if directory else tool + extension
+
+
+def find_latest_dump():
+    dumps = [path for path in list_backup_sets()['database'] if parse_backup_timestamp(path)]
+    if not dumps:
+        return None
+    return max(dumps, key=parse_backup_timestamp)
+
+
+def get_pg_connection(dbname='postgres'):
+    """Opens an autocommit connection (default: the `postgres` maintenance database)."""
+    import psycopg2
+
+    db_settings = settings.DATABASES['default']
+    conn = psycopg2.connect(
+        dbname=dbname,
+        host=db_settings.get('HOST', 'localhost'),
+        port=db_settings.get('PORT', '5432'),
+        user=db_settings['USER'],
+        password=db_settings['PASSWORD'],
+    )
+    conn.autocommit = True
+    return conn
+
+
+def drop_scratch_database(scratch_db):
+    conn = get_pg_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP DATABASE IF EXISTS "{scratch_db}"')
+    finally:
+        conn.close()
+
+
+def restore_to_scratch(dump_path, scratch_db, jobs=None):
+    """
+    Recreates `scratch_db` and restores `dump_path` into it.
+    Directory-format dumps use parallel pg_restore; legacy .sql dumps use psql.
+    Returns the restore duration in seconds.
+    """
+    drop_scratch_database(scratch_db)
+    conn = get_pg_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f'CREATE DATABASE "{scratch_db}"')
+    finally:
+        conn.close()
+
+    db_settings = settings.DATABASES['default']
+    common = [
+        "-h", db_settings.get('HOST', 'localhost'),
+        "-p", str(db_settings.get('PORT', '5432')),
+        "-U", db_settings['USER'],
+        "-d", scratch_db,
+    ]
+    if dump_path.endswith('.sql'):
+        command = [pg_tool_path('psql'), *common, "-q", "-v", "ON_ERROR_STOP=1", "-f", dump_path]
+    else:
+        jobs = jobs or getattr(settings, 'BACKUP_DUMP_JOBS', 4)
+        command = [pg_tool_path('pg_restore'), *common, "-j", str(jobs), "--no-owner", dump_path]
+
+    env = os.environ.copy()
+    env["PGPASSWORD"] = db_settings['PASSWORD']
+    started = time.perf_counter()
+    subprocess.run(command, check=True, env=env, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
 
-    print(f"Media backup created: {archive_name}.zip")
-    return f"{archive_name}.zip"
 
+def key_tables():
+    from django.apps import apps
 
-def cleanup_old_backups(days=7):
-    """Deletes backup files older than the specified number of days."""
-    print(f"Cleaning up backups older than {days} days...")
+    return [apps.get_model(label)._meta.db_table for label in KEY_MODELS]
 
-    backup_dir = os.path.join(settings.BASE_DIR, 'backups')
-    if not os.path.exists(backup_dir):
-        print("No backup directory found. Skipping cleanup.")
-        return
 
-    cutoff = time.time() - (days * 86400)
+def table_fingerprints(cursor, tables):
+    """Returns {table: (row_count, md5 of all rows ordered by id)} for each table."""
+    fingerprints = {}
+    for table in tables:
+        cursor.execute(
+            "SELECT count(*), md5(coalesce(string_agg(md5(t::text), '' ORDER BY t.id), '')) "
+            f'FROM "{table}" t'
+        )
+        fingerprints[table] = tuple(cursor.fetchone())
+    return fingerprints
 
-    for file in glob.glob(os.path.join(backup_dir, '*')):
-        if os.path.getctime(file) < cutoff:
-            os.remove(file)
-            print(f"Deleted old backup: {file}")
 
-    print("Old backup cleanup completed.")
+def compare_fingerprints(manifest, restored):
+    """
+    Checks restored {table: (rows, checksum)} (None for a missing table)
+    against a dump manifest. Returns {table: result} with a "match" flag.
+    """
+    results = {}
+    for table, expected in manifest['tables'].items():
+        rows, checksum = restored.get(table) or (None, None)
+        results[table] = {
+            'expected_rows': expected['rows'],
+            'restored_rows': rows,
+            'match': rows == expected['rows'] and checksum == expected['checksum'],
+        }
+    return results
 
 
 def run_full_backup():
@@ -97,6 +463,6 @@ def run_full_backup():
     print("Starting full backup process...")
     db_file = backup_database()
     media_file = backup_media()
-    cleanup_old_backups(days=7)
+    apply_retention_policy()
     print("Backup process completed!")
     return db_file, media_file
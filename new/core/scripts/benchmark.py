@@ -0,0 +1,186 @@
+"""
+Benchmark runner for the hot views (python manage.py run_benchmarks).
+
+Each view is requested through the Django test client as the seeded GSO
+user, so the timings cover middleware, view code, SQL and template
+rendering. Reports are plain JSON with the dataset size included, so two
+runs can be compared with compare_reports().
+"""
+import datetime
+import json
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.test import Client
+from django.urls import reverse
+
+from apps.gso_accounts.models import User
+from apps.gso_reports.models import SuccessIndicator, WorkAccomplishmentReport
+from apps.gso_requests.models import Feedback, ServiceRequest, TaskReport
+from apps.notifications.models import Notification
+from core.query_budget import QueryRecorder
+from core.scripts.seed_data import BENCH_PREFIX
+
+BENCHMARK_USERNAME = f"{BENCH_PREFIX}gso"
+
+
+# -------------------------------
+# Targets
+# -------------------------------
+def build_benchmarks():
+    """
+    Requests to time. IPMT views use the unit and month with the most WARs
+    and that unit's five busiest personnel, so they do a realistic amount of work.
+    """
+    busiest = (
+        WorkAccomplishmentReport.objects.filter(unit__name__startswith=BENCH_PREFIX)
+        .annotate(month=TruncMonth("date_started"))
+        .values("unit_id", "unit__name", "month")
+        .annotate(total=Count("id"))
+        .order_by("-total")
+        .first()
+    )
+    if not busiest:
+        raise RuntimeError("No benchmark data found; run seed_benchmark_data first.")
+
+    month = busiest["month"].strftime("%Y-%m")
+    personnel = list(
+        User.objects.filter(role="personnel", unit_id=busiest["unit_id"])
+        .annotate(total=Count("war_personnel"))
+        .order_by("-total")
+        .values_list("username", flat=True)[:5]
+    )
+    rows = [
+        {"indicator": f"{si.code} - {si.description}", "description": "Completed as scheduled.", "remarks": "COMPLIED"}
+        # sampleipmt.xlsx has four free rows before its merged signature block
+        for si in SuccessIndicator.objects.filter(unit_id=busiest["unit_id"]).order_by("code")[:4]
+    ]
+
+    return [
+        {"name": "request_management", "url": reverse("gso_requests:request_management")},
+        {"name": "accomplishment_report", "url": reverse("gso_reports:accomplishment_report")},
+        {
+            "name": "preview_ipmt",
+            "url": reverse("gso_reports:preview_ipmt"),
+            "data": {"month": month, "unit": busiest["unit__name"], "personnel[]": personnel},
+        },
+        {
+            "name": "generate_ipmt",
+            "method": "post",
+            "url": reverse("gso_reports:generate_ipmt"),
+            "data": json.dumps({"month": month, "unit": busiest["unit__name"], "personnel": ",".join(personnel), "rows": rows}),
+            "content_type": "application/json",
+        },
+        {"name": "gso_analytics", "url": reverse("gso_reports:gso_analytics")},
+    ]
+
+
+# -------------------------------
+# Timing
+# -------------------------------
+def time_request(client, spec):
+    """Run one request and return (status, seconds, queries, db_seconds, bytes)."""
+    method = getattr(client, spec.get("method", "get"))
+    kwargs = {"content_type": spec["content_type"]} if "content_type" in spec else {}
+
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        started = time.perf_counter()
+        response = method(spec["url"], spec.get("data", {}), **kwargs)
+        elapsed = time.perf_counter() - started
+    return response.status_code, elapsed, recorder.count, recorder.seconds, len(response.content)
+
+
+def benchmark_view(client, spec, repeat=5, warmup=1):
+    for _ in range(warmup):
+        time_request(client, spec)
+
+    runs = [time_request(client, spec) for _ in range(repeat)]
+    timings = sorted(run[1] * 1000 for run in runs)
+    p95_index = min(len(timings) - 1, round(0.95 * (len(timings) - 1)))
+    return {
+        "status": runs[-1][0],
+        "runs": repeat,
+        "median_ms": round(statistics.median(timings), 1),
+        "p95_ms": round(timings[p95_index], 1),
+        "min_ms": round(timings[0], 1),
+        "max_ms": round(timings[-1], 1),
+        "queries": runs[-1][2],
+        "db_ms": round(statistics.median(run[3] * 1000 for run in runs), 1),
+        "response_bytes": runs[-1][4],
+    }
+
+
+def dataset_counts():
+    return {
+        "users": User.objects.count(),
+        "requests": ServiceRequest.objects.count(),
+        "wars": WorkAccomplishmentReport.objects.count(),
+        "task_reports": TaskReport.objects.count(),
+        "feedback": Feedback.objects.count(),
+        "notifications": Notification.objects.count(),
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(repeat=5, warmup=1, only=None, label=None, progress=None):
+    """Time every benchmark view and return the JSON-serialisable report."""
+    user = User.objects.filter(username=BENCHMARK_USERNAME).first()
+    if not user:
+        raise RuntimeError("No benchmark data found; run seed_benchmark_data first.")
+
+    host = next((h for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+    # A failing view is reported with its status code instead of aborting the run
+    client = Client(HTTP_HOST=host, raise_request_exception=False)
+    client.force_login(user)
+
+    results = {}
+    for spec in build_benchmarks():
+        if only and spec["name"] not in only:
+            continue
+        results[spec["name"]] = benchmark_view(client, spec, repeat=repeat, warmup=warmup)
+        if progress:
+            progress(spec["name"], results[spec["name"]])
+
+    return {
+        "label": label,
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": current_commit(),
+        "database": connections["default"].vendor,
+        "repeat": repeat,
+        "warmup": warmup,
+        "dataset": dataset_counts(),
+        "results": results,
+    }
+
+
+def compare_reports(baseline, current):
+    """Per-view change in median time and query count between two reports."""
+    comparison = {}
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        comparison[name] = {
+            "median_ms": (before["median_ms"], result["median_ms"]),
+            "speedup": round(before["median_ms"] / result["median_ms"], 2) if result["median_ms"] else None,
+            "queries": (before["queries"], result["queries"]),
+        }
+    return comparison
@@ -0,0 +1,209 @@
+"""
+Throughput benchmark for channel layers (python manage.py benchmark_channel_layer).
+
+Every layer gets the same workload: `groups` groups with `members` local
+channels each, and `messages` group_sends spread round-robin over the groups.
+Each receiver checks the send timestamp on arrival, so the report gives
+both throughput and end-to-end latency.
+
+The fan-out run starts separate worker processes on the Postgres layer,
+each with one channel in a shared group, to show that every process
+receives every message.
+"""
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+from channels.layers import InMemoryChannelLayer
+
+from core.channel_layers import PostgresChannelLayer
+
+FANOUT_GROUP = "bench.fanout"
+
+
+def _latency_summary(latencies):
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def _message(payload_bytes):
+    return {"type": "bench.message", "sent_at": time.time(), "pad": "x" * payload_bytes}
+
+
+# -------------------------------
+# Single-process Throughput
+# -------------------------------
+async def _receive_count(layer, channel, expected, latencies, timeout):
+    received = 0
+    deadline = time.monotonic() + timeout
+    while received < expected:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            message = await asyncio.wait_for(layer.receive(channel), remaining)
+        except asyncio.TimeoutError:
+            break
+        latencies.append(time.time() - message["sent_at"])
+        received += 1
+    return received
+
+
+async def measure_layer(layer, messages=2000, groups=20, members=5, payload_bytes=200, batch=None, timeout=60):
+    """Send `messages` group messages through `layer` and time their delivery."""
+    group_names = [f"bench.group.{i}" for i in range(groups)]
+    channels = {}
+    for group in group_names:
+        for _ in range(members):
+            channel = await layer.new_channel()
+            await layer.group_add(group, channel)
+            channels[channel] = group
+
+    per_group = {group: messages // groups + (1 if i < messages % groups else 0) for i, group in enumerate(group_names)}
+    latencies = []
+    receivers = [
+        asyncio.create_task(_receive_count(layer, channel, per_group[group], latencies, timeout))
+        for channel, group in channels.items()
+    ]
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    targets = [group_names[i % groups] for i in range(messages)]
+    if batch and hasattr(layer, "group_send_many"):
+        for i in range(0, messages, batch):
+            await layer.group_send_many([(group, _message(payload_bytes)) for group in targets[i:i + batch]])
+    else:
+        for group in targets:
+            await layer.group_send(group, _message(payload_bytes))
+    send_seconds = time.perf_counter() - started
+
+    delivered = sum(await asyncio.gather(*receivers))
+    elapsed = time.perf_counter() - started
+
+    for channel, group in channels.items():
+        await layer.group_discard(group, channel)
+
+    expected = messages * members
+    return {
+        "messages": messages,
+        "deliveries": delivered,
+        "lost": expected - delivered,
+        "send_per_s": round(messages / send_seconds) if send_seconds else None,
+        "deliveries_per_s": round(delivered / elapsed) if elapsed else None,
+        "elapsed_s": round(elapsed, 3),
+        **_latency_summary(latencies),
+    }
+
+
+# -------------------------------
+# Cross-process Fan-out
+# -------------------------------
+def _fanout_worker(database, expected, timeout, ready, results):
+    import django
+    django.setup()
+
+    async def run():
+        layer = PostgresChannelLayer(database=database, capacity=expected + 10)
+        channel = await layer.new_channel()
+        await layer.group_add(FANOUT_GROUP, channel)
+        ready.put(True)
+        latencies = []
+        received = await _receive_count(layer, channel, expected, latencies, timeout)
+        await layer.close()
+        return received, latencies
+
+    results.put(asyncio.run(run()))
+
+
+def measure_fanout(database="default", processes=4, messages=500, payload_bytes=200, timeout=60):
+    """Group-send from this process to a group joined by `processes` separate worker processes."""
+    context = multiprocessing.get_context("spawn")
+    ready, results = context.Queue(), context.Queue()
+    workers = [
+        context.Process(target=_fanout_worker, args=(database, messages, timeout, ready, results), daemon=True)
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get(timeout=timeout)
+
+    async def send():
+        layer = PostgresChannelLayer(database=database)
+        started = time.perf_counter()
+        for _ in range(messages):
+            await layer.group_send(FANOUT_GROUP, _message(payload_bytes))
+        await layer.close()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    send_seconds = asyncio.run(send())
+    outcomes = [results.get(timeout=timeout + 10) for _ in workers]
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join(timeout=5)
+
+    delivered = sum(received for received, _ in outcomes)
+    latencies = [latency for _, worker_latencies in outcomes for latency in worker_latencies]
+    return {
+        "processes": processes,
+        "messages": messages,
+        "deliveries": delivered,
+        "lost": messages * processes - delivered,
+        "per_process": [received for received, _ in outcomes],
+        "send_per_s": round(messages / send_seconds) if send_seconds else None,
+        "deliveries_per_s": round(delivered / elapsed) if elapsed else None,
+        "elapsed_s": round(elapsed, 3),
+        **_latency_summary(latencies),
+    }
+
+
+def run_channel_layer_benchmark(database="default", messages=2000, groups=20, members=5,
+                                payload_bytes=200, batch=100, processes=4, progress=None):
+    """Benchmark the in-memory layer against the Postgres layer and return the report."""
+    capacity = messages + 10
+    layers = [
+        ("in_memory", lambda: InMemoryChannelLayer(capacity=capacity), None),
+        ("postgres", lambda: PostgresChannelLayer(database=database, capacity=capacity), None),
+    ]
+    if batch:
+        layers.append((f"postgres_batch_{batch}", lambda: PostgresChannelLayer(database=database, capacity=capacity), batch))
+
+    results = {}
+    for name, make_layer, layer_batch in layers:
+        async def run():
+            layer = make_layer()
+            try:
+                return await measure_layer(
+                    layer, messages=messages, groups=groups, members=members,
+                    payload_bytes=payload_bytes, batch=layer_batch,
+                )
+            finally:
+                if hasattr(layer, "close"):
+                    await layer.close()
+
+        results[name] = asyncio.run(run())
+        if progress:
+            progress(name, results[name])
+
+    if processes:
+        results["postgres_fanout"] = measure_fanout(
+            database=database, processes=processes, messages=messages // 4 or 1, payload_bytes=payload_bytes,
+        )
+        if progress:
+            progress("postgres_fanout", results["postgres_fanout"])
+
+    return {
+        "workload": {
+            "messages": messages, "groups": groups, "members": members,
+            "payload_bytes": payload_bytes, "batch": batch, "processes": processes,
+        },
+        "results": results,
+    }
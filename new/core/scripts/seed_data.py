@@ -0,0 +1,274 @@
+"""
+Synthetic data for benchmarking (python manage.py seed_benchmark_data).
+
+Everything is written with bulk_create in fixed-size batches so hundreds of
+thousands of requests can be generated without holding them all in memory.
+Generated rows are tagged with BENCH_PREFIX so they can be removed again.
+"""
+import datetime
+import random
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.gso_accounts.models import Department, Unit, User
+from apps.gso_inventory.models import InventoryItem
+from apps.gso_reports.models import SuccessIndicator, WorkAccomplishmentReport
+from apps.gso_requests.models import Feedback, RequestMaterial, ServiceRequest, TaskReport
+from apps.notifications.counters import recount_unread
+from apps.notifications.models import Notification
+
+BENCH_PREFIX = "bench_"
+BENCH_PASSWORD = "benchmark"
+
+UNIT_NAMES = ["Electrical", "Plumbing", "Carpentry", "Janitorial", "Motorpool", "Landscaping", "Masonry", "Aircon"]
+ACTIVITIES = {
+    "Electrical": ["Replace light fixture", "Repair outlet", "Rewire panel", "Install ceiling fan"],
+    "Plumbing": ["Fix leaking faucet", "Unclog drain", "Replace toilet flush", "Repair water line"],
+    "Carpentry": ["Repair door", "Build shelf", "Fix cabinet hinge", "Replace window frame"],
+    "Janitorial": ["Clean conference hall", "Sanitize restrooms", "Haul garbage", "Scrub floors"],
+    "Motorpool": ["Vehicle maintenance", "Change oil", "Replace tires", "Service trip"],
+    "Landscaping": ["Trim hedges", "Mow lawn", "Plant trees", "Clear drainage canal"],
+    "Masonry": ["Patch wall crack", "Repair stairs", "Tile flooring", "Build partition"],
+    "Aircon": ["Clean aircon unit", "Recharge freon", "Replace compressor", "Install split type"],
+}
+REPORT_TEXTS = [
+    "Checked the area and replaced the damaged parts.",
+    "Work completed and tested with the requesting office.",
+    "Parts were unavailable, used temporary fix pending delivery.",
+    "Cleaned and inspected; no further issues found.",
+]
+SUGGESTIONS = [
+    "Fast and friendly service, salamat!", "Staff were courteous and helpful.",
+    "The repair took too long.", "Good job, keep it up.", "", "",
+]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Mark", "Grace", "John", "Joy", "Paolo", "Liza"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Aquino"]
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep generated created_at values instead of stamping 'now'."""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+def chunked(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+# -------------------------------
+# Reference Data
+# -------------------------------
+def seed_reference_data(rng, departments=25):
+    """Units, departments, success indicators and inventory for the benchmark."""
+    units = Unit.objects.bulk_create([Unit(name=f"{BENCH_PREFIX}{name}") for name in UNIT_NAMES])
+    depts = Department.objects.bulk_create([
+        Department(name=f"{BENCH_PREFIX}Department {i + 1}") for i in range(departments)
+    ])
+    indicators = SuccessIndicator.objects.bulk_create([
+        SuccessIndicator(unit=unit, code=f"{prefix}{i + 1}", description=f"{unit.name} indicator {prefix}{i + 1}")
+        for unit in units for prefix in ("CF", "SF") for i in range(3)
+    ])
+    items = InventoryItem.objects.bulk_create([
+        InventoryItem(
+            name=f"{unit.name} material {i + 1}", quantity=rng.randint(0, 500),
+            reorder_level=rng.choice([5, 10, 20]), owned_by=unit, category=unit.name.replace(BENCH_PREFIX, ""),
+        )
+        for unit in units for i in range(60)
+    ])
+    return units, depts, indicators, items
+
+
+def seed_users(rng, units, depts, total, password):
+    """gso/director logins, one head per unit, ~10% personnel, the rest requestors."""
+    def user(username, role, **extra):
+        return User(
+            username=f"{BENCH_PREFIX}{username}", password=password, role=role,
+            first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES), **extra,
+        )
+
+    users = [user("gso", "gso"), user("director", "director")]
+    users += [user(f"head{i + 1}", "unit_head", unit=unit) for i, unit in enumerate(units)]
+    personnel_count = max(len(units), total // 10)
+    users += [user(f"personnel{i + 1}", "personnel", unit=units[i % len(units)]) for i in range(personnel_count)]
+    requestor_count = max(1, total - len(users))
+    users += [user(f"requestor{i + 1}", "requestor", department=rng.choice(depts)) for i in range(requestor_count)]
+    users = User.objects.bulk_create(users, batch_size=2000)
+
+    heads = [u for u in users if u.role == "unit_head"]
+    for unit, head in zip(units, heads):
+        unit.unit_head = head
+    Unit.objects.bulk_update(units, ["unit_head"])
+    return users
+
+
+# -------------------------------
+# Requests and Everything Hanging Off Them
+# -------------------------------
+def seed_requests(rng, units, indicators, items, users, total, days, batch_size, progress=None):
+    """Requests spread over the last `days` days, with their dependent rows."""
+    personnel_by_unit = {}
+    for u in users:
+        if u.role == "personnel":
+            personnel_by_unit.setdefault(u.unit_id, []).append(u)
+    requestors = [u for u in users if u.role == "requestor"]
+    staff = [u for u in users if u.role in ("gso", "director", "unit_head")]
+    indicators_by_unit, items_by_unit = {}, {}
+    for indicator in indicators:
+        indicators_by_unit.setdefault(indicator.unit_id, []).append(indicator)
+    for item in items:
+        items_by_unit.setdefault(item.owned_by_id, []).append(item)
+
+    statuses = ["Pending", "Approved", "In Progress", "Done for Review", "Completed", "Cancelled"]
+    weights = [8, 6, 8, 4, 68, 6]
+    now = timezone.now()
+    counts = {"requests": 0, "wars": 0, "task_reports": 0, "feedback": 0, "notifications": 0, "materials": 0}
+
+    AssignedPersonnel = ServiceRequest.assigned_personnel.through
+    WarPersonnel = WorkAccomplishmentReport.assigned_personnel.through
+
+    for _, size in chunked(total, batch_size):
+        with transaction.atomic():
+            requests = []
+            for _ in range(size):
+                unit = rng.choice(units)
+                requestor = rng.choice(requestors)
+                created_at = now - datetime.timedelta(days=rng.random() * days)
+                status = rng.choices(statuses, weights)[0]
+                activity = rng.choice(ACTIVITIES[unit.name.replace(BENCH_PREFIX, "")])
+                requests.append(ServiceRequest(
+                    requestor=requestor, unit=unit, department_id=requestor.department_id,
+                    description=f"{activity} at room {rng.randint(100, 499)}", activity_name=activity,
+                    status=status, is_emergency=rng.random() < 0.03, created_at=created_at,
+                    completed_at=created_at + datetime.timedelta(days=rng.uniform(0.2, 10)) if status == "Completed" else None,
+                    selected_indicator=rng.choice(indicators_by_unit[unit.id]),
+                ))
+            with explicit_timestamps(ServiceRequest._meta.get_field("created_at")):
+                requests = ServiceRequest.objects.bulk_create(requests)
+
+            assignments, materials, reports, wars, feedback, notifications = [], [], [], [], [], []
+            request_personnel = {}
+            for req in requests:
+                notifications.append(Notification(
+                    user=rng.choice(staff), message=f"New request #{req.id} submitted.",
+                    is_read=rng.random() < 0.8, created_at=req.created_at,
+                ))
+                if req.status in ("Pending", "Cancelled"):
+                    continue
+
+                crew = rng.sample(personnel_by_unit[req.unit_id], k=min(rng.randint(1, 3), len(personnel_by_unit[req.unit_id])))
+                request_personnel[req.id] = crew
+                assignments += [AssignedPersonnel(servicerequest_id=req.id, user_id=p.id) for p in crew]
+                for item in rng.sample(items_by_unit[req.unit_id], k=rng.randint(0, 2)):
+                    materials.append(RequestMaterial(request=req, material=item, quantity=rng.randint(1, 5)))
+                reports += [
+                    TaskReport(request=req, personnel=p, report_text=rng.choice(REPORT_TEXTS), created_at=req.created_at)
+                    for p in crew
+                ]
+                notifications += [
+                    Notification(user=p, message=f"You were assigned to request #{req.id}.", is_read=rng.random() < 0.7,
+                                 created_at=req.created_at)
+                    for p in crew
+                ]
+
+                if req.status == "Completed":
+                    wars.append(WorkAccomplishmentReport(
+                        request=req, unit_id=req.unit_id, date_started=req.created_at.date(),
+                        date_completed=req.completed_at.date(), activity_name=req.activity_name,
+                        description=f"{req.activity_name} completed for the requesting office.",
+                        success_indicator=req.selected_indicator, status="Completed",
+                        created_at=req.completed_at,
+                    ))
+                    if rng.random() < 0.6:
+                        scores = [rng.choices([5, 4, 3, 2, 1], [50, 30, 12, 5, 3])[0] for _ in range(9)]
+                        feedback.append(Feedback(
+                            request=req, user_id=req.requestor_id, cc1="Yes", cc2="Yes", cc3="Yes",
+                            **{f"sqd{i + 1}": score for i, score in enumerate(scores)},
+                            average_score=sum(scores) / len(scores), suggestions=rng.choice(SUGGESTIONS),
+                            date_submitted=req.completed_at,
+                        ))
+
+            AssignedPersonnel.objects.bulk_create(assignments)
+            RequestMaterial.objects.bulk_create(materials)
+            timestamped = [
+                WorkAccomplishmentReport._meta.get_field("created_at"),
+                TaskReport._meta.get_field("created_at"),
+                Feedback._meta.get_field("date_submitted"),
+                Notification._meta.get_field("created_at"),
+            ]
+            with explicit_timestamps(*timestamped):
+                TaskReport.objects.bulk_create(reports)
+                wars = WorkAccomplishmentReport.objects.bulk_create(wars)
+                Feedback.objects.bulk_create(feedback)
+                Notification.objects.bulk_create(notifications)
+            WarPersonnel.objects.bulk_create([
+                WarPersonnel(workaccomplishmentreport_id=war.id, user_id=p.id)
+                for war in wars for p in request_personnel[war.request_id]
+            ])
+
+        counts["requests"] += len(requests)
+        counts["wars"] += len(wars)
+        counts["task_reports"] += len(reports)
+        counts["feedback"] += len(feedback)
+        counts["notifications"] += len(notifications)
+        counts["materials"] += len(materials)
+        if progress:
+            progress(counts)
+    return counts
+
+
+def seed_benchmark_data(users=5000, requests=200000, days=730, batch_size=5000, seed=42, progress=None):
+    """Generate a full benchmark dataset and return row counts and timing."""
+    if User.objects.filter(username=f"{BENCH_PREFIX}gso").exists():
+        raise RuntimeError("Benchmark data already exists; run with --clear first.")
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    password = make_password(BENCH_PASSWORD)  # hashed once and shared; hashing per user takes minutes
+
+    with transaction.atomic():
+        units, depts, indicators, items = seed_reference_data(rng)
+        all_users = seed_users(rng, units, depts, users, password)
+
+    counts = seed_requests(rng, units, indicators, items, all_users, requests, days, batch_size, progress=progress)
+    # Notifications were bulk-inserted with random read states; count them once at the end
+    recount_unread([user.id for user in all_users])
+    counts.update(units=len(units), departments=len(depts), users=len(all_users), inventory_items=len(items))
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def clear_benchmark_data():
+    """Remove everything seeded by seed_benchmark_data."""
+    with transaction.atomic():
+        unit_ids = list(Unit.objects.filter(name__startswith=BENCH_PREFIX).values_list("id", flat=True))
+        user_ids = list(User.objects.filter(username__startswith=BENCH_PREFIX).values_list("id", flat=True))
+        request_ids = ServiceRequest.objects.filter(unit_id__in=unit_ids)
+
+        # Delete children with queryset deletes first so the cascade collector stays small
+        Notification.objects.filter(user_id__in=user_ids).delete()
+        Feedback.objects.filter(request__in=request_ids).delete()
+        TaskReport.objects.filter(request__in=request_ids).delete()
+        RequestMaterial.objects.filter(request__in=request_ids).delete()
+        WorkAccomplishmentReport.assigned_personnel.through.objects.filter(workaccomplishmentreport__unit_id__in=unit_ids).delete()
+        WorkAccomplishmentReport.objects.filter(unit_id__in=unit_ids).delete()
+        ServiceRequest.assigned_personnel.through.objects.filter(servicerequest__unit_id__in=unit_ids).delete()
+        deleted = request_ids.delete()[0]
+
+        InventoryItem.objects.filter(owned_by_id__in=unit_ids).delete()
+        Unit.objects.filter(id__in=unit_ids).update(unit_head=None)
+        User.objects.filter(id__in=user_ids).delete()
+        Unit.objects.filter(id__in=unit_ids).delete()
+        Department.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    return deleted
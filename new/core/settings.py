@@ -68,6 +68,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
+    'core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -83,6 +85,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.notifications.context_processors.unread_notifications',
+                'core.context_processors.reference_data',
             ],
         },
     },
@@ -105,13 +109,28 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 
 
+# Shared cache for reference data (see core/reference_data.py). File-based so
+# every worker process on this machine sees the same entries.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("DJANGO_CACHE_DIR", str(BASE_DIR / 'cache')),
+    },
+}
+
+# Tests use their own in-memory cache (see core/testing.py)
+TEST_RUNNER = "core.testing.TestRunner"
+
 # Channels ASGI application
 ASGI_APPLICATION = 'core.asgi.application'
 
-# Channel layer for local testing
+# Channel layer over Postgres LISTEN/NOTIFY, so websocket pushes reach every
+# ASGI worker process (see core/channel_layers.py). For a single process without
+# Postgres, "channels.layers.InMemoryChannelLayer" also works.
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "BACKEND": "core.channel_layers.PostgresChannelLayer",
+        "CONFIG": {"database": "default"},
     },
 }
 
@@ -202,6 +221,37 @@ LOGOUT_REDIRECT_URL = '/gso_accounts/login/'
 
 HF_API_KEY = os.getenv("HUGGINGFACE_API_TOKEN")
 
+
+# Backups (python manage.py backup)
+BACKUP_DIR = BASE_DIR / 'backups'
+PG_DUMP_PATH = os.getenv("PG_DUMP_PATH", "pg_dump")
+BACKUP_DUMP_JOBS = int(os.getenv("BACKUP_DUMP_JOBS", "4"))
+BACKUP_DUMP_COMPRESSION = int(os.getenv("BACKUP_DUMP_COMPRESSION", "6"))
+BACKUP_RETENTION = {"daily": 7, "weekly": 4, "monthly": 6}  # grandfather-father-son
+
+# Background jobs: migration uploads, WAR regeneration, IPMT summaries (see core/jobs.py)
+JOB_HEARTBEAT_SECONDS = 30  # how often a running job stamps heartbeat_at
+JOB_STALE_SECONDS = 600  # a running job silent this long is presumed dead and may be started again
+
+# Per-view query/latency budgets (see core/query_budget.py)
+QUERY_BUDGET_ENABLED = os.getenv("QUERY_BUDGET_ENABLED", "False") == "True"
+QUERY_BUDGET_SAMPLE_RATE = float(os.getenv("QUERY_BUDGET_SAMPLE_RATE", "0.1"))  # share of requests measured
+QUERY_BUDGET_DEFAULT = {"queries": 50, "ms": 1000}
+
+# On-demand request profiling for staff (see core/profiling.py)
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_TOKEN_MAX_AGE = 3600  # seconds a profiling token stays valid
+PROFILE_SAMPLE_INTERVAL = 0.001  # stack sampling interval in seconds
+
+# Local AI service: calls in flight at once (the inference server runs one model process per call)
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "2"))
+AI_MAX_PROMPT_CHARS = int(os.getenv("AI_MAX_PROMPT_CHARS", "1000"))  # must match inference_server.py
+AI_SUMMARY_CACHE_SECONDS = 30 * 24 * 3600  # IPMT summaries are cached by prompt fingerprint
+
+# Notifications (see apps/notifications/services.py and partitions.py)
+NOTIFICATION_DIGEST_WINDOW = 3600  # seconds a burst keeps folding into one unread digest row
+NOTIFICATION_RETENTION_MONTHS = 6  # prune_notifications drops read notifications older than this
+
 #CELERY_BROKER_URL = 'redis://localhost:6379/0'  # Redis local
 #CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 #CELERY_ACCEPT_CONTENT = ['json']
@@ -0,0 +1,172 @@
+# core/testing.py
+"""Shared assertions for the app test suites."""
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve
+
+from core.query_budget import get_query_budget
+
+
+# -------------------------------
+# Query Plan Assertions
+# -------------------------------
+class QueryPlanMixin:
+    """
+    Check that a queryset can be answered from a given index.
+
+    On PostgreSQL sequential scans are disabled for the test transaction, so
+    a small seeded table still reports the index the planner *could* use;
+    if the index no longer matches the query, the plan falls back to a
+    (penalised) Seq Scan and the assertion fails.
+    """
+
+    @classmethod
+    def analyze_tables(cls, *models):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                for model in models:
+                    cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+            else:
+                cursor.execute("ANALYZE")
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def index_on(self, table, columns):
+        """Name of the index on exactly `columns`, e.g. the FK index Django adds to an M2M table."""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        for name, info in constraints.items():
+            if info["index"] and info["columns"] == list(columns):
+                return name
+        self.fail(f"No index on {table}({', '.join(columns)})")
+
+    def partition_indexes(self, index_name):
+        """Names of the per-partition copies of an index on a partitioned PostgreSQL table."""
+        if connection.vendor != "postgresql":
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "JOIN pg_class parent ON parent.oid = i.inhparent WHERE parent.relname = %s",
+                [index_name],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.explain(queryset)
+        names = [index_name, *self.partition_indexes(index_name)]
+        self.assertTrue(any(name in plan for name in names), f"Expected {index_name} in query plan:\n{plan}")
+
+
+# -------------------------------
+# Query Budgets
+# -------------------------------
+class QueryBudgetMixin:
+    """
+    Enforce the @query_budget declared on a view. Only the query count is
+    asserted; latency budgets are left to QueryBudgetMiddleware in production
+    because test-machine timings are too noisy to fail a build on.
+    """
+
+    def assertWithinQueryBudget(self, url, data=None):
+        match = resolve(urlsplit(url).path)
+        self.assertTrue(
+            hasattr(match.func, "query_budget"),
+            f"{match.view_name} has no @query_budget declared",
+        )
+        budget = get_query_budget(match.func)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data or {})
+
+        self.assertEqual(response.status_code, 200, f"{match.view_name} returned {response.status_code}")
+        self.assertLessEqual(
+            len(queries), budget["queries"],
+            f"{match.view_name} ran {len(queries)} queries (budget {budget['queries']}):\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        return response
+
+
+# -------------------------------
+# Test Runner
+# -------------------------------
+class TestRunner(DiscoverRunner):
+    """
+    Run the suites against a private in-memory cache. Test databases reuse
+    the same name on every run, so cached reference data from a previous run
+    (or from the development server) would otherwise be served to the next.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_override = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        )
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+# -------------------------------
+# Sample Data
+# -------------------------------
+def seed_sample_data(requests=20):
+    """
+    A small but complete dataset for view tests: one user per role, a unit
+    with inventory, and `requests` service requests across every status, each
+    with materials, personnel, a task report, a WAR and (when completed) feedback.
+    """
+    import datetime
+
+    from apps.gso_accounts.models import Department, Unit, User
+    from apps.gso_inventory.models import InventoryItem
+    from apps.gso_reports.models import SuccessIndicator, WorkAccomplishmentReport
+    from apps.gso_requests.models import Feedback, RequestMaterial, ServiceRequest, TaskReport
+
+    department = Department.objects.create(name="College of Sciences")
+    unit = Unit.objects.create(name="Electrical")
+    users = {
+        "gso": User.objects.create_user("gso", password="pass", role="gso", first_name="Gso", last_name="Office"),
+        "director": User.objects.create_user("director", password="pass", role="director", first_name="Dir", last_name="Ector"),
+        "unit_head": User.objects.create_user("unit_head", password="pass", role="unit_head", unit=unit, first_name="Unit", last_name="Head"),
+        "personnel": User.objects.create_user("personnel", password="pass", role="personnel", unit=unit, first_name="Per", last_name="Sonnel"),
+        "requestor": User.objects.create_user("requestor", password="pass", role="requestor", department=department),
+    }
+    unit.unit_head = users["unit_head"]
+    unit.save(update_fields=["unit_head"])
+
+    indicator = SuccessIndicator.objects.create(unit=unit, code="CF1", description="Repairs completed")
+    items = InventoryItem.objects.bulk_create([
+        InventoryItem(name=f"Material {i}", quantity=100, category="Electrical", owned_by=unit) for i in range(10)
+    ])
+
+    statuses = [choice for choice, _ in ServiceRequest.STATUS_CHOICES]
+    today = datetime.date.today()
+    for i in range(requests):
+        status = statuses[i % len(statuses)]
+        service_request = ServiceRequest.objects.create(
+            requestor=users["requestor"], unit=unit, department=department,
+            description=f"Fix lights in room {i}", status=status, selected_indicator=indicator,
+        )
+        service_request.assigned_personnel.add(users["personnel"])
+        RequestMaterial.objects.create(request=service_request, material=items[i % len(items)], quantity=1)
+        TaskReport.objects.create(request=service_request, personnel=users["personnel"], report_text="Replaced the fixture.")
+        war = WorkAccomplishmentReport.objects.create(
+            request=service_request, unit=unit, date_started=today, date_completed=today,
+            activity_name="Electrical repair", description="Replaced the light fixture.", success_indicator=indicator,
+        )
+        war.assigned_personnel.add(users["personnel"])
+        if status == "Completed":
+            Feedback.objects.create(request=service_request, user=users["requestor"], sqd1=5, sqd8=4, suggestions="Fast and friendly.")
+    return users
@@ -0,0 +1,538 @@
+import asyncio
+import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.gso_accounts.models import Unit, User
+from apps.gso_reports.models import SuccessIndicator
+from apps.gso_requests.models import ServiceRequest
+from core import context_processors, reference_data
+from core.channel_layers import MAX_NOTIFY_BYTES, PostgresChannelLayer, pg_channel_name
+from core.jobs import heartbeat
+from core.models import ChannelLayerMessage
+from core.profiling import TOKEN_PARAM, list_profiles, make_profile_token
+from core.reference_data import get_departments, get_success_indicators, get_unit_by_name, get_units
+from core.scripts import backup
+from core.scripts.backup import (
+    apply_retention_policy, backup_database, backup_media, compare_fingerprints, parse_backup_timestamp,
+    prune_media_store, read_manifest_stats, restore_media, select_retained,
+)
+from core.scripts.benchmark import compare_reports
+
+
+# -------------------------------
+# Reference Data Cache
+# -------------------------------
+class ReferenceDataCacheTests(TestCase):
+    """Cached Units/SuccessIndicators are served without SQL until a row changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = Unit.objects.create(name="Carpentry")
+        cls.indicator = SuccessIndicator.objects.create(unit=cls.unit, code="CP1", description="Repairs done")
+
+    def setUp(self):
+        reference_data._local.clear()
+        for name in reference_data.DATASETS:
+            reference_data.invalidate(name)
+
+    def test_second_read_runs_no_queries(self):
+        get_units()
+        with self.assertNumQueries(0):
+            self.assertIn(self.unit, get_units())
+            self.assertEqual(get_unit_by_name("carpentry"), self.unit)
+
+    def test_save_invalidates(self):
+        get_units()
+        Unit.objects.create(name="Plumbing")
+        self.assertIn("Plumbing", [unit.name for unit in get_units()])
+
+    def test_delete_invalidates(self):
+        self.assertEqual(get_success_indicators(unit=self.unit), (self.indicator,))
+        self.indicator.delete()
+        self.assertEqual(get_success_indicators(unit=self.unit), ())
+
+    def test_inactive_indicators_are_excluded(self):
+        SuccessIndicator.objects.create(unit=self.unit, code="CP2", description="Retired", is_active=False)
+        self.assertEqual([si.code for si in get_success_indicators()], ["CP1"])
+
+    def test_context_processor_reads_the_users_unit_from_the_cache(self):
+        personnel = User.objects.create_user("personnel", password="pass", role="personnel", unit=self.unit)
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=personnel.pk)
+        get_units()
+        get_departments()
+
+        with self.assertNumQueries(0):
+            context = context_processors.reference_data(request)
+            self.assertEqual(context["user_unit"].name, "Carpentry")
+            self.assertFalse(context["user_department"])
+
+        self.client.force_login(personnel)
+        response = self.client.get(reverse("gso_requests:personnel_task_management"), HTTP_HOST="127.0.0.1")
+        self.assertContains(response, "Personnel - Carpentry")
+
+
+# -------------------------------
+# Postgres Channel Layer
+# -------------------------------
+@unittest.skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY needs PostgreSQL")
+class PostgresChannelLayerTests(TransactionTestCase):
+    """Two layer instances stand in for two ASGI worker processes."""
+
+    def run_async(self, coroutine):
+        async def run():
+            self.sender, self.receiver = PostgresChannelLayer(), PostgresChannelLayer()
+            try:
+                return await asyncio.wait_for(coroutine(), 10)
+            finally:
+                await self.sender.close()
+                await self.receiver.close()
+        return asyncio.run(run())
+
+    def test_group_send_reaches_every_member_in_another_process(self):
+        async def scenario():
+            channels = [await self.receiver.new_channel() for _ in range(2)]
+            for channel in channels:
+                await self.receiver.group_add("notifications.user.1", channel)
+            await self.sender.group_send("notifications.user.1", {"type": "notification.event", "n": 1})
+            return [await self.receiver.receive(channel) for channel in channels]
+
+        messages = self.run_async(scenario)
+        self.assertEqual(messages, [{"type": "notification.event", "n": 1}] * 2)
+
+    def test_send_to_specific_channel_in_another_process(self):
+        async def scenario():
+            channel = await self.receiver.new_channel()
+            receiving = asyncio.ensure_future(self.receiver.receive(channel))
+            await asyncio.sleep(0.1)
+            await self.sender.send(channel, {"type": "hello"})
+            return await receiving
+
+        self.assertEqual(self.run_async(scenario), {"type": "hello"})
+
+    def test_large_message_goes_through_overflow_table(self):
+        big = "x" * (MAX_NOTIFY_BYTES + 100)
+
+        async def scenario():
+            channel = await self.receiver.new_channel()
+            await self.receiver.group_add("big", channel)
+            await self.sender.group_send("big", {"type": "big", "body": big})
+            return await self.receiver.receive(channel)
+
+        self.assertEqual(self.run_async(scenario)["body"], big)
+        self.assertEqual(ChannelLayerMessage.objects.count(), 1)
+
+    def test_notify_read_during_a_listen_is_delivered(self):
+        async def scenario():
+            channel = await self.receiver.new_channel()
+            await self.receiver.group_add("g", channel)
+            # Keep the loop busy so the NOTIFY arrives with the next LISTEN's reply, not via the reader
+            envelope = {"g": "g", "m": {"type": "early"}, "x": time.time() + 60}
+            self.sender._execute_notifies([(pg_channel_name("g", "g"), envelope)])
+            time.sleep(0.2)
+            await self.receiver.group_add("other", channel)
+            return await self.receiver.receive(channel)
+
+        self.assertEqual(self.run_async(scenario), {"type": "early"})
+
+    def test_group_discard_stops_delivery(self):
+        async def scenario():
+            channel = await self.receiver.new_channel()
+            await self.receiver.group_add("g", channel)
+            await self.receiver.group_discard("g", channel)
+            await self.sender.group_send("g", {"type": "dropped"})
+            await asyncio.sleep(0.2)
+            return self.receiver.channels.get(channel)
+
+        self.assertIsNone(self.run_async(scenario))
+
+
+class ChannelLayerUnitTests(SimpleTestCase):
+    """Naming, overflow and local delivery, without a database."""
+
+    def setUp(self):
+        self.layer = PostgresChannelLayer()
+
+    def notify(self, message, cursor):
+        cursor.fetchone.return_value = (7,)
+        with mock.patch.object(self.layer, "_with_send_cursor", side_effect=lambda work: work(cursor)):
+            self.layer._execute_notifies([("cl_g_x", {"g": "x", "m": message, "x": 1.0})])
+        return [sql.args for sql in cursor.execute.call_args_list]
+
+    def test_pg_channel_names_fit_postgres_identifiers(self):
+        for name in ["g", "notifications.user.1", "specific.pg0123456789ab!" + "x" * 200, "ü" * 100]:
+            with self.subTest(name=name[:20]):
+                pg_channel = pg_channel_name("g", name)
+                self.assertLessEqual(len(pg_channel.encode()), 63)
+                self.assertEqual(pg_channel, pg_channel_name("g", name))
+        self.assertNotEqual(pg_channel_name("c", "a"), pg_channel_name("g", "a"))
+
+    def test_payloads_up_to_the_limit_are_notified_inline(self):
+        self.assertLess(MAX_NOTIFY_BYTES, 8000)
+        overhead = len(json.dumps({"g": "x", "m": {"b": ""}, "x": 1.0}, separators=(",", ":")))
+        cursor = mock.MagicMock()
+
+        calls = self.notify({"b": "y" * (MAX_NOTIFY_BYTES - overhead)}, cursor)
+
+        self.assertEqual(len(calls), 1)
+        sql, (pg_channel, payload) = calls[0]
+        self.assertEqual((sql, pg_channel), ("SELECT pg_notify(%s, %s)", "cl_g_x"))
+        self.assertEqual(len(payload.encode()), MAX_NOTIFY_BYTES)
+
+    def test_larger_payloads_go_through_the_overflow_table(self):
+        cursor = mock.MagicMock()
+
+        calls = self.notify({"b": "é" * (MAX_NOTIFY_BYTES // 2)}, cursor)
+
+        self.assertEqual([sql.split()[0] for sql, _params in calls], ["INSERT", "SELECT", "DELETE"])
+        self.assertEqual(calls[1][1], ["cl_g_x", '{"o": 7}'])
+
+    def test_deliver_routes_groups_to_local_members(self):
+        self.layer.groups = {"g": {"a", "b"}, "other": {"c"}}
+        message = {"type": "hello", "items": [1]}
+
+        self.layer._deliver({"g": "g", "m": message, "x": time.time() + 60})
+
+        self.assertEqual(set(self.layer.channels), {"a", "b"})
+        delivered = [self.layer.channels[channel].get_nowait()[1] for channel in ("a", "b")]
+        self.assertEqual(delivered, [message, message])
+        self.assertIsNot(delivered[0], delivered[1])
+
+    def test_deliver_to_a_channel_and_unknown_group(self):
+        self.layer._deliver({"c": "specific.x!a", "m": {"type": "hi"}, "x": time.time() + 60})
+        self.layer._deliver({"g": "nobody", "m": {"type": "hi"}, "x": time.time() + 60})
+
+        self.assertEqual(list(self.layer.channels), ["specific.x!a"])
+        self.assertEqual(self.layer.channels["specific.x!a"].qsize(), 1)
+
+    def test_deliver_drops_expired_envelopes(self):
+        self.layer.groups = {"g": {"a"}}
+        self.layer._deliver({"g": "g", "m": {"type": "late"}, "x": time.time() - 1})
+        self.layer._deliver({"c": "a", "m": {"type": "late"}, "x": time.time() - 1})
+
+        self.assertEqual(self.layer.channels, {})
+
+
+# -------------------------------
+# Background Job Heartbeats
+# -------------------------------
+@mock.patch("core.jobs.connection")
+class HeartbeatTests(SimpleTestCase):
+
+    def test_beats_on_a_timer_until_the_block_ends(self, _connection):
+        queryset = mock.Mock()
+        with heartbeat(queryset, interval=0.01):
+            time.sleep(0.2)
+        beats = queryset.update.call_count
+        time.sleep(0.05)
+
+        # One stamp on entry, then the timer, though the block never reported progress
+        self.assertGreater(beats, 3)
+        self.assertLessEqual(queryset.update.call_count, beats + 1)
+        self.assertEqual(set(queryset.update.call_args.kwargs), {"heartbeat_at"})
+
+    def test_database_errors_do_not_stop_the_timer(self, _connection):
+        queryset = mock.Mock()
+        queryset.update.side_effect = [1, DatabaseError("gone")] + [1] * 1000
+        with self.assertLogs("core.jobs", "WARNING"), heartbeat(queryset, interval=0.01):
+            time.sleep(0.1)
+        self.assertGreater(queryset.update.call_count, 3)
+
+
+# -------------------------------
+# Database and Media Backups
+# -------------------------------
+class BackupTests(SimpleTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.backup_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.addCleanup(shutil.rmtree, self.backup_dir)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, BACKUP_DIR=self.backup_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write_media(self, rel_path, content):
+        path = os.path.join(self.media_root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def run_media_backup(self, name):
+        with redirect_stdout(io.StringIO()):
+            manifest = backup_media()
+        # Runs within the same second share a timestamp; keep each manifest
+        renamed = os.path.join(os.path.dirname(manifest), f"media_manifest_2025-06-0{name}_02-00-00.json")
+        os.replace(manifest, renamed)
+        return renamed
+
+    def test_media_backup_is_incremental_and_deduplicated(self):
+        self.write_media("attachments/a.jpg", "photo")
+        self.write_media("attachments/copy.jpg", "photo")
+        self.write_media("migration_files/items.xlsx", "sheet")
+
+        first = self.run_media_backup(1)
+        self.assertEqual(read_manifest_stats(first), {"files": 3, "new_files": 2, "new_bytes": 10, "total_bytes": 15})
+
+        with mock.patch("core.scripts.backup.hash_file", wraps=backup.hash_file) as hash_file:
+            second = self.run_media_backup(2)
+        hash_file.assert_not_called()
+        self.assertEqual(read_manifest_stats(second)["new_files"], 0)
+
+        self.write_media("migration_files/items.xlsx", "sheet v2")
+        self.assertEqual(read_manifest_stats(self.run_media_backup(3))["new_files"], 1)
+
+    def test_restore_and_prune_media_store(self):
+        self.write_media("attachments/a.jpg", "photo")
+        first = self.run_media_backup(1)
+        self.write_media("attachments/a.jpg", "retouched")
+        second = self.run_media_backup(2)
+
+        target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, target)
+        self.assertEqual(restore_media(first, target), 1)
+        with open(os.path.join(target, "attachments", "a.jpg")) as f:
+            self.assertEqual(f.read(), "photo")
+
+        os.remove(first)
+        self.assertEqual(prune_media_store(), 1)
+        restore_media(second, target)
+        with open(os.path.join(target, "attachments", "a.jpg")) as f:
+            self.assertEqual(f.read(), "retouched")
+
+    def test_database_backup_is_a_parallel_directory_dump_with_manifest(self):
+        cursor = mock.MagicMock()
+        cursor.fetchone.side_effect = [("snap-1",)] + [(3, "abc")] * len(backup.KEY_MODELS)
+        connection_mock = mock.MagicMock()
+        connection_mock.cursor.return_value.__enter__.return_value = cursor
+
+        with mock.patch("core.scripts.backup.get_pg_connection", return_value=connection_mock), \
+                mock.patch("core.scripts.backup.subprocess.run", side_effect=lambda command, **kwargs: os.makedirs(command[-2])) as run, \
+                redirect_stdout(io.StringIO()):
+            dump_path = backup_database(jobs=3, compression=5)
+
+        command = run.call_args.args[0]
+        for flag, value in (("-F", "d"), ("-j", "3"), ("-Z", "5"), ("--snapshot", "snap-1")):
+            self.assertEqual(command[command.index(flag) + 1], value)
+        manifest = backup.read_dump_manifest(dump_path)
+        self.assertEqual(manifest["tables"]["gso_accounts_unit"], {"rows": 3, "checksum": "abc"})
+        connection_mock.close.assert_called_once()
+
+
+# -------------------------------
+# Backup Retention and Verification
+# -------------------------------
+class BackupRetentionTests(SimpleTestCase):
+    """Grandfather-father-son selection: newest backup per day, ISO week and month."""
+
+    def test_parse_backup_timestamp(self):
+        self.assertEqual(
+            parse_backup_timestamp("/backups/gso_backup_2025-06-30_02-00-00.dump"),
+            datetime.datetime(2025, 6, 30, 2, 0, 0),
+        )
+        self.assertEqual(
+            parse_backup_timestamp("media_manifests/media_manifest_2025-06-01_23-59-59.json"),
+            datetime.datetime(2025, 6, 1, 23, 59, 59),
+        )
+        self.assertEqual(parse_backup_timestamp("gso_backup_2025-01-02_03-04-05.sql").day, 2)
+        self.assertIsNone(parse_backup_timestamp("gso_backup_latest.dump"))
+
+    def test_daily_weekly_and_monthly_boundaries(self):
+        # One backup a day at 02:00 for the first half of 2025, plus an earlier one on the last day.
+        # 2025-06-30 is a Monday, so it opens ISO week 27 on its own.
+        days = [datetime.date(2025, 1, 1) + datetime.timedelta(days=n) for n in range(181)]
+        timestamps = [datetime.datetime.combine(day, datetime.time(2)) for day in days]
+        timestamps.append(datetime.datetime(2025, 6, 30, 1))
+
+        kept = {ts.strftime("%m-%d %H") for ts in select_retained(timestamps, daily=7, weekly=4, monthly=6)}
+
+        daily = {f"06-{day} 02" for day in range(24, 31)}
+        weekly = {"06-30 02", "06-29 02", "06-22 02", "06-15 02"}
+        monthly = {"06-30 02", "05-31 02", "04-30 02", "03-31 02", "02-28 02", "01-31 02"}
+        self.assertEqual(kept, daily | weekly | monthly)
+        self.assertNotIn("06-30 01", kept)
+
+    def test_zero_limits_keep_nothing(self):
+        self.assertEqual(select_retained([datetime.datetime(2025, 6, 30)], daily=0, weekly=0, monthly=0), set())
+
+    def test_policy_deletes_old_dumps_and_manifests(self):
+        with tempfile.TemporaryDirectory() as backup_dir, override_settings(BACKUP_DIR=backup_dir):
+            os.makedirs(os.path.join(backup_dir, "media_manifests"))
+            for day in (1, 2, 3):
+                os.makedirs(os.path.join(backup_dir, f"gso_backup_2025-06-0{day}_02-00-00.dump"))
+                with open(os.path.join(backup_dir, "media_manifests", f"media_manifest_2025-06-0{day}_02-00-00.json"), "w") as f:
+                    json.dump({"files": {}}, f)
+
+            with redirect_stdout(io.StringIO()):
+                deleted = apply_retention_policy(daily=2, weekly=0, monthly=0)
+
+            self.assertEqual(sorted(os.path.basename(path) for path in deleted), [
+                "gso_backup_2025-06-01_02-00-00.dump", "media_manifest_2025-06-01_02-00-00.json",
+            ])
+            self.assertEqual(len(os.listdir(backup_dir)), 3)
+
+    def test_compare_fingerprints_flags_missing_and_partial_tables(self):
+        manifest = {"tables": {
+            "units": {"rows": 2, "checksum": "a"},
+            "requests": {"rows": 5, "checksum": "b"},
+            "feedback": {"rows": 1, "checksum": "c"},
+        }}
+        results = compare_fingerprints(manifest, {"units": (2, "a"), "requests": (3, "d")})
+
+        self.assertEqual({table: result["match"] for table, result in results.items()},
+                         {"units": True, "requests": False, "feedback": False})
+        self.assertEqual(results["requests"]["restored_rows"], 3)
+        self.assertIsNone(results["feedback"]["restored_rows"])
+
+    def test_verify_fails_without_a_manifest(self):
+        with tempfile.TemporaryDirectory() as backup_dir:
+            dump = os.path.join(backup_dir, "gso_backup_2025-06-01_02-00-00.dump")
+            os.makedirs(dump)
+            with self.assertRaisesMessage(CommandError, "has no gso_manifest.json"):
+                call_command("verify_backup", dump=dump)
+
+
+# -------------------------------
+# Benchmark Data and Runner
+# -------------------------------
+class BenchmarkCommandTests(TestCase):
+    """A tiny seeded dataset is enough to exercise every benchmarked view."""
+
+    def seed(self, **options):
+        out = io.StringIO()
+        call_command("seed_benchmark_data", users=20, requests=60, days=60, batch_size=25, stdout=out, **options)
+        return out.getvalue()
+
+    def test_seed_refuses_to_run_twice_and_clear_reseeds(self):
+        self.assertIn("Benchmark data ready", self.seed())
+        self.assertEqual(ServiceRequest.objects.count(), 60)
+
+        with self.assertRaisesMessage(CommandError, "already exists"):
+            self.seed()
+        self.assertIn("Removed 60 benchmark requests", self.seed(clear=True))
+        self.assertEqual(ServiceRequest.objects.count(), 60)
+
+    def test_run_benchmarks_writes_a_report_and_compares(self):
+        self.seed()
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = os.path.join(directory, "first.json"), os.path.join(directory, "second.json")
+            call_command("run_benchmarks", repeat=1, warmup=0, output=first, label="before", stdout=io.StringIO())
+            out = io.StringIO()
+            call_command("run_benchmarks", repeat=1, warmup=0, output=second, compare=first, stdout=out)
+
+            with open(first, encoding="utf-8") as f:
+                report = json.load(f)
+
+        self.assertEqual(report["label"], "before")
+        self.assertEqual(report["dataset"]["requests"], 60)
+        self.assertEqual(set(report["results"]), {
+            "request_management", "accomplishment_report", "preview_ipmt", "generate_ipmt", "gso_analytics",
+        })
+        self.assertEqual({result["status"] for result in report["results"].values()}, {200})
+        self.assertIn("gso_analytics: ", out.getvalue())
+        self.assertNotIn("Datasets differ", out.getvalue())
+
+    def test_run_benchmarks_needs_seeded_data(self):
+        with self.assertRaisesMessage(CommandError, "run seed_benchmark_data first"):
+            call_command("run_benchmarks", repeat=1, warmup=0, stdout=io.StringIO())
+
+    def test_compare_reports_pairs_views_present_in_both(self):
+        baseline = {"results": {"a": {"median_ms": 40.0, "queries": 30}, "b": {"median_ms": 5.0, "queries": 2}}}
+        current = {"results": {"a": {"median_ms": 10.0, "queries": 3}, "c": {"median_ms": 1.0, "queries": 1}}}
+
+        self.assertEqual(compare_reports(baseline, current), {
+            "a": {"median_ms": (40.0, 10.0), "speedup": 4.0, "queries": (30, 3)},
+        })
+
+
+# -------------------------------
+# Request Profiling
+# -------------------------------
+class ProfilingTests(TestCase):
+    """Only a staff user's own signed token turns profiling on, and only staff see the results."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="pass", role="gso", is_staff=True)
+        cls.personnel = User.objects.create_user("personnel", password="pass", role="personnel")
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(PROFILE_DIR=self.profile_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.defaults["HTTP_HOST"] = "127.0.0.1"
+
+    def get(self, user, token, url=None):
+        self.client.force_login(user)
+        return self.client.get(url or reverse("profile_list"), {TOKEN_PARAM: token} if token else {})
+
+    def test_valid_token_profiles_the_request(self):
+        response = self.get(self.staff, make_profile_token(self.staff))
+
+        profile_id = response["X-Profile-Id"]
+        self.assertEqual(
+            sorted(os.listdir(self.profile_dir)),
+            [f"{profile_id}.folded", f"{profile_id}.json", f"{profile_id}.prof"],
+        )
+        summary = list_profiles()[0]
+        self.assertEqual((summary["id"], summary["user"], summary["status"]), (profile_id, "staff", 200))
+        self.assertNotIn("queries", summary)
+
+    def test_header_token_is_accepted(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("profile_list"), HTTP_X_PROFILE_TOKEN=make_profile_token(self.staff))
+        self.assertIn("X-Profile-Id", response)
+
+    def test_invalid_tokens_are_ignored(self):
+        token = make_profile_token(self.staff)
+        for user, bad_token in [
+            (self.staff, None),
+            (self.staff, token + "x"),
+            (self.staff, make_profile_token(self.personnel)),
+            (self.personnel, make_profile_token(self.personnel)),
+        ]:
+            with self.subTest(user=user.username, token=bad_token):
+                self.assertNotIn("X-Profile-Id", self.get(user, bad_token, url=reverse("gso_accounts:login")))
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_expired_token_is_ignored(self):
+        with mock.patch("django.core.signing.time.time", return_value=time.time() - 7200):
+            token = make_profile_token(self.staff)
+        self.assertNotIn("X-Profile-Id", self.get(self.staff, token))
+
+    def test_profile_views_are_staff_only(self):
+        self.get(self.staff, make_profile_token(self.staff))
+        profile_id = list_profiles()[0]["id"]
+        download = reverse("profile_download", args=[profile_id, "json"])
+
+        self.client.force_login(self.personnel)
+        self.assertEqual(self.client.get(reverse("profile_list")).status_code, 302)
+        self.assertEqual(self.client.get(download).status_code, 302)
+
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get(reverse("profile_list")), profile_id)
+        response = self.client.get(download)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(b"".join(response.streaming_content))["id"], profile_id)
+
+    def test_download_rejects_unknown_names(self):
+        self.client.force_login(self.staff)
+        for profile_id, kind in [("..", "json"), ("missing", "json"), ("x", "py")]:
+            with self.subTest(profile_id=profile_id, kind=kind):
+                self.assertEqual(self.client.get(reverse("profile_download", args=[profile_id, kind])).status_code, 404)
@@ -3,9 +3,13 @@ from django.urls import path, include
 from django.shortcuts import redirect
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from core import views as core_views
 
 urlpatterns = [
     path('', lambda request: redirect('gso_accounts:login'), name='home'),
+    path('admin/profiling/', core_views.profile_list, name='profile_list'),
+    path('admin/profiling/<str:profile_id>/<str:kind>/', core_views.profile_download, name='profile_download'),
     path('admin/', admin.site.urls),
     path('gso_accounts/', include('apps.gso_accounts.urls', namespace='gso_accounts')),
     path('gso_requests/', include('apps.gso_requests.urls', namespace='gso_requests')),
@@ -17,4 +21,6 @@ urlpatterns = [
 
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # runserver serves static files itself; the ASGI server (uvicorn) needs these routes
+    urlpatterns += staticfiles_urlpatterns()
\ No newline at end of file
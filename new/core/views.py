@@ -0,0 +1,36 @@
+# core/views.py
+import os
+import re
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+
+from .profiling import TOKEN_PARAM, get_profile_dir, list_profiles, make_profile_token
+
+PROFILE_ID_RE = re.compile(r"^[\w-]+$")
+PROFILE_KINDS = {"prof", "folded", "json"}
+
+
+# -------------------------------
+# Request Profiling (staff only)
+# -------------------------------
+@staff_member_required
+def profile_list(request):
+    """Saved request profiles, plus the token that turns profiling on for one request."""
+    return render(request, "admin/profiling/profile_list.html", {
+        "title": "Request profiles",
+        "profiles": list_profiles(),
+        "token_param": TOKEN_PARAM,
+        "token": make_profile_token(request.user),
+    })
+
+
+@staff_member_required
+def profile_download(request, profile_id, kind):
+    if not PROFILE_ID_RE.match(profile_id) or kind not in PROFILE_KINDS:
+        raise Http404("Unknown profile")
+    path = os.path.join(get_profile_dir(), f"{profile_id}.{kind}")
+    if not os.path.exists(path):
+        raise Http404("Unknown profile")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=os.path.basename(path))
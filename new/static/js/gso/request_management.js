@@ -1,26 +1,12 @@
-function openModal(id, date, requestor, office, unit, description, status, personnel, materials, reports) {
-  document.getElementById("modal-date").textContent = date;
-  document.getElementById("modal-requestor").textContent = requestor;
-  document.getElementById("modal-office").textContent = office;
-  document.getElementById("modal-unit").textContent = unit;
-  document.getElementById("modal-description").textContent = description;
-  document.getElementById("modal-status").textContent = status;
-  document.getElementById("modal-personnel").textContent = personnel || "Unassigned";
-  document.getElementById("modal-materials").textContent = materials || "No materials assigned";
-  document.getElementById("modal-reports").innerHTML = reports || "No reports submitted";
-
-  const approveForm = document.getElementById("approveForm");
-
-  if (approveForm) {
-      approveForm.action = `/gso_requests/approve/${id}/`;
-
-      // Show Approve only when Pending AND personnel assigned
-      if (status === "Pending" && personnel && personnel.trim() !== "") {
-          approveForm.style.display = "block";
-      } else {
-          approveForm.style.display = "none";
-      }
+// Load the selected request's details only when its modal opens
+document.getElementById("requestModal").addEventListener("show.bs.modal", async (event) => {
+  const content = document.getElementById("requestModalContent");
+  content.innerHTML = '<div class="modal-body text-center text-muted py-5">Loading...</div>';
+  try {
+    const res = await fetch(event.relatedTarget.dataset.modalUrl);
+    if (!res.ok) throw new Error(res.statusText);
+    content.innerHTML = await res.text();
+  } catch {
+    content.innerHTML = '<div class="modal-body text-center text-danger py-5">Could not load the request.</div>';
   }
-
-  new bootstrap.Modal(document.getElementById("requestModal")).show();
-}
+});
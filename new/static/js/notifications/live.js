@@ -0,0 +1,59 @@
+// Live notification badge and toasts over the per-user websocket (no polling)
+(function () {
+  const badges = document.querySelectorAll("[data-notification-badge]");
+  const toasts = document.getElementById("notificationToasts");
+  if (!badges.length || !("WebSocket" in window)) return;
+
+  const scheme = window.location.protocol === "https:" ? "wss" : "ws";
+  const url = `${scheme}://${window.location.host}/ws/notifications/`;
+  let retryDelay = 1000;
+
+  function setUnread(count) {
+    badges.forEach((badge) => {
+      badge.textContent = count > 99 ? "99+" : count;
+      badge.classList.toggle("d-none", count === 0);
+    });
+  }
+
+  function showToast(message, link) {
+    if (!toasts || !window.bootstrap) return;
+    const toast = document.createElement("div");
+    toast.className = "toast align-items-center border-0 shadow";
+    toast.setAttribute("role", "status");
+    toast.innerHTML = '<div class="d-flex"><div class="toast-body"></div>' +
+      '<button type="button" class="btn-close me-2 m-auto" data-bs-dismiss="toast"></button></div>';
+    const body = toast.querySelector(".toast-body");
+    if (link) {
+      const anchor = document.createElement("a");
+      anchor.href = link;
+      anchor.className = "text-reset text-decoration-none";
+      anchor.textContent = message;
+      body.appendChild(anchor);
+    } else {
+      body.textContent = message;
+    }
+    toasts.appendChild(toast);
+    toast.addEventListener("hidden.bs.toast", () => toast.remove());
+    new bootstrap.Toast(toast, { delay: 6000 }).show();
+  }
+
+  function connect() {
+    const socket = new WebSocket(url);
+    socket.onopen = () => { retryDelay = 1000; };
+    socket.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (typeof data.unread === "number") setUnread(data.unread);
+      if (data.message) {
+        // Digest rows carry how many events they stand for
+        showToast(data.count > 1 ? `${data.message} (+${data.count - 1} more)` : data.message, data.link);
+      }
+    };
+    // Reconnect with backoff after a server restart or network drop
+    socket.onclose = () => {
+      setTimeout(connect, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, 60000);
+    };
+  }
+
+  connect();
+})();